@@ -1,56 +1,109 @@
 import os
-from dotenv import load_dotenv
+from datetime import datetime, timedelta
 from airflow import DAG
-from datetime import datetime
 from airflow.operators.python import PythonOperator
-from scripts.extract import extract_data
-from scripts.transform import transform_data
-from scripts.load import load_data
+from scripts.helpers import generate_endpoints, TABLE_NAMES, TRANSFORM_GROUPS
+from scripts.tasks import (
+    extract_task,
+    update_schedule_task,
+    transform_task,
+    prepare_db_task,
+    load_task,
+    swap_task,
+)
+from gameweek_timetable import GameweekTimetable
+from fpl_readiness import FplReadinessSensor
+
+# Only lightweight modules are imported while the scheduler parses this file - the task callables
+# import the pipeline scripts and read .env when they run
+
+# Airflow pools capping concurrent FPL API requests and database loads, created by ec2_build.sh
+API_POOL = "fpl_api"
+DB_POOL = "rds"
+
+# Run times read by the timetable, rebuilt from the extracted fixtures on every run
+SCHEDULE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fpl_schedule.json"
+)
 
 
 with DAG(
     "etl_dag",
     start_date=datetime(2025, 1, 21),
     description="DAG to orchestrate ETL process",
-    schedule="5 8 * * *",
+    schedule=GameweekTimetable(SCHEDULE_PATH),
     catchup=False,
+    # runs on the same day share the {season}/{ds}/ keys and, in swap mode, the staging tables
+    max_active_runs=1,
 ):
 
-    load_dotenv()
-    extract_bucket_name = os.environ["s3_extract_bucket_name"]
-    transform_bucket_name = os.environ["s3_transform_bucket_name"]
-    rds_user = os.environ["rds_user"]
-    rds_password = os.environ["rds_password"]
-    rds_host = os.environ["rds_host"]
-    rds_port = os.environ["rds_port"]
-    rds_db_name = os.environ["rds_db_name"]
+    # deferred to the triggerer while FPL finalises the data, so no worker slot is held waiting and
+    # extract, transform and load only ever run on final data. The 6 hour timeout relies on the EC2
+    # instance staying up (terraform/ec2_scheduling.tf no longer stops it), or the deferral is lost
+    wait_for_data = FplReadinessSensor(
+        task_id="wait_for_final_data",
+        poke_interval=300,
+        timeout=6 * 60 * 60,
+    )
 
-    extract = PythonOperator(
+    extract = PythonOperator.partial(
         task_id="extract_task",
-        python_callable=extract_data,
-        op_kwargs={"bucket_name": extract_bucket_name},
+        python_callable=extract_task,
+        pool=API_POOL,
+        retries=2,
+        retry_delay=timedelta(minutes=1),
+    ).expand(
+        op_kwargs=[
+            {"endpoint": endpoint, "ds": "{{ ds }}"}
+            for endpoint in generate_endpoints()
+        ]
+    )
+
+    schedule_update = PythonOperator(
+        task_id="update_schedule_task",
+        python_callable=update_schedule_task,
+        op_kwargs={"schedule_path": SCHEDULE_PATH, "ds": "{{ ds }}"},
     )
 
-    transform = PythonOperator(
+    transform = PythonOperator.partial(
         task_id="transform_task",
-        python_callable=transform_data,
-        op_kwargs={
-            "source_bucket": extract_bucket_name,
-            "destination_bucket": transform_bucket_name,
-        },
+        python_callable=transform_task,
+        retries=2,
+        retry_delay=timedelta(minutes=1),
+    ).expand(
+        op_kwargs=[
+            {"table_names": table_names, "ds": "{{ ds }}"}
+            for table_names in TRANSFORM_GROUPS
+        ]
+    )
+
+    prepare = PythonOperator(
+        task_id="prepare_db_task",
+        python_callable=prepare_db_task,
+        pool=DB_POOL,
     )
 
-    load = PythonOperator(
+    load = PythonOperator.partial(
         task_id="load_task",
-        python_callable=load_data,
-        op_kwargs={
-            "rds_user": rds_user,
-            "rds_password": rds_password,
-            "rds_host": rds_host,
-            "rds_port": rds_port,
-            "rds_db_name": rds_db_name,
-            "bucket_name": transform_bucket_name,
-        },
+        python_callable=load_task,
+        pool=DB_POOL,
+        retries=2,
+        retry_delay=timedelta(minutes=1),
+    ).expand(
+        op_kwargs=[
+            {"table_name": table_name, "ds": "{{ ds }}"} for table_name in TABLE_NAMES
+        ]
+    )
+
+    # runs only once every table is staged, so a failed table leaves the live tables untouched
+    # rds_load_mode is read when the task runs, and outside swap mode it does nothing
+    swap = PythonOperator(
+        task_id="swap_task",
+        python_callable=swap_task,
+        op_kwargs={"ds": "{{ ds }}"},
+        pool=DB_POOL,
     )
 
-    extract >> transform >> load
+    wait_for_data >> extract
+    extract >> schedule_update
+    extract >> transform >> prepare >> load >> swap
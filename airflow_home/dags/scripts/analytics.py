@@ -0,0 +1,161 @@
+import os
+import logging
+import argparse
+from urllib.parse import urlparse
+import duckdb
+from dotenv import load_dotenv
+
+try:
+    from scripts.logs import setup_logging
+    from scripts.helpers import generate_filename, TABLE_NAMES
+except ImportError:
+    from airflow_home.dags.scripts.logs import setup_logging
+    from airflow_home.dags.scripts.helpers import generate_filename, TABLE_NAMES
+
+setup_logging()
+
+# Common dashboard queries, keyed by name - standard SQL, so they run unchanged on the Parquet
+# views here and on the MySQL/PostgreSQL database. The database holds every season, so joins match
+# on season and results are grouped or ordered by it
+DASHBOARD_QUERIES = {
+    "gameweek_player_fixtures": """
+        SELECT f.season, p.web_name, t.team_name, f.fixture_difficulty_rating, f.is_home
+        FROM fact_players f
+        JOIN dim_players p ON p.season = f.season AND p.player_id = f.player_id
+        JOIN dim_teams t ON t.season = f.season AND t.team_id = f.opposition_team_id
+        WHERE f.gameweek_id = 20
+    """,
+    "team_difficulty_next_5": """
+        SELECT season, team_id, SUM(fixture_difficulty_rating)
+        FROM fact_players
+        WHERE gameweek_id BETWEEN 20 AND 24
+        GROUP BY season, team_id
+    """,
+    "player_season_fixtures": """
+        SELECT season, gameweek_id, fixture_id, opposition_team_id, fixture_difficulty_rating
+        FROM fact_players
+        WHERE player_id = 100
+        ORDER BY season, gameweek_id
+    """,
+    "gameweek_fixtures": """
+        SELECT d.season, d.fixture_date, h.team_name, a.team_name, d.home_team_score, d.away_team_score
+        FROM dim_fixtures d
+        JOIN dim_teams h ON h.season = d.season AND h.team_id = d.home_team_id
+        JOIN dim_teams a ON a.season = d.season AND a.team_id = d.away_team_id
+        WHERE d.gameweek_id = 20
+    """,
+}
+
+
+def connect_parquet(source, ds=None, tables=None):
+    """
+    Opens an in-memory DuckDB database with a view over each table's Parquet file
+
+    The views read the files in place, so filters and the selected columns are pushed down to the
+    Parquet row group statistics and column chunks rather than loading whole tables
+
+    Parameters:
+        source (str): Local directory or "s3://bucket" holding the files written by save_df_to_parquet_s3,
+            under the same '{season}/{ds}/{table}.parquet' keys
+        ds (str): Logical date of the run (YYYY-MM-DD) to query, defaults to today
+        tables (list): Tables to register, defaults to TABLE_NAMES
+
+    Returns:
+        duckdb.DuckDBPyConnection: Connection with one view per table
+
+    Side Effects:
+        On failure - error message logged and exception raised
+    """
+    try:
+        conn = duckdb.connect()
+        if source.startswith("s3://"):
+            configure_s3(conn)
+
+        for table_name in tables or TABLE_NAMES:
+            path = f"{source.rstrip('/')}/{generate_filename(table_name, ds)}.parquet"
+            conn.execute(
+                f"CREATE VIEW {table_name} AS SELECT * FROM read_parquet('{path}')"
+            )
+        logging.info(f"connect_parquet: views created over {source} for {ds}")
+        return conn
+    except Exception as e:
+        logging.error(f"connect_parquet Error: {e}")
+        raise
+
+
+def configure_s3(conn):
+    """
+    Lets DuckDB read s3:// paths with the AWS credentials in the environment
+
+    Setting s3_endpoint_url (e.g. http://localhost:5000 for a moto server or MinIO) points it at a
+    local S3 stand-in instead of AWS
+
+    Parameters:
+        conn (duckdb.DuckDBPyConnection): DuckDB connection
+
+    Returns:
+        Nothing
+    """
+    conn.execute("INSTALL httpfs")
+    conn.execute("LOAD httpfs")
+
+    options = {
+        "TYPE": "S3",
+        "KEY_ID": os.environ.get("AWS_ACCESS_KEY_ID", ""),
+        "SECRET": os.environ.get("AWS_SECRET_ACCESS_KEY", ""),
+        "REGION": os.environ.get("AWS_DEFAULT_REGION", "eu-west-2"),
+    }
+    if os.environ.get("AWS_SESSION_TOKEN"):
+        options["SESSION_TOKEN"] = os.environ["AWS_SESSION_TOKEN"]
+    if os.environ.get("s3_endpoint_url"):
+        endpoint = urlparse(os.environ["s3_endpoint_url"])
+        options["ENDPOINT"] = endpoint.netloc
+        options["URL_STYLE"] = "path"
+        options["USE_SSL"] = str(endpoint.scheme == "https").lower()
+
+    settings = ", ".join(
+        f"{key} {value}" if key in ("TYPE", "USE_SSL") else f"{key} '{value}'"
+        for key, value in options.items()
+    )
+    conn.execute(f"CREATE OR REPLACE SECRET pipeline_s3 ({settings})")
+
+
+def run_query(conn, query):
+    """
+    Runs a named dashboard query, or any SQL, against the Parquet views
+
+    Parameters:
+        conn (duckdb.DuckDBPyConnection): Connection from connect_parquet
+        query (str): Key of DASHBOARD_QUERIES, or a SQL statement
+
+    Returns:
+        dataFrame: Query result
+    """
+    return conn.execute(DASHBOARD_QUERIES.get(query, query)).df()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Query the transformed Parquet files with DuckDB, without loading the database"
+    )
+    parser.add_argument(
+        "query",
+        nargs="?",
+        help=f"One of {', '.join(DASHBOARD_QUERIES)}, or a SQL statement",
+    )
+    parser.add_argument(
+        "--source",
+        help="Local directory or s3://bucket, defaults to the transform bucket in .env",
+    )
+    parser.add_argument("--ds", help="Run date (YYYY-MM-DD), defaults to today")
+    parser.add_argument("--list", action="store_true", help="List the named queries")
+    args = parser.parse_args()
+
+    if args.list or not args.query:
+        for name, sql in DASHBOARD_QUERIES.items():
+            print(f"{name}:{sql}")
+    else:
+        load_dotenv()
+        source = args.source or f"s3://{os.environ['s3_transform_bucket_name']}"
+        conn = connect_parquet(source, args.ds)
+        print(run_query(conn, args.query).to_string(index=False))
@@ -0,0 +1,94 @@
+import os
+import logging
+import threading
+import boto3
+from botocore.config import Config
+
+try:
+    from scripts.logs import setup_logging
+except ImportError:
+    from airflow_home.dags.scripts.logs import setup_logging
+
+setup_logging()
+
+# Client settings shared by every S3 call - the pool is sized for the concurrent table loads and
+# ranged GETs of one process, connections are kept alive between objects, and throttled requests
+# are retried with adaptive client-side rate limiting
+CLIENT_CONFIG = Config(
+    max_pool_connections=int(os.environ.get("aws_max_pool_connections", 20)),
+    tcp_keepalive=True,
+    retries={
+        "max_attempts": int(os.environ.get("aws_max_attempts", 5)),
+        "mode": "adaptive",
+    },
+)
+
+# Lambda invocations run synchronously for up to the 900s Lambda limit, so the read timeout
+# outlasts the function, and are never retried - a retried transform or load would run twice
+LAMBDA_CLIENT_CONFIG = Config(
+    max_pool_connections=int(os.environ.get("aws_max_pool_connections", 20)),
+    tcp_keepalive=True,
+    read_timeout=910,
+    retries={"total_max_attempts": 1, "mode": "standard"},
+)
+
+# Client settings of the services not using CLIENT_CONFIG
+SERVICE_CONFIGS = {"lambda": LAMBDA_CLIENT_CONFIG}
+
+_lock = threading.Lock()
+_sessions = {}
+_clients = {}
+
+
+def get_session():
+    """
+    The process-wide boto3 session, created on first use
+
+    Parameters:
+        None
+
+    Returns:
+        boto3.Session: Session holding the resolved credentials and region
+    """
+    # keyed by process id, so forked task and backfill workers never share connections
+    pid = os.getpid()
+    with _lock:
+        if pid not in _sessions:
+            _sessions[pid] = boto3.session.Session()
+        return _sessions[pid]
+
+
+def get_client(service_name="s3"):
+    """
+    The process-wide client of an AWS service, created on first use
+
+    boto3 clients are thread safe, so one client (and its connection pool) is shared by every
+    thread of the process, rather than each call resolving credentials and endpoints and opening
+    new connections
+
+    Parameters:
+        service_name (str): AWS service, e.g. "s3"
+
+    Returns:
+        botocore.client.BaseClient: Client configured with its SERVICE_CONFIGS entry, or CLIENT_CONFIG
+    """
+    key = (os.getpid(), service_name)
+    client = _clients.get(key)
+    if client is None:
+        session = get_session()
+        with _lock:
+            if key not in _clients:
+                _clients[key] = session.client(
+                    service_name,
+                    config=SERVICE_CONFIGS.get(service_name, CLIENT_CONFIG),
+                )
+                logging.info(f"get_client: {service_name} client created")
+            client = _clients[key]
+    return client
+
+
+def reset_clients():
+    """Drop the cached session and clients, so the next call resolves credentials again"""
+    with _lock:
+        _sessions.clear()
+        _clients.clear()
@@ -0,0 +1,203 @@
+import os
+import json
+import logging
+import argparse
+from collections import Counter
+from datetime import date, timedelta
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dotenv import load_dotenv
+
+try:
+    from scripts.logs import setup_logging
+    from scripts.helpers import season_of
+    from scripts.transform import transform_data
+    from scripts.load import load_data, prepare_db
+    from scripts.seasons import is_frozen, has_output
+except ImportError:
+    from airflow_home.dags.scripts.logs import setup_logging
+    from airflow_home.dags.scripts.helpers import season_of
+    from airflow_home.dags.scripts.transform import transform_data
+    from airflow_home.dags.scripts.load import load_data, prepare_db
+    from airflow_home.dags.scripts.seasons import is_frozen, has_output
+
+setup_logging()
+
+
+def backfill(
+    source_bucket, destination_bucket, start_ds, end_ds, max_workers=4, force=False
+):
+    """
+    Re-runs Transform for every date in a range from the raw JSON already stored in the extract bucket
+
+    The range may span several seasons, whose dates are transformed concurrently, apart from the
+    dates of frozen seasons, which are never reprocessed
+
+    Parameters:
+        source_bucket (str): Name of the S3 bucket holding the extracted JSON files
+        destination_bucket (str): Name of the S3 bucket to save the parquet files to
+        start_ds (str): First date of the range (YYYY-MM-DD)
+        end_ds (str): Last date of the range (YYYY-MM-DD), inclusive
+        max_workers (int): Number of dates transformed in parallel, each in its own process
+        force (bool): Transform dates whose parquet files already exist rather than skipping them
+
+    Returns:
+        dict: "transformed", "skipped", "frozen" or "failed: {error}" for each date
+
+    Side Effects:
+        On success - parquet files saved to the destination bucket under each date's prefix
+        On failure - error message logged for each failed date, remaining dates still processed
+    """
+    dates = date_range(start_ds, end_ds)
+    frozen = {
+        season
+        for season in {season_of(ds) for ds in dates}
+        if is_frozen(destination_bucket, season)
+    }
+    results = {ds: "frozen" for ds in dates if season_of(ds) in frozen}
+    pending = [
+        ds
+        for ds in dates
+        if ds not in results and (force or not has_output(destination_bucket, ds))
+    ]
+    results.update(
+        {ds: "skipped" for ds in dates if ds not in results and ds not in pending}
+    )
+
+    if max_workers > 1 and len(pending) > 1:
+        # processes rather than threads, as transform is CPU bound pandas work
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                ds: executor.submit(
+                    transform_data, source_bucket, destination_bucket, ds
+                )
+                for ds in pending
+            }
+            for ds, future in futures.items():
+                results[ds] = backfill_result(ds, future.result)
+    else:
+        for ds in pending:
+            results[ds] = backfill_result(
+                ds, lambda: transform_data(source_bucket, destination_bucket, ds)
+            )
+
+    outcomes = Counter(result.split(":")[0] for result in results.values())
+    logging.info(f"backfill: {start_ds} to {end_ds} - {dict(outcomes)}")
+    return dict(sorted(results.items()))
+
+
+def load_seasons(
+    db_credentials,
+    bucket_name,
+    dates,
+    max_workers=4,
+    load_max_workers=4,
+    **load_kwargs,
+):
+    """
+    Loads the last of the given dates of each season into the database, seasons loaded concurrently
+
+    Each season's load only replaces that season's rows, so seasons don't conflict - apart from swap
+    mode, where every season stages into the same staging tables, so seasons load one at a time
+
+    Parameters:
+        db_credentials (dict): rds_user, rds_password, rds_host, rds_port, rds_db_name and dialect
+        bucket_name (str): Name of the S3 bucket holding the parquet files
+        dates (list): Transformed dates (YYYY-MM-DD)
+        max_workers (int): Number of seasons loaded in parallel
+        load_max_workers (int): Number of tables of each season loaded in parallel
+        load_kwargs: Other keyword arguments of load_data
+
+    Returns:
+        dict: load_data's return value for each season, keyed by season
+    """
+    latest = {}
+    for ds in sorted(dates):
+        latest[season_of(ds)] = ds
+    if load_kwargs.get("mode") == "swap":
+        max_workers = 1
+
+    # migrate once up front, so concurrent loads never race to apply the same migration
+    prepare_db(**db_credentials)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            season: executor.submit(
+                load_data,
+                **db_credentials,
+                bucket_name=bucket_name,
+                ds=ds,
+                max_workers=load_max_workers,
+                **load_kwargs,
+            )
+            for season, ds in latest.items()
+        }
+        return {season: future.result() for season, future in futures.items()}
+
+
+def backfill_result(ds, run):
+    """Calls run, returning "transformed" or, when it raises, "failed: {error}" """
+    try:
+        run()
+        return "transformed"
+    except Exception as e:
+        logging.error(f"backfill Error for {ds}: {e}")
+        return f"failed: {e}"
+
+
+def date_range(start_ds, end_ds):
+    """List every date from start_ds to end_ds inclusive, as YYYY-MM-DD strings"""
+    start_date = date.fromisoformat(start_ds)
+    days = (date.fromisoformat(end_ds) - start_date).days
+    if days < 0:
+        raise ValueError(f"date_range: {end_ds} is before {start_ds}")
+    return [(start_date + timedelta(days=day)).isoformat() for day in range(days + 1)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Re-run Transform over a date range from stored raw data"
+    )
+    parser.add_argument("start", help="First date to backfill, YYYY-MM-DD")
+    parser.add_argument("end", help="Last date to backfill, YYYY-MM-DD")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--force", action="store_true", help="Re-run dates that already have output"
+    )
+    parser.add_argument(
+        "--load",
+        action="store_true",
+        help="Load the last date of each season in the range into the database afterwards",
+    )
+    args = parser.parse_args()
+
+    load_dotenv()
+    results = backfill(
+        os.environ["s3_extract_bucket_name"],
+        os.environ["s3_transform_bucket_name"],
+        args.start,
+        args.end,
+        max_workers=args.workers,
+        force=args.force,
+    )
+    print(json.dumps(results, indent=2))
+
+    if any(result.startswith("failed") for result in results.values()):
+        raise SystemExit(1)
+
+    if args.load:
+        # each load replaces its season's rows, so only the latest date of each season is loaded
+        load_seasons(
+            {
+                "rds_user": os.environ["rds_user"],
+                "rds_password": os.environ["rds_password"],
+                "rds_host": os.environ["rds_host"],
+                "rds_port": os.environ["rds_port"],
+                "rds_db_name": os.environ["rds_db_name"],
+                "dialect": os.environ.get("rds_dialect", "mysql"),
+            },
+            os.environ["s3_transform_bucket_name"],
+            [ds for ds, result in results.items() if result != "frozen"],
+            max_workers=args.workers,
+            load_max_workers=int(os.environ.get("rds_load_max_workers", 4)),
+            method=os.environ.get("rds_load_method", "executemany"),
+            mode=os.environ.get("rds_load_mode", "replace"),
+        )
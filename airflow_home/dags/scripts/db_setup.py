@@ -1,32 +1,40 @@
-def seed_prod_db(engine):
+try:
+    from scripts.migrations import migrate
+except ImportError:
+    from airflow_home.dags.scripts.migrations import migrate
+
+# Primary key columns of each production table (see migrations.py), used for upserts in load merge mode
+PRIMARY_KEYS = {
+    "fact_players": ["season", "player_id", "gameweek_id", "fixture_id"],
+    "dim_players": ["season", "player_id"],
+    "dim_teams": ["season", "team_id"],
+    "dim_fixtures": ["season", "fixture_id"],
+    "fact_player_stats": ["season", "player_id", "gameweek_id"],
+    "agg_top_scorers": ["season", "gameweek_id", "points_rank"],
+    "agg_team_of_the_week": ["season", "gameweek_id", "player_id"],
+    "agg_team_points": ["season", "gameweek_id", "team_id"],
+}
+
+
+def seed_prod_db(engine, target_version=None):
     """
     Create tables in production MySQL Database
 
     Parameters:
         engine (str): SQLAlchemy connection object
+        target_version (int): Schema version to create, defaults to the latest migration
 
     Returns:
         Nothing
 
     Side Effects:
-        On success - SQL tables are dropped if they already exist, and then created
+        On success - SQL tables are dropped if they already exist, and then recreated by applying every schema migration
     """
     with engine.connect() as conn:
         conn.execute(
-            f"DROP TABLE IF EXISTS fact_players, dim_players, dim_teams, dim_fixtures"
-        )
-        conn.execute(
-            f"CREATE TABLE fact_players ( player_id int, team_id int, gameweek_id int, fixture_id int, opposition_team_id int, fixture_difficulty_rating int, is_home bool )"
-        )
-        conn.execute(
-            f"CREATE TABLE dim_players ( first_name varchar(255), second_name varchar(255), web_name varchar(255), player_id int, team_id int )"
-        )
-        conn.execute(
-            f"CREATE TABLE dim_teams ( team_id int, team_name varchar(255), team_name_short varchar(255) )"
-        )
-        conn.execute(
-            f"CREATE TABLE dim_fixtures ( fixture_id int, gameweek_id int, fixture_date DATE, fixture_time TIME, match_finished bool, home_team_id int, away_team_id int, home_team_score int, away_team_score int, home_team_difficulty int, away_team_difficulty int )"
+            f"DROP TABLE IF EXISTS fact_players, dim_players, dim_teams, dim_fixtures, fact_player_stats, agg_top_scorers, agg_team_of_the_week, agg_team_points, pipeline_run_metrics, schema_migrations"
         )
+    migrate(engine, target_version)
 
 
 def seed_test_db(engine):
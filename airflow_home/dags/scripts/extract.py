@@ -1,23 +1,34 @@
 import requests
 import json
 import logging
-import boto3
 from botocore.exceptions import ClientError
 
 try:
-    from scripts.helpers import generate_filename
+    from scripts.logs import setup_logging, log_context
+    from scripts.helpers import generate_filename, generate_endpoints, today_ds
+    from scripts.metrics import timed, record, flushes_metrics
+    from scripts.aws import get_client
 except ImportError:
-    from airflow_home.dags.scripts.helpers import generate_filename
+    from airflow_home.dags.scripts.logs import setup_logging, log_context
+    from airflow_home.dags.scripts.helpers import (
+        generate_filename,
+        generate_endpoints,
+        today_ds,
+    )
+    from airflow_home.dags.scripts.metrics import timed, record, flushes_metrics
+    from airflow_home.dags.scripts.aws import get_client
 
-logging.basicConfig(filename="logs.log", encoding="utf-8", level=logging.INFO)
+setup_logging()
 
 
-def extract_data(bucket_name):
+@flushes_metrics
+def extract_data(bucket_name, ds=None):
     """
     Executes full Extract process, invoking generate_endpoints, retrieve_data and save_json_to_s3 functions
 
     Parameters:
         bucket_name (str): Name of the target S3 bucket
+        ds (str): Logical date of the run (YYYY-MM-DD), used as the key prefix, defaults to today
 
     Returns:
         Nothing
@@ -25,35 +36,37 @@ def extract_data(bucket_name):
     Side Effects:
         On success - data fetched from API for each endpoint & saved to S3 bucket
     """
+    # resolve the date once, so a run spanning midnight writes a single prefix
+    ds = ds or today_ds()
     endpoints_list = generate_endpoints()
 
     for endpoint in endpoints_list:
-        data = retrieve_data(endpoint)
-        filename = f"{generate_filename(endpoint)}.json"
-        save_json_to_s3(data, bucket_name, filename)
+        extract_endpoint(endpoint, bucket_name, ds)
 
 
-def generate_endpoints():
+@flushes_metrics
+def extract_endpoint(endpoint, bucket_name, ds=None):
     """
-    Generate a list of FPL API endpoints
+    Extracts a single FPL API endpoint, so each endpoint can run (and retry) as its own task
 
     Parameters:
-        None
+        endpoint (str): The desired FPL API endpoint
+        bucket_name (str): Name of the target S3 bucket
+        ds (str): Logical date of the run (YYYY-MM-DD), used as the key prefix, defaults to today
 
     Returns:
-        list: List of FPL API Endpoints
-    """
-    target_endpoints = [
-        f"fixtures",
-        f"bootstrap-static",
-    ]
-    gw_endpoints = ["event/{}/live"]
+        Nothing
 
-    endpoints_list = list(target_endpoints)
-    endpoints_list.extend(gw_endpoints[0].format(i) for i in range(1, 39))
-    return endpoints_list
+    Side Effects:
+        On success - data fetched from API for the endpoint & saved to S3 bucket
+    """
+    with log_context(stage="extract", endpoint=endpoint):
+        data = retrieve_data(endpoint)
+        filename = f"{generate_filename(endpoint, ds)}.json"
+        save_json_to_s3(data, bucket_name, filename)
 
 
+@timed
 def retrieve_data(endpoint):
     """
     Retrieves data from Fantasy Premier League API, from the endpoint provided
@@ -71,6 +84,7 @@ def retrieve_data(endpoint):
         base_url = "https://fantasy.premierleague.com/api/"
         response = requests.get(f"{base_url}{endpoint}/", timeout=5)
         response.raise_for_status()
+        record(byte_count=len(response.content))
         logging.info(f"{endpoint} data retrieved successfully")
         return response.json()
     except requests.exceptions.HTTPError as http_err:
@@ -78,6 +92,7 @@ def retrieve_data(endpoint):
         raise
 
 
+@timed
 def save_json_to_s3(body, bucket, filename):
     """
     Saves a dictionary as JSON to the requested AWS S3 bucket
@@ -95,8 +110,10 @@ def save_json_to_s3(body, bucket, filename):
         On failure - error message logged
     """
     try:
-        s3 = boto3.client("s3")
-        s3.put_object(Body=json.dumps(body), Bucket=bucket, Key=filename)
+        s3 = get_client("s3")
+        body_json = json.dumps(body)
+        s3.put_object(Body=body_json, Bucket=bucket, Key=filename)
+        record(byte_count=len(body_json))
         logging.info(f"Success: {filename} added to bucket {bucket}")
     except ClientError as e:
         logging.error(f"save_json_to_s3 Error for {filename}: {e}")
@@ -1,6 +1,63 @@
 from datetime import datetime
 
+# Only the standard library is imported here, as the DAG file imports this module every time
+# the scheduler parses it
 
-def generate_filename(endpoint):
-    """Generate a string filename in format '{today's date}/{endpoint}'"""
-    return f'{datetime.now().strftime("%Y-%m-%d")}/{endpoint}'
+# Fact and dimension tables, written by every run
+STAR_SCHEMA_TABLES = ["fact_players", "dim_players", "dim_teams", "dim_fixtures"]
+
+# Per-gameweek dashboard aggregates - empty before the first gameweek, and missing from runs
+# transformed before they were added
+AGGREGATE_TABLES = ["agg_top_scorers", "agg_team_of_the_week", "agg_team_points"]
+
+TABLE_NAMES = STAR_SCHEMA_TABLES + AGGREGATE_TABLES
+
+# Tables transformed by each transform task - the aggregates share one read of the live data
+TRANSFORM_GROUPS = [[table_name] for table_name in STAR_SCHEMA_TABLES] + [
+    AGGREGATE_TABLES
+]
+
+# Gameweeks in a Premier League season
+GAMEWEEKS = 38
+
+# FPL seasons start in August, so dates from July onwards belong to the season starting that year
+SEASON_START_MONTH = 7
+
+
+def generate_filename(endpoint, ds=None):
+    """Generate a string filename in format '{season}/{ds}/{endpoint}', ds defaulting to today's date"""
+    ds = ds or today_ds()
+    return f"{season_of(ds)}/{ds}/{endpoint}"
+
+
+def season_of(ds=None):
+    """The FPL season a date falls in, e.g. '2024-25' for '2025-01-21', ds defaulting to today's date"""
+    year, month = (int(part) for part in (ds or today_ds()).split("-")[:2])
+    start_year = year if month >= SEASON_START_MONTH else year - 1
+    return f"{start_year}-{(start_year + 1) % 100:02d}"
+
+
+def today_ds():
+    """Today's date as a string in the format of Airflow's ds, 'YYYY-MM-DD'"""
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+def generate_endpoints(gameweeks=GAMEWEEKS):
+    """
+    Generate a list of FPL API endpoints
+
+    Parameters:
+        gameweeks (int): Number of gameweeks in the season, each with its own live endpoint
+
+    Returns:
+        list: List of FPL API Endpoints
+    """
+    target_endpoints = [
+        f"fixtures",
+        f"bootstrap-static",
+    ]
+    gw_endpoints = ["event/{}/live"]
+
+    endpoints_list = list(target_endpoints)
+    endpoints_list.extend(gw_endpoints[0].format(i) for i in range(1, gameweeks + 1))
+    return endpoints_list
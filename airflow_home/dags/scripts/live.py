@@ -0,0 +1,188 @@
+import os
+import time
+import logging
+import argparse
+from dotenv import load_dotenv
+
+try:
+    from scripts.logs import setup_logging
+    from scripts.helpers import season_of
+    from scripts.extract import retrieve_data
+    from scripts.transform import live_stats_df
+    from scripts.db_setup import PRIMARY_KEYS
+    from scripts.load import create_db_conn, upsert_chunk
+    from scripts.migrations import migrate
+except ImportError:
+    from airflow_home.dags.scripts.logs import setup_logging
+    from airflow_home.dags.scripts.helpers import season_of
+    from airflow_home.dags.scripts.extract import retrieve_data
+    from airflow_home.dags.scripts.transform import live_stats_df
+    from airflow_home.dags.scripts.db_setup import PRIMARY_KEYS
+    from airflow_home.dags.scripts.load import create_db_conn, upsert_chunk
+    from airflow_home.dags.scripts.migrations import migrate
+
+setup_logging()
+
+LIVE_TABLE = "fact_player_stats"
+
+
+def run_live(engine, gameweek_id=None, interval=60, max_polls=None):
+    """
+    Polls the current gameweek's live endpoint and applies only changed player stats to the database
+
+    Parameters:
+        engine (str): SQLAlchemy connection object
+        gameweek_id (int): Gameweek to poll, defaults to the current gameweek
+        interval (int): Seconds from the start of one poll to the start of the next
+        max_polls (int): Number of polls before returning, defaults to polling until interrupted
+
+    Returns:
+        int: Total number of player rows written
+
+    Side Effects:
+        On success - changed rows of fact_player_stats upserted once per poll
+        On failure - error message logged and the poll skipped, the previous poll is kept for the next diff
+    """
+    if gameweek_id is None:
+        gameweek_id = current_gameweek()
+    # the polled gameweek is always under way, so it belongs to today's season
+    season = season_of()
+    dialect = "postgresql" if engine.dialect.name == "postgresql" else "mysql"
+
+    previous = None
+    polls = 0
+    rows_written = 0
+    while max_polls is None or polls < max_polls:
+        start_time = time.perf_counter()
+        try:
+            current = live_stats_df(
+                retrieve_data(f"event/{gameweek_id}/live"), gameweek_id
+            )
+            changed = diff_live_stats(previous, current)
+            apply_live_changes(changed, engine, dialect, season)
+            previous = current
+            rows_written += len(changed)
+            logging.info(
+                f"run_live: gameweek {gameweek_id} poll {polls + 1} - {len(changed)} changed rows applied in {time.perf_counter() - start_time:.2f}s"
+            )
+        except Exception as e:
+            logging.error(
+                f"run_live Error, gameweek {gameweek_id} poll {polls + 1}: {e}"
+            )
+
+        polls += 1
+        elapsed = time.perf_counter() - start_time
+        if elapsed > interval:
+            logging.warning(
+                f"run_live: poll {polls} took {elapsed:.2f}s, longer than the {interval}s interval"
+            )
+        if max_polls is None or polls < max_polls:
+            time.sleep(max(0, interval - elapsed))
+
+    return rows_written
+
+
+def current_gameweek():
+    """
+    Find the current gameweek from the FPL bootstrap-static endpoint
+
+    Parameters:
+        None
+
+    Returns:
+        int: id of the gameweek flagged is_current
+    """
+    events = retrieve_data("bootstrap-static")["events"]
+    for event in events:
+        if event.get("is_current"):
+            return event["id"]
+    raise ValueError("current_gameweek: no gameweek is currently live")
+
+
+def diff_live_stats(previous, current):
+    """
+    Vectorised diff of two polls of live player stats
+
+    Parameters:
+        previous (dataFrame): Previous poll from live_stats_df, or None on the first poll
+        current (dataFrame): Current poll from live_stats_df
+
+    Returns:
+        dataFrame: Rows of current that are new or differ from previous, with player_id as a column
+    """
+    if previous is None:
+        changed = current
+    else:
+        # players missing from the previous poll align as NaN, so always compare unequal
+        aligned = previous.reindex(current.index)
+        changed = current[current.ne(aligned).any(axis=1)]
+    return changed.reset_index()
+
+
+def apply_live_changes(changed_df, engine, dialect="mysql", season=None):
+    """
+    Upserts changed player stats into fact_player_stats in one transaction
+
+    Parameters:
+        changed_df (dataFrame): Rows from diff_live_stats
+        engine (str): SQLAlchemy connection object
+        dialect (str): "mysql" or "postgresql"
+        season (str): Season of the polled gameweek, written to every row, defaults to today's season
+
+    Returns:
+        Nothing
+
+    Side Effects:
+        On success - rows committed together
+        On failure - transaction rolled back, error message logged and exception raised
+    """
+    if changed_df.empty:
+        return
+
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        upsert_chunk(
+            changed_df.assign(season=season or season_of()),
+            cursor,
+            LIVE_TABLE,
+            PRIMARY_KEYS[LIVE_TABLE],
+            dialect,
+        )
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        logging.error(f"apply_live_changes Error: {e}")
+        raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Poll live gameweek stats and apply changed rows to the database"
+    )
+    parser.add_argument("--gameweek", type=int, help="Defaults to the current gameweek")
+    parser.add_argument("--interval", type=int, default=60)
+    parser.add_argument(
+        "--polls", type=int, help="Defaults to polling until interrupted"
+    )
+    args = parser.parse_args()
+
+    load_dotenv()
+    engine = create_db_conn(
+        os.environ["rds_user"],
+        os.environ["rds_password"],
+        os.environ["rds_host"],
+        os.environ["rds_port"],
+        os.environ["rds_db_name"],
+        pool_size=1,
+        dialect=os.environ.get("rds_dialect", "mysql"),
+    )
+    migrate(engine)
+    try:
+        run_live(engine, args.gameweek, args.interval, args.polls)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.dispose()
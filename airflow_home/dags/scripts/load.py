@@ -1,20 +1,81 @@
 import io
+import time
 import logging
+import tempfile
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+import numpy as np
 import pandas as pd
-import boto3
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 from sqlalchemy import create_engine
 
 try:
-    from scripts.helpers import generate_filename
+    from scripts.logs import setup_logging, log_context
+    from scripts.helpers import (
+        generate_filename,
+        today_ds,
+        season_of,
+        TABLE_NAMES,
+        STAR_SCHEMA_TABLES,
+        AGGREGATE_TABLES,
+    )
+    from scripts.db_setup import PRIMARY_KEYS
+    from scripts.seasons import output_tables
+    from scripts.migrations import migrate
+    from scripts.verify import TableChecksum, verify_table
+    from scripts.metrics import timed, record, flushes_metrics
+    from scripts.aws import get_client
 except ImportError:
-    from airflow_home.dags.scripts.helpers import generate_filename
+    from airflow_home.dags.scripts.logs import setup_logging, log_context
+    from airflow_home.dags.scripts.helpers import (
+        generate_filename,
+        today_ds,
+        season_of,
+        TABLE_NAMES,
+        STAR_SCHEMA_TABLES,
+        AGGREGATE_TABLES,
+    )
+    from airflow_home.dags.scripts.db_setup import PRIMARY_KEYS
+    from airflow_home.dags.scripts.seasons import output_tables
+    from airflow_home.dags.scripts.migrations import migrate
+    from airflow_home.dags.scripts.verify import TableChecksum, verify_table
+    from airflow_home.dags.scripts.metrics import timed, record, flushes_metrics
+    from airflow_home.dags.scripts.aws import get_client
 
-logging.basicConfig(filename="logs.log", encoding="utf-8", level=logging.INFO)
+setup_logging()
 
+# MySQL error codes returned when LOAD DATA LOCAL INFILE is disabled on the server or client
+LOCAL_INFILE_DISABLED_ERRORS = (1148, 2068, 3948, 3950)
 
-def load_data(rds_user, rds_password, rds_host, rds_port, rds_db_name, bucket_name):
+# SQLAlchemy driver and bulk-load insert method for each supported database dialect
+DB_DRIVERS = {"mysql": "mysql+pymysql", "postgresql": "postgresql+psycopg2"}
+BULK_LOAD_METHODS = {"mysql": "load_data", "postgresql": "copy"}
+
+
+@flushes_metrics
+def load_data(
+    rds_user,
+    rds_password,
+    rds_host,
+    rds_port,
+    rds_db_name,
+    bucket_name,
+    method="executemany",
+    chunk_size=50000,
+    commit_per_chunk=False,
+    mode="replace",
+    max_workers=4,
+    dialect="mysql",
+    batch_transactions="none",
+    verify=True,
+    tables=None,
+    ds=None,
+):
     """
-    Executes full Load process, invoking create_db_conn, retrieve_s3_parquet & insert_df_into_db
+    Executes full Load process, invoking create_db_conn, migrate and load_table for each table concurrently
 
     Parameters:
         rds_user (str): RDS username
@@ -23,21 +84,334 @@ def load_data(rds_user, rds_password, rds_host, rds_port, rds_db_name, bucket_na
         rds_port (str): RDS port
         rds_db_name (str): RDS database name
         bucket_name (str): Name of the source S3 bucket
+        method (str): Insert strategy - "executemany", "load_data" (MySQL LOAD DATA LOCAL INFILE)
+            or "copy" (PostgreSQL COPY ... FROM STDIN)
+        chunk_size (int): Number of rows read from parquet and inserted per chunk
+        commit_per_chunk (bool): Commit after every chunk rather than once per table
+        mode (str): "replace" to truncate and reinsert every table, "merge" to upsert only changed rows,
+            "swap" to load staging copies of every table and atomically rename them into place
+        max_workers (int): Number of tables loaded in parallel, each over its own pooled connection
+        dialect (str): Target database - "mysql" or "postgresql"
+        batch_transactions (str): How executemany INSERT batches are committed - see AdaptiveBatcher
+        verify (bool): Compare server-side row counts and column checksums against the source data
+            after loading each table - see verify_table
+        tables (dict): dataFrames or Arrow tables keyed by table name, loaded from memory instead of
+            the parquet files in bucket_name
+        ds (str): Logical date of the run (YYYY-MM-DD), selecting the parquet files read, defaults to today
+
+    Returns:
+        dict: Inserted/updated/deleted row counts per table in merge mode, otherwise Nothing
+
+    Side Effects:
+        On success - parquet files streamed from S3 bucket and inserted into SQL tables chunk by chunk,
+            aggregate tables without a file for ds (runs from before they were added) left untouched
+        On failure - exception from the first failed table raised, so the task fails
+        On failure in swap mode - staging tables dropped, live tables left untouched
+        On verification mismatch - ValueError raised, in swap mode before the live tables are replaced
+    """
+    if method in BULK_LOAD_METHODS.values() and method != BULK_LOAD_METHODS[dialect]:
+        raise ValueError(f"load_data: method {method} is not supported for {dialect}")
+
+    conn = create_db_conn(
+        rds_user,
+        rds_password,
+        rds_host,
+        rds_port,
+        rds_db_name,
+        pool_size=max_workers,
+        dialect=dialect,
+    )
+    migrate(conn)
+
+    # resolve the date once, so every table is read from the same prefix
+    ds = ds or today_ds()
+    table_names = TABLE_NAMES if tables is not None else stored_tables(bucket_name, ds)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                table: executor.submit(
+                    load_table,
+                    table,
+                    conn,
+                    bucket_name,
+                    method,
+                    chunk_size,
+                    commit_per_chunk,
+                    mode,
+                    batch_transactions,
+                    verify,
+                    None if tables is None else tables[table],
+                    ds,
+                )
+                for table in table_names
+            }
+            # result() re-raises any exception from the worker thread
+            results = {table: future.result() for table, future in futures.items()}
+
+        if mode == "swap":
+            swap_staging_tables(conn, table_names)
+    finally:
+        if mode == "swap":
+            drop_staging_tables(conn, table_names)
+        conn.dispose()
+
+    if mode == "merge":
+        return results
+
+
+@timed
+def load_table(
+    table_name,
+    engine,
+    bucket_name,
+    method="executemany",
+    chunk_size=50000,
+    commit_per_chunk=False,
+    mode="replace",
+    batch_transactions="none",
+    verify=True,
+    table=None,
+    ds=None,
+):
+    """
+    Streams one table's parquet file from S3, or its in-memory table, and loads it into its SQL table
+
+    Parameters:
+        table_name (str): Name of the table, used for both the S3 key and the SQL table
+        engine (str): SQLAlchemy connection object
+        bucket_name (str): Name of the source S3 bucket
+        method (str): Insert strategy - "executemany" or "load_data" (LOAD DATA LOCAL INFILE)
+        chunk_size (int): Number of rows read from parquet and inserted per chunk
+        commit_per_chunk (bool): Commit after every chunk rather than once per table
+        mode (str): "replace", "merge" or "swap" - see load_data
+        batch_transactions (str): How executemany INSERT batches are committed - see AdaptiveBatcher
+        verify (bool): Checksum the source batches as they stream past and verify the loaded table
+        table (dataFrame or pyarrow Table): Source data to load instead of the parquet file
+        ds (str): Logical date of the run (YYYY-MM-DD), selecting the parquet file read, and the
+            season whose rows are replaced - rows of other seasons are left untouched
+
+    Returns:
+        dict: Inserted/updated/deleted row counts in merge mode, otherwise Nothing
+    """
+    with log_context(stage="load", table=table_name):
+        season = season_of(ds)
+        # executemany inserts straight from Arrow, skipping the conversion to pandas
+        as_arrow = method == "executemany" and mode != "merge"
+        if table is not None:
+            batches = iter_table_batches(table, chunk_size, as_arrow=as_arrow)
+        else:
+            file_path = f"{generate_filename(table_name, ds)}.parquet"
+            batches = iter_s3_parquet_batches(
+                bucket_name, file_path, chunk_size, as_arrow=as_arrow
+            )
+
+        if verify:
+            checksum = TableChecksum(engine.dialect.name)
+            batches = checksum.track(batches)
+
+        counts = None
+        if mode == "merge":
+            counts = merge_batches_into_db(
+                batches,
+                engine,
+                table_name,
+                PRIMARY_KEYS[table_name],
+                commit_per_chunk,
+                season,
+            )
+        elif mode == "swap":
+            stage_batches_into_db(
+                batches,
+                engine,
+                table_name,
+                method,
+                commit_per_chunk,
+                batch_transactions,
+                season,
+            )
+        else:
+            insert_batches_into_db(
+                batches,
+                engine,
+                table_name,
+                method,
+                commit_per_chunk,
+                batch_transactions,
+                season,
+            )
+
+        if verify:
+            # swap mode verifies the staging copy, before it replaces the live table
+            loaded_table = f"{table_name}_staging" if mode == "swap" else table_name
+            verify_table(engine, loaded_table, checksum, season)
+
+        return counts
+
+
+@flushes_metrics
+def prepare_db(
+    rds_user, rds_password, rds_host, rds_port, rds_db_name, dialect="mysql"
+):
+    """
+    Applies pending schema migrations, before tables are loaded by separate load_single_table tasks
+
+    Parameters:
+        rds_user (str): RDS username
+        rds_password (str): RDS password
+        rds_host (str): RDS hostname
+        rds_port (str): RDS port
+        rds_db_name (str): RDS database name
+        dialect (str): Target database - "mysql" or "postgresql"
+
+    Returns:
+        int: Schema version of the database after migrating
+    """
+    conn = create_db_conn(
+        rds_user,
+        rds_password,
+        rds_host,
+        rds_port,
+        rds_db_name,
+        pool_size=1,
+        dialect=dialect,
+    )
+    try:
+        return migrate(conn)
+    finally:
+        conn.dispose()
+
+
+@flushes_metrics
+def load_single_table(
+    rds_user,
+    rds_password,
+    rds_host,
+    rds_port,
+    rds_db_name,
+    bucket_name,
+    table_name,
+    method="executemany",
+    chunk_size=50000,
+    commit_per_chunk=False,
+    mode="replace",
+    dialect="mysql",
+    batch_transactions="none",
+    verify=True,
+    ds=None,
+):
+    """
+    Loads one table over its own connection, so each table can run (and retry) as its own task
+
+    Expects prepare_db to have run first, and in swap mode swap_tables to run once every table is staged
+
+    Parameters:
+        table_name (str): Name of the table to load, one of TABLE_NAMES
+        Others - see load_data
+
+    Returns:
+        dict: Inserted/updated/deleted row counts in merge mode, otherwise Nothing
+    """
+    if method in BULK_LOAD_METHODS.values() and method != BULK_LOAD_METHODS[dialect]:
+        raise ValueError(
+            f"load_single_table: method {method} is not supported for {dialect}"
+        )
+    ds = ds or today_ds()
+    if table_name in AGGREGATE_TABLES and table_name not in output_tables(
+        bucket_name, ds
+    ):
+        logging.info(f"load_single_table: no {table_name} file for {ds}, skipped")
+        return None
+
+    conn = create_db_conn(
+        rds_user,
+        rds_password,
+        rds_host,
+        rds_port,
+        rds_db_name,
+        pool_size=1,
+        dialect=dialect,
+    )
+    try:
+        return load_table(
+            table_name,
+            conn,
+            bucket_name,
+            method,
+            chunk_size,
+            commit_per_chunk,
+            mode,
+            batch_transactions,
+            verify,
+            ds=ds,
+        )
+    finally:
+        conn.dispose()
+
+
+@flushes_metrics
+def swap_tables(
+    rds_user,
+    rds_password,
+    rds_host,
+    rds_port,
+    rds_db_name,
+    bucket_name,
+    dialect="mysql",
+    ds=None,
+):
+    """
+    Swaps the staging tables of every loaded table into place, after swap mode load_single_table tasks
+
+    Parameters:
+        rds_user (str): RDS username
+        rds_password (str): RDS password
+        rds_host (str): RDS hostname
+        rds_port (str): RDS port
+        rds_db_name (str): RDS database name
+        bucket_name (str): Name of the source S3 bucket, listing the tables that were staged
+        dialect (str): Target database - "mysql" or "postgresql"
+        ds (str): Logical date of the run (YYYY-MM-DD), defaults to today
 
     Returns:
         Nothing
 
     Side Effects:
-        On success - parquet files fetched from S3 bucket and inserted into SQL tables
+        On success - live tables replaced by their staging copies in one step
+        Always - leftover staging tables dropped
     """
-    conn = create_db_conn(rds_user, rds_password, rds_host, rds_port, rds_db_name)
+    conn = create_db_conn(
+        rds_user,
+        rds_password,
+        rds_host,
+        rds_port,
+        rds_db_name,
+        pool_size=1,
+        dialect=dialect,
+    )
+    try:
+        swap_staging_tables(conn, stored_tables(bucket_name, ds or today_ds()))
+    finally:
+        drop_staging_tables(conn, TABLE_NAMES)
+        conn.dispose()
 
-    tables = ["fact_players", "dim_players", "dim_teams", "dim_fixtures"]
 
-    for table in tables:
-        file_path = f"{generate_filename(table)}.parquet"
-        df = retrieve_s3_parquet(bucket_name, file_path)
-        insert_df_into_db(df, conn, table)
+def stored_tables(bucket_name, ds):
+    """
+    The tables loaded for a date - every star schema table, and the aggregate tables with a parquet
+    file under its prefix, as runs from before the aggregates were added have none
+
+    Parameters:
+        bucket_name (str): Name of the source S3 bucket
+        ds (str): Logical date of the run (YYYY-MM-DD)
+
+    Returns:
+        list: Table names, in TABLE_NAMES order
+    """
+    aggregate_tables = set(output_tables(bucket_name, ds)) & set(AGGREGATE_TABLES)
+    return STAR_SCHEMA_TABLES + [
+        table_name for table_name in AGGREGATE_TABLES if table_name in aggregate_tables
+    ]
 
 
 def retrieve_s3_parquet(bucket_name, file_name):
@@ -55,7 +429,7 @@ def retrieve_s3_parquet(bucket_name, file_name):
         On failure - error message logged
     """
     try:
-        s3 = boto3.client("s3")
+        s3 = get_client("s3")
         response = s3.get_object(
             Bucket=bucket_name,
             Key=file_name,
@@ -68,9 +442,174 @@ def retrieve_s3_parquet(bucket_name, file_name):
         raise
 
 
-def create_db_conn(rds_user, rds_password, rds_host, rds_port, rds_db_name):
+def iter_s3_parquet_batches(
+    bucket_name,
+    file_name,
+    batch_size=50000,
+    columns=None,
+    row_filter=None,
+    as_arrow=False,
+):
     """
-    Creates a SQLAlchemy MySQL database connection
+    Streams a Parquet file from s3 bucket as a sequence of record batches, using ranged GETs
+
+    Parameters:
+        bucket_name (str): Name of the source S3 bucket
+        file_name (str):  Name of the file (key)
+        batch_size (int): Maximum number of rows per yielded batch
+        columns (list): Columns to read, defaults to all columns
+        row_filter (dict): Column name to allowed values, e.g. {"gameweek_id": [20, 21]} - row groups
+            whose statistics exclude every allowed value are never fetched
+        as_arrow (bool): Yield pyarrow RecordBatches instead of Pandas dataFrames
+
+    Yields:
+        dataFrame or RecordBatch: Next record batch of the Parquet file
+
+    Side Effects:
+        Only the footer and the requested column chunks are fetched, so only one batch is held in memory
+        On failure - error message logged
+    """
+    try:
+        s3 = get_client("s3")
+        with S3RangeFile(s3, bucket_name, file_name) as s3_file:
+            parquet_file = pq.ParquetFile(s3_file)
+            row_groups = select_row_groups(parquet_file.metadata, row_filter)
+
+            for batch in parquet_file.iter_batches(
+                batch_size=batch_size, columns=columns, row_groups=row_groups
+            ):
+                for column, values in (row_filter or {}).items():
+                    batch = batch.filter(pc.is_in(batch[column], pa.array(values)))
+                yield batch if as_arrow else batch.to_pandas()
+
+            record(byte_count=s3_file.bytes_fetched)
+            logging.info(
+                f"iter_s3_parquet_batches: {file_name} retrieved successfully ({s3_file.bytes_fetched} of {s3_file.size} bytes in {s3_file.request_count} requests)"
+            )
+    except Exception as e:
+        logging.error(f"iter_s3_parquet_batches Error: {e}")
+        raise
+
+
+def iter_table_batches(table, batch_size=50000, as_arrow=False):
+    """
+    Splits an in-memory table into record batches, as iter_s3_parquet_batches yields them from S3
+
+    Parameters:
+        table (dataFrame or pyarrow Table): The table to split
+        batch_size (int): Maximum number of rows per yielded batch
+        as_arrow (bool): Yield pyarrow RecordBatches instead of Pandas dataFrames
+
+    Yields:
+        dataFrame or RecordBatch: Next record batch of the table
+    """
+    if not isinstance(table, pa.Table):
+        table = pa.Table.from_pandas(table, preserve_index=False)
+    for batch in table.to_batches(max_chunksize=batch_size):
+        yield batch if as_arrow else batch.to_pandas()
+
+
+def select_row_groups(metadata, row_filter=None):
+    """
+    Select the row groups of a Parquet file which may hold rows matching a filter
+
+    Parameters:
+        metadata (FileMetaData): Parquet file metadata
+        row_filter (dict): Column name to allowed values
+
+    Returns:
+        list: Indexes of row groups whose min/max statistics overlap the allowed values of every column
+    """
+    row_groups = list(range(metadata.num_row_groups))
+    if not row_filter:
+        return row_groups
+
+    column_indexes = {
+        metadata.schema.column(i).name: i for i in range(metadata.num_columns)
+    }
+    selected = []
+    for row_group in row_groups:
+        keep = True
+        for column, values in row_filter.items():
+            statistics = (
+                metadata.row_group(row_group).column(column_indexes[column]).statistics
+            )
+            if statistics is None or not statistics.has_min_max:
+                continue
+            if not any(statistics.min <= value <= statistics.max for value in values):
+                keep = False
+        if keep:
+            selected.append(row_group)
+    return selected
+
+
+class S3RangeFile(io.RawIOBase):
+    """
+    Read-only, seekable file over an S3 object, fetching only the requested bytes with ranged GETs
+
+    Parameters:
+        s3 (S3.Client): boto3 S3 client
+        bucket_name (str): Name of the source S3 bucket
+        file_name (str):  Name of the file (key)
+    """
+
+    def __init__(self, s3, bucket_name, file_name):
+        self.s3 = s3
+        self.bucket_name = bucket_name
+        self.file_name = file_name
+        self.size = s3.head_object(Bucket=bucket_name, Key=file_name)["ContentLength"]
+        self.position = 0
+        self.bytes_fetched = 0
+        self.request_count = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self.position = offset
+        elif whence == io.SEEK_CUR:
+            self.position += offset
+        elif whence == io.SEEK_END:
+            self.position = self.size + offset
+        return self.position
+
+    def readinto(self, buffer):
+        if self.position >= self.size or len(buffer) == 0:
+            return 0
+
+        end = min(self.position + len(buffer), self.size) - 1
+        response = self.s3.get_object(
+            Bucket=self.bucket_name,
+            Key=self.file_name,
+            Range=f"bytes={self.position}-{end}",
+        )
+        data = response["Body"].read()
+
+        buffer[: len(data)] = data
+        self.position += len(data)
+        self.bytes_fetched += len(data)
+        self.request_count += 1
+        return len(data)
+
+
+def create_db_conn(
+    rds_user,
+    rds_password,
+    rds_host,
+    rds_port,
+    rds_db_name,
+    pool_size=4,
+    dialect="mysql",
+):
+    """
+    Creates a pooled SQLAlchemy MySQL or PostgreSQL database connection
 
     Parameters:
         rds_user (str): RDS username
@@ -78,25 +617,43 @@ def create_db_conn(rds_user, rds_password, rds_host, rds_port, rds_db_name):
         rds_host (str): RDS hostname
         rds_port (str): RDS port
         rds_db_name (str): RDS database name
+        pool_size (int): Number of pooled connections, one per concurrently loaded table
+        dialect (str): Target database - "mysql" or "postgresql"
 
     Returns:
         SQLAlchemy Engine: db connection for provided credentials
 
     Side Effects:
-        On failure - error message logged
+        On failure - error message logged and exception raised
     """
     try:
-        conn_str = f"mysql+pymysql://{rds_user}:{rds_password}@{rds_host}:{rds_port}/{rds_db_name}"
-        engine = create_engine(conn_str)
-        with engine.connect() as conn:
-            print("Database connection successful!")
+        conn_str = f"{DB_DRIVERS[dialect]}://{rds_user}:{rds_password}@{rds_host}:{rds_port}/{rds_db_name}"
+        # local_infile allows the client to send files for LOAD DATA LOCAL INFILE,
+        # pre_ping replaces connections dropped by RDS instead of failing the first query
+        engine = create_engine(
+            conn_str,
+            connect_args={"local_infile": True} if dialect == "mysql" else {},
+            pool_size=pool_size,
+            max_overflow=0,
+            pool_pre_ping=True,
+            pool_recycle=3600,
+        )
         logging.info(f"create_db_conn: DB Connection Engine created successfully")
         return engine
     except Exception as e:
         logging.error(f"create_db_conn Error: , {e}")
+        raise
 
 
-def insert_df_into_db(df, engine, table_name):
+@timed
+def insert_df_into_db(
+    df,
+    engine,
+    table_name,
+    method="executemany",
+    chunk_size=None,
+    commit_per_chunk=False,
+):
     """
     Insert data into an SQL table
 
@@ -104,28 +661,729 @@ def insert_df_into_db(df, engine, table_name):
         df (dataFrame): dataFrame to be inserted into SQL table
         engine (str): SQLAlchemy connection object
         table_name (str): Name of target SQL Table
+        method (str): Insert strategy - "executemany" or "load_data" (LOAD DATA LOCAL INFILE)
+        chunk_size (int): Number of rows inserted per chunk, or None to insert in one go
+        commit_per_chunk (bool): Commit after every chunk rather than once per table
 
     Returns:
         Nothing
 
     Side Effects:
         On success - SQL table updated, success message logged
-        On failure - error message logged
+        On failure - error message logged and exception raised
+    """
+    if chunk_size is None:
+        chunks = [df]
+    else:
+        chunks = (df.iloc[i : i + chunk_size] for i in range(0, len(df), chunk_size))
+
+    insert_batches_into_db(chunks, engine, table_name, method, commit_per_chunk)
+
+
+@timed
+def insert_batches_into_db(
+    batches,
+    engine,
+    table_name,
+    method="executemany",
+    commit_per_chunk=False,
+    batch_transactions="none",
+    season=None,
+):
+    """
+    Replace the contents of an SQL table, or of one season's rows, with a stream of dataFrame chunks
+
+    Parameters:
+        batches (iterable): dataFrames to be inserted into SQL table, in order
+        engine (str): SQLAlchemy connection object
+        table_name (str): Name of target SQL Table
+        method (str): Insert strategy - "executemany" or "load_data" (LOAD DATA LOCAL INFILE)
+        commit_per_chunk (bool): Commit after every chunk rather than once per table
+        batch_transactions (str): How executemany INSERT batches are committed - see AdaptiveBatcher
+        season (str): Season whose rows are replaced, or None to replace the whole table
+
+    Returns:
+        Nothing
+
+    Side Effects:
+        On success - SQL table (or the season's rows) emptied and refilled, success message logged
+        On failure - error message logged and exception raised
     """
+    # fetch the first chunk before truncating, so a failed read leaves the table intact
+    batches = iter(batches)
+    first_batch = next(batches, None)
+    batches = itertools.chain([first_batch], batches) if first_batch is not None else []
+
+    start_time = time.perf_counter()
+    conn = engine.raw_connection()
     try:
-        table_column_names_str = ", ".join(list(df))
-        values_placeholders = "%s, " * len(list(df))
-        values_placeholders_strip = values_placeholders[:-2]
+        cursor = conn.cursor()
+        batcher = create_batcher(cursor, engine.dialect.name, batch_transactions)
+        if season is None:
+            cursor.execute(f"TRUNCATE TABLE {table_name};")
+        else:
+            cursor.execute(f"DELETE FROM {table_name} WHERE season = %s", (season,))
+
+        row_count = 0
+        for chunk in batches:
+            method = insert_chunk(chunk, cursor, table_name, method, batcher)
+            row_count += len(chunk)
+            if commit_per_chunk:
+                conn.commit()
+
+        conn.commit()
+
+        elapsed = time.perf_counter() - start_time
+        record(row_count=row_count)
+        logging.info(
+            f"insert_df_into_db: {table_name} updated! {row_count} rows via {method} ({row_count / max(elapsed, 1e-9):.0f} rows/sec)"
+        )
+    except Exception as e:
+        logging.error(f"insert_df_into_db Error, Table {table_name}: {e}")
+        raise
+    finally:
+        conn.close()
+
+
+def insert_chunk(df, cursor, table_name, method="executemany", batcher=None):
+    """
+    Insert a single dataFrame or Arrow chunk into an SQL table, without committing
+
+    Parameters:
+        df (dataFrame or RecordBatch): chunk to be inserted
+        cursor (Cursor): DB-API cursor
+        table_name (str): Name of target SQL Table
+        method (str): Insert strategy - "executemany", "load_data" (MySQL LOAD DATA LOCAL INFILE)
+            or "copy" (PostgreSQL COPY ... FROM STDIN)
+        batcher (AdaptiveBatcher): Splits executemany into sized batches, or None for a single executemany
+
+    Returns:
+        str: The method actually used, "executemany" if load_data fell back
+    """
+    if method in ("load_data", "copy") and isinstance(df, (pa.RecordBatch, pa.Table)):
+        df = df.to_pandas()
+
+    if method == "copy":
+        copy_df_into_table(df, cursor, table_name)
+        return method
+
+    if method == "load_data":
+        try:
+            load_df_infile(df, cursor, table_name)
+            return method
+        except Exception as e:
+            # fall back to executemany if the server disallows local infile
+            if not e.args or e.args[0] not in LOCAL_INFILE_DISABLED_ERRORS:
+                raise
+            logging.warning(
+                f"insert_chunk: LOAD DATA LOCAL INFILE disabled, falling back to executemany for {table_name}: {e}"
+            )
+            method = "executemany"
+
+    if isinstance(df, (pa.RecordBatch, pa.Table)):
+        # Arrow converts nulls, dates and times straight to native Python values
+        column_names = df.schema.names
+        values_list = list(zip(*(column.to_pylist() for column in df.columns)))
+    else:
+        column_names = list(df)
         values_list = [tuple(x) for x in df.values.tolist()]
-        sql = f"INSERT INTO {table_name} ({table_column_names_str}) VALUES ({values_placeholders_strip})"
 
-        conn = engine.raw_connection()
-        cursor = conn.cursor()
-        cursor.execute(f"TRUNCATE TABLE {table_name};")
+    table_column_names_str = ", ".join(column_names)
+    values_placeholders = "%s, " * len(column_names)
+    values_placeholders_strip = values_placeholders[:-2]
+    sql = f"INSERT INTO {table_name} ({table_column_names_str}) VALUES ({values_placeholders_strip})"
+    if batcher is None:
         cursor.executemany(sql, values_list)
+    else:
+        batcher.execute(cursor, sql, values_list)
+    return method
+
+
+def read_server_limits(cursor):
+    """
+    Reads the MySQL server variables which bound the size of INSERT statements and transactions
+
+    Parameters:
+        cursor (Cursor): DB-API cursor on a MySQL connection
+
+    Returns:
+        dict: Variable name to value in bytes, for the variables the server reports
+    """
+    cursor.execute(
+        "SHOW VARIABLES WHERE Variable_name IN ('max_allowed_packet', 'innodb_log_file_size', 'innodb_redo_log_capacity')"
+    )
+    return {name: int(value) for name, value in cursor.fetchall()}
+
+
+def create_batcher(cursor, dialect="mysql", transactions="none"):
+    """
+    Creates an AdaptiveBatcher sized to the server's limits
+
+    Batches are kept under half of max_allowed_packet, and under a tenth of the redo log,
+    so a batch never fails for packet size or forces a redo log checkpoint
+
+    Parameters:
+        cursor (Cursor): DB-API cursor
+        dialect (str): "mysql" reads server limits, other dialects use the defaults
+        transactions (str): "none", "commit" or "savepoint" - see AdaptiveBatcher
+
+    Returns:
+        AdaptiveBatcher: batcher for inserts over this connection
+    """
+    if dialect == "postgresql":
+        return AdaptiveBatcher(transactions=transactions)
+
+    limits = read_server_limits(cursor)
+    max_allowed_packet = limits.get("max_allowed_packet", 4 * 2**20)
+    redo_log_bytes = limits.get("innodb_redo_log_capacity") or limits.get(
+        "innodb_log_file_size", 48 * 2**20
+    )
+    max_batch_bytes = min(max_allowed_packet // 2, redo_log_bytes // 10)
+    logging.info(
+        f"create_batcher: max_allowed_packet {max_allowed_packet}, redo log {redo_log_bytes}, batches up to {max_batch_bytes} bytes"
+    )
+    return AdaptiveBatcher(max_batch_bytes, transactions=transactions)
+
+
+class AdaptiveBatcher:
+    """
+    Splits executemany inserts into batches sized by estimated bytes, and adjusts the
+    batch size towards a target per-batch latency
+
+    Parameters:
+        max_batch_bytes (int): Upper bound on the estimated size of one batch
+        transactions (str): "none" to leave commits to the caller, "commit" to commit after every batch,
+            "savepoint" to wrap every batch in a savepoint and retry it at half size if it fails
+        target_seconds (float): Per-batch latency the batch size is adjusted towards
+        min_rows (int): Smallest batch size
+    """
+
+    def __init__(
+        self,
+        max_batch_bytes=2**20,
+        transactions="none",
+        target_seconds=0.5,
+        min_rows=50,
+    ):
+        self.max_batch_bytes = max_batch_bytes
+        self.transactions = transactions
+        self.target_seconds = target_seconds
+        self.min_rows = min_rows
+        self.batch_rows = None
+        self.batch_count = 0
+
+    def max_rows(self, values_list):
+        """Number of rows fitting in max_batch_bytes, estimated from a sample of rows"""
+        sample = values_list[:100]
+        row_bytes = sum(len(repr(row)) for row in sample) / len(sample)
+        return max(self.min_rows, int(self.max_batch_bytes // row_bytes))
+
+    def next_batch_rows(self, rows, seconds):
+        """Scale the batch size towards target_seconds, by at most 2x per batch"""
+        scale = min(max(self.target_seconds / max(seconds, 1e-6), 0.5), 2.0)
+        return max(self.min_rows, int(rows * scale))
+
+    def execute(self, cursor, sql, values_list):
+        """
+        Insert values_list with cursor.executemany, one sized batch at a time
+
+        Parameters:
+            cursor (Cursor): DB-API cursor
+            sql (str): INSERT statement with placeholders
+            values_list (list): Row tuples to insert
+
+        Returns:
+            Nothing
+        """
+        if not values_list:
+            return
+
+        max_rows = self.max_rows(values_list)
+        if hasattr(cursor, "max_stmt_length"):
+            # let PyMySQL send each batch as a single multi-row INSERT
+            cursor.max_stmt_length = self.max_batch_bytes
+
+        position = 0
+        while position < len(values_list):
+            rows = min(self.batch_rows or max_rows, max_rows)
+            batch = values_list[position : position + rows]
+
+            start_time = time.perf_counter()
+            try:
+                if self.transactions == "savepoint":
+                    cursor.execute("SAVEPOINT insert_batch")
+                cursor.executemany(sql, batch)
+                if self.transactions == "savepoint":
+                    cursor.execute("RELEASE SAVEPOINT insert_batch")
+            except Exception as e:
+                if self.transactions != "savepoint" or len(batch) <= self.min_rows:
+                    raise
+                cursor.execute("ROLLBACK TO SAVEPOINT insert_batch")
+                self.batch_rows = max(self.min_rows, len(batch) // 2)
+                record(retries=1)
+                logging.warning(
+                    f"AdaptiveBatcher: batch of {len(batch)} rows failed, retrying with {self.batch_rows}: {e}"
+                )
+                continue
+
+            if self.transactions == "commit":
+                cursor.connection.commit()
+
+            self.batch_rows = self.next_batch_rows(
+                len(batch), time.perf_counter() - start_time
+            )
+            self.batch_count += 1
+            position += len(batch)
+
+
+@timed
+def stage_batches_into_db(
+    batches,
+    engine,
+    table_name,
+    method="executemany",
+    commit_per_chunk=False,
+    batch_transactions="none",
+    season=None,
+):
+    """
+    Load a stream of dataFrame chunks into a fresh staging copy of an SQL table and validate it
+
+    Parameters:
+        batches (iterable): dataFrames holding the complete new contents of the table
+        engine (str): SQLAlchemy connection object
+        table_name (str): Name of the live SQL Table, the staging copy is {table_name}_staging
+        method (str): Insert strategy - "executemany" or "load_data" (LOAD DATA LOCAL INFILE)
+        commit_per_chunk (bool): Commit after every chunk rather than once per table
+        batch_transactions (str): How executemany INSERT batches are committed - see AdaptiveBatcher
+        season (str): Season the batches replace - the live table's other seasons are copied into
+            the staging table first - or None when the batches replace the whole table
+
+    Returns:
+        int: Number of rows loaded into the staging table
+
+    Side Effects:
+        On success - {table_name}_staging created with the live table's definition and filled
+        On failure - error message logged and exception raised, live table untouched
+    """
+    staging_table = f"{table_name}_staging"
+
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS {staging_table}")
+        if engine.dialect.name == "postgresql":
+            cursor.execute(
+                f"CREATE TABLE {staging_table} (LIKE {table_name} INCLUDING ALL)"
+            )
+        else:
+            cursor.execute(f"CREATE TABLE {staging_table} LIKE {table_name}")
+        if season is not None:
+            cursor.execute(
+                f"INSERT INTO {staging_table} SELECT * FROM {table_name} WHERE season <> %s",
+                (season,),
+            )
+        batcher = create_batcher(cursor, engine.dialect.name, batch_transactions)
+
+        row_count = 0
+        for chunk in batches:
+            method = insert_chunk(chunk, cursor, staging_table, method, batcher)
+            row_count += len(chunk)
+            if commit_per_chunk:
+                conn.commit()
+
         conn.commit()
-        logging.info(f"insert_df_into_db: {table_name} updated!")
+
+        # validate the staging table holds every row before it can be swapped in
+        if season is None:
+            cursor.execute(f"SELECT COUNT(*) FROM {staging_table}")
+        else:
+            cursor.execute(
+                f"SELECT COUNT(*) FROM {staging_table} WHERE season = %s", (season,)
+            )
+        staged_count = cursor.fetchone()[0]
+        # an empty load means a failed transform, except for the aggregates before the first gameweek
+        empty = row_count == 0 and table_name not in AGGREGATE_TABLES
+        if empty or staged_count != row_count:
+            raise ValueError(
+                f"{staging_table} holds {staged_count} rows, expected {row_count}"
+            )
+
+        record(row_count=row_count)
+        logging.info(
+            f"stage_batches_into_db: {staging_table} loaded with {row_count} rows"
+        )
+        return row_count
     except Exception as e:
-        logging.error(f"insert_df_into_db Error, Table {table_name}: {e}")
+        logging.error(f"stage_batches_into_db Error, Table {table_name}: {e}")
+        raise
     finally:
         conn.close()
+
+
+def swap_staging_tables(engine, table_names):
+    """
+    Atomically swap staging tables into place with a single RENAME TABLE statement (one transaction on PostgreSQL)
+
+    Parameters:
+        engine (str): SQLAlchemy connection object
+        table_names (list): Names of the live SQL Tables, each with a loaded {table_name}_staging copy
+
+    Returns:
+        Nothing
+
+    Side Effects:
+        On success - every live table replaced by its staging copy in one step, previous tables dropped
+        On failure - error message logged and exception raised, live tables untouched
+    """
+    renames = []
+    for table_name in table_names:
+        renames.append(f"{table_name} TO {table_name}_old")
+        renames.append(f"{table_name}_staging TO {table_name}")
+    old_tables_str = ", ".join(f"{table_name}_old" for table_name in table_names)
+
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS {old_tables_str}")
+        if engine.dialect.name == "postgresql":
+            # PostgreSQL DDL is transactional, so the renames apply atomically on commit
+            for rename in renames:
+                old_name, new_name = rename.split(" TO ")
+                cursor.execute(f"ALTER TABLE {old_name} RENAME TO {new_name}")
+            conn.commit()
+        else:
+            cursor.execute(f"RENAME TABLE {', '.join(renames)}")
+        cursor.execute(f"DROP TABLE IF EXISTS {old_tables_str}")
+        conn.commit()
+        logging.info(f"swap_staging_tables: {', '.join(table_names)} swapped in!")
+    except Exception as e:
+        logging.error(f"swap_staging_tables Error: {e}")
+        raise
+    finally:
+        conn.close()
+
+
+def drop_staging_tables(engine, table_names):
+    """
+    Drop any leftover staging tables
+
+    Parameters:
+        engine (str): SQLAlchemy connection object
+        table_names (list): Names of the live SQL Tables whose {table_name}_staging copies are dropped
+
+    Returns:
+        Nothing
+    """
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        staging_tables_str = ", ".join(
+            f"{table_name}_staging" for table_name in table_names
+        )
+        cursor.execute(f"DROP TABLE IF EXISTS {staging_tables_str}")
+        # PostgreSQL DDL is transactional, closing without a commit would roll the drop back
+        conn.commit()
+    finally:
+        conn.close()
+
+
+@timed
+def merge_batches_into_db(
+    batches, engine, table_name, primary_key, commit_per_chunk=False, season=None
+):
+    """
+    Merge a stream of dataFrame chunks into an SQL table, writing only the rows that changed
+
+    Parameters:
+        batches (iterable): dataFrames holding the complete new contents of the table
+        engine (str): SQLAlchemy connection object
+        table_name (str): Name of target SQL Table
+        primary_key (list): Primary key column names of the table
+        commit_per_chunk (bool): Commit after every chunk rather than once per table
+        season (str): Season the batches hold, so only its rows are compared and deleted,
+            or None when the batches hold the whole table
+
+    Returns:
+        dict: Number of rows inserted, updated and deleted
+
+    Side Effects:
+        On success - new and changed rows upserted with INSERT ... ON DUPLICATE KEY UPDATE
+        (ON CONFLICT ... DO UPDATE on PostgreSQL), rows missing from the batches deleted, change counts logged
+        On failure - changes rolled back, error message logged and exception raised
+    """
+    # fetch the first chunk before reading the table, so a failed read leaves it untouched
+    batches = iter(batches)
+    first_batch = next(batches, None)
+    if first_batch is None:
+        logging.error(
+            f"merge_batches_into_db Error, Table {table_name}: no rows to merge"
+        )
+        return {"inserted": 0, "updated": 0, "deleted": 0}
+
+    columns = list(first_batch)
+    change_counts = {"inserted": 0, "updated": 0, "deleted": 0}
+
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+
+        # current table state, keyed by encoded primary key
+        if season is None:
+            cursor.execute(f"SELECT {', '.join(columns)} FROM {table_name}")
+        else:
+            cursor.execute(
+                f"SELECT {', '.join(columns)} FROM {table_name} WHERE season = %s",
+                (season,),
+            )
+        current_df = pd.DataFrame(list(cursor.fetchall()), columns=columns)
+        current_keys = encode_load_data_rows(current_df[primary_key])
+        current_rows = pd.Series(
+            encode_load_data_rows(current_df).values,
+            index=current_keys.values,
+            dtype=object,
+        )
+        current_rows = current_rows[~current_rows.index.duplicated()]
+        seen_keys = set()
+
+        for chunk in itertools.chain([first_batch], batches):
+            inserts, updates, chunk_keys = diff_against_table(
+                chunk, current_rows, primary_key
+            )
+            seen_keys.update(chunk_keys)
+
+            changed_df = pd.concat([inserts, updates])
+            if not changed_df.empty:
+                upsert_chunk(
+                    changed_df, cursor, table_name, primary_key, engine.dialect.name
+                )
+            change_counts["inserted"] += len(inserts)
+            change_counts["updated"] += len(updates)
+
+            if commit_per_chunk:
+                conn.commit()
+
+        # delete rows whose key no longer appears in the source data
+        deleted_mask = ~current_keys.isin(seen_keys).values
+        deleted_keys_df = current_df.loc[deleted_mask, primary_key]
+        if not deleted_keys_df.empty:
+            delete_keys(deleted_keys_df, cursor, table_name)
+        change_counts["deleted"] = len(deleted_keys_df)
+
+        conn.commit()
+        record(row_count=sum(change_counts.values()))
+        logging.info(f"merge_batches_into_db: {table_name} merged! {change_counts}")
+    except Exception as e:
+        conn.rollback()
+        logging.error(f"merge_batches_into_db Error, Table {table_name}: {e}")
+        raise
+    finally:
+        conn.close()
+
+    return change_counts
+
+
+def diff_against_table(df, current_rows, primary_key):
+    """
+    Compare a dataFrame chunk against the current contents of its SQL table
+
+    Parameters:
+        df (dataFrame): Incoming rows
+        current_rows (Series): Encoded current rows, indexed by encoded primary key
+        primary_key (list): Primary key column names of the table
+
+    Returns:
+        tuple: (dataFrame of new rows, dataFrame of changed rows, list of encoded incoming keys)
+    """
+    incoming_keys = encode_load_data_rows(df[primary_key])
+    incoming_rows = encode_load_data_rows(df)
+
+    existing_rows = current_rows.reindex(incoming_keys.values).values
+
+    is_new = ~incoming_keys.isin(current_rows.index).values
+    is_changed = ~is_new & (existing_rows != incoming_rows.values)
+
+    return df[is_new], df[is_changed], list(incoming_keys)
+
+
+def upsert_chunk(df, cursor, table_name, primary_key, dialect="mysql"):
+    """
+    Insert or update rows of an SQL table with a batched upsert, without committing
+
+    Parameters:
+        df (dataFrame): Rows to be upserted
+        cursor (Cursor): DB-API cursor
+        table_name (str): Name of target SQL Table
+        primary_key (list): Primary key column names of the table
+        dialect (str): "mysql" for INSERT ... ON DUPLICATE KEY UPDATE, "postgresql" for INSERT ... ON CONFLICT
+
+    Returns:
+        Nothing
+    """
+    columns = list(df)
+    table_column_names_str = ", ".join(columns)
+    values_placeholders_strip = ", ".join(["%s"] * len(columns))
+    update_columns = [
+        column for column in columns if column not in primary_key
+    ] or primary_key
+    values_list = [tuple(x) for x in df.values.tolist()]
+
+    if dialect == "postgresql":
+        from psycopg2.extras import execute_values
+
+        update_str = ", ".join(
+            f"{column} = EXCLUDED.{column}" for column in update_columns
+        )
+        sql = f"INSERT INTO {table_name} ({table_column_names_str}) VALUES %s ON CONFLICT ({', '.join(primary_key)}) DO UPDATE SET {update_str}"
+        execute_values(cursor, sql, values_list, page_size=1000)
+    else:
+        update_str = ", ".join(
+            f"{column} = VALUES({column})" for column in update_columns
+        )
+        sql = f"INSERT INTO {table_name} ({table_column_names_str}) VALUES ({values_placeholders_strip}) ON DUPLICATE KEY UPDATE {update_str}"
+        cursor.executemany(sql, values_list)
+
+
+def delete_keys(keys_df, cursor, table_name, batch_size=1000):
+    """
+    Delete rows from an SQL table by primary key, in batches, without committing
+
+    Parameters:
+        keys_df (dataFrame): Primary key values of the rows to delete
+        cursor (Cursor): DB-API cursor
+        table_name (str): Name of target SQL Table
+        batch_size (int): Number of keys per DELETE statement
+
+    Returns:
+        Nothing
+    """
+    key_columns_str = ", ".join(list(keys_df))
+    row_placeholder = f"({', '.join(['%s'] * len(list(keys_df)))})"
+    keys_list = keys_df.values.tolist()
+
+    for i in range(0, len(keys_list), batch_size):
+        batch = keys_list[i : i + batch_size]
+        sql = f"DELETE FROM {table_name} WHERE ({key_columns_str}) IN ({', '.join([row_placeholder] * len(batch))})"
+        cursor.execute(sql, [value for key in batch for value in key])
+
+
+def load_df_infile(df, cursor, table_name):
+    """
+    Bulk loads a dataFrame into an SQL table with MySQL LOAD DATA LOCAL INFILE
+
+    Parameters:
+        df (dataFrame): dataFrame to be inserted into SQL table
+        cursor (Cursor): DB-API cursor from a connection with local_infile enabled
+        table_name (str): Name of target SQL Table
+
+    Returns:
+        Nothing
+
+    Side Effects:
+        On success - dataFrame written to a temporary TSV file and loaded into the SQL table
+        On failure - exception raised (e.g. when local infile is disabled on the server)
+    """
+    table_column_names_str = ", ".join(list(df))
+    sql = (
+        f"LOAD DATA LOCAL INFILE %s INTO TABLE {table_name} CHARACTER SET utf8mb4 "
+        "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+        f"({table_column_names_str})"
+    )
+
+    with tempfile.NamedTemporaryFile(suffix=".tsv") as tsv_file:
+        tsv_file.write(df_to_load_data_tsv(df).encode("utf-8"))
+        tsv_file.flush()
+        cursor.execute(sql, (tsv_file.name,))
+
+
+def copy_df_into_table(df, cursor, table_name):
+    """
+    Bulk loads a dataFrame into a PostgreSQL table with COPY ... FROM STDIN
+
+    The COPY text format uses the same escaping and \\N NULLs as MySQL LOAD DATA, so rows
+    are encoded with df_to_load_data_tsv
+
+    Parameters:
+        df (dataFrame): dataFrame to be inserted into SQL table
+        cursor (Cursor): psycopg2 cursor
+        table_name (str): Name of target SQL Table
+
+    Returns:
+        Nothing
+    """
+    table_column_names_str = ", ".join(list(df))
+    sql = f"COPY {table_name} ({table_column_names_str}) FROM STDIN WITH (FORMAT text)"
+    cursor.copy_expert(sql, io.StringIO(df_to_load_data_tsv(df)))
+
+
+def df_to_load_data_tsv(df):
+    """
+    Encodes a dataFrame as tab separated text in the format expected by MySQL LOAD DATA
+
+    Parameters:
+        df (dataFrame): dataFrame to be encoded
+
+    Returns:
+        str: One line per row - NULLs as \\N, bools as 1/0, dates as YYYY-MM-DD, times as HH:MM:SS
+    """
+    if df.empty:
+        return ""
+
+    return "\n".join(encode_load_data_rows(df)) + "\n"
+
+
+def encode_load_data_rows(df):
+    """
+    Encodes each row of a dataFrame as a tab separated LOAD DATA line
+
+    Also used as a canonical row representation, so values read back from MySQL
+    (e.g. 1/0 for bools, timedelta for TIME) compare equal to the source dataFrame
+
+    Parameters:
+        df (dataFrame): dataFrame to be encoded
+
+    Returns:
+        Series: One encoded string per row
+    """
+    if df.empty:
+        return pd.Series([], dtype=object)
+
+    encoded_columns = []
+    for column in df.columns:
+        series = df[column]
+        is_null = series.isna()
+
+        if pd.api.types.is_bool_dtype(series):
+            encoded = series.map({True: "1", False: "0"})
+        elif pd.api.types.is_integer_dtype(series):
+            encoded = series.astype(str)
+        else:
+            encoded = series.map(_encode_load_data_value)
+
+        encoded_columns.append(encoded.where(~is_null, "\\N"))
+
+    return encoded_columns[0].str.cat(encoded_columns[1:], sep="\t")
+
+
+def _encode_load_data_value(value):
+    """Encode a single value for a LOAD DATA TSV field, escaping special characters"""
+    if value is None or value is pd.NA or (isinstance(value, float) and value != value):
+        return "\\N"
+    if isinstance(value, (bool, np.bool_)):
+        return "1" if value else "0"
+    if isinstance(value, float) and value.is_integer():
+        # integer columns are upcast to float by pandas when they contain NaN
+        return str(int(value))
+    if isinstance(value, timedelta):
+        # MySQL TIME columns are read back as timedeltas
+        hours, remainder = divmod(int(value.total_seconds()), 3600)
+        return f"{hours:02d}:{remainder // 60:02d}:{remainder % 60:02d}"
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
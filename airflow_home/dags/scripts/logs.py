@@ -0,0 +1,306 @@
+import os
+import json
+import queue
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Shared logging setup of the pipeline scripts. Only the standard library is imported here, as
+# tasks.py imports it while the scheduler parses the DAG
+
+# Default directory of the per-run log files - absolute, so it doesn't depend on the working directory
+DEFAULT_LOG_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "logs",
+    "pipeline",
+)
+
+# Fields added to every record from log_context, besides the run and task ids
+CONTEXT_FIELDS = ["stage", "endpoint", "table"]
+
+# Seconds ship_logs waits for the listener to handle the queued records
+DRAIN_TIMEOUT = 10
+
+_listener = None
+_handler = None
+_queue_handler = None
+_setup_lock = threading.Lock()
+_ship_lock = threading.Lock()
+_local = threading.local()
+_process_run_id = (
+    f"local__{datetime.utcnow().isoformat(timespec='seconds')}_{os.getpid()}"
+)
+
+
+def setup_logging():
+    """
+    Routes the root logger through a queue, so logging calls only enqueue the record and the JSON
+    formatting and file writes happen on a listener thread, off the pipeline's hot path
+
+    Records are written as JSON Lines to '{log_dir}/{run_id}.jsonl' (log_dir from the environment,
+    defaulting to airflow_home/logs/pipeline), and when log_bucket is set, kept in memory until
+    ship_logs uploads them. Safe to call from every module, only the first call sets up the handlers
+
+    Parameters:
+        None
+
+    Returns:
+        Nothing
+    """
+    global _listener, _handler, _queue_handler
+    with _setup_lock:
+        if _listener is not None:
+            return
+        _handler = RunFileHandler(
+            os.environ.get("log_dir") or DEFAULT_LOG_DIR,
+            buffer=bool(os.environ.get("log_bucket")),
+        )
+        _handler.setFormatter(JsonFormatter())
+        log_queue = queue.SimpleQueue()
+        _queue_handler = InProcessQueueHandler(log_queue)
+        _queue_handler.addFilter(ContextFilter())
+
+        root = logging.getLogger()
+        root.setLevel(logging.INFO)
+        root.addHandler(_queue_handler)
+        _listener = BatchingQueueListener(log_queue, _handler)
+        _listener.start()
+        atexit.register(reset_logging)
+
+
+def reset_logging():
+    """Write out queued records and remove the handlers, so the next setup_logging re-reads the environment"""
+    global _listener, _handler, _queue_handler
+    with _setup_lock:
+        if _listener is None:
+            return
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener.stop()
+        _handler.close()
+        _listener = _handler = _queue_handler = None
+
+
+def _setup_logging_after_fork():
+    """
+    Rebuilds the queue, listener and handler in a forked child, such as the ProcessPoolExecutor
+    workers of backfill.py - the listener thread doesn't survive fork, so the child's records would
+    stay in its copy of the queue
+    """
+    global _listener, _handler, _queue_handler, _setup_lock, _ship_lock
+    # a lock held by another thread at the fork is never released in the child
+    _setup_lock = threading.Lock()
+    _ship_lock = threading.Lock()
+    if _listener is None:
+        return
+    # the parent's listener and files are dropped, not stopped or closed, as closing the copied
+    # files would write the parent's buffered records a second time
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener = _handler = _queue_handler = None
+    setup_logging()
+
+    # multiprocessing children exit without running atexit handlers, only its finalizers
+    from multiprocessing import util
+
+    util.Finalize(None, reset_logging, exitpriority=0)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_setup_logging_after_fork)
+
+
+def current_run_ids():
+    """The Airflow run and task ids of the executing task, or a run id per process outside Airflow"""
+    # Airflow exports the run and task of the executing task instance
+    return (
+        os.environ.get("AIRFLOW_CTX_DAG_RUN_ID", _process_run_id),
+        os.environ.get("AIRFLOW_CTX_TASK_ID", ""),
+    )
+
+
+@contextmanager
+def log_context(**fields):
+    """Add stage, endpoint and/or table fields to the records logged by this thread in the block"""
+    previous = getattr(_local, "context", {})
+    _local.context = {**previous, **fields}
+    try:
+        yield
+    finally:
+        _local.context = previous
+
+
+class InProcessQueueHandler(QueueHandler):
+    """
+    QueueHandler for a queue read in the same process - the record is enqueued as it is, rather than
+    formatted and copied in the logging thread, as nothing pickles it and nothing changes it later
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class BatchingQueueListener(QueueListener):
+    """QueueListener flushing its handlers only once the queue is empty, so bursts are written in batches"""
+
+    def handle(self, record):
+        if isinstance(record, threading.Event):
+            # drain marker, every record queued before it has been handled
+            record.set()
+        else:
+            super().handle(record)
+        if self.queue.empty():
+            for handler in self.handlers:
+                handler.flush()
+
+    def drain(self, timeout=DRAIN_TIMEOUT):
+        """Wait until the records queued before this call are handled, keeping the listener running"""
+        marker = threading.Event()
+        self.queue.put(marker)
+        if not marker.wait(timeout):
+            raise TimeoutError(f"log queue not drained in {timeout}s")
+
+
+class ContextFilter(logging.Filter):
+    """Stamps records with the run ids and log_context fields, in the thread that logged them"""
+
+    def filter(self, record):
+        record.run_id, record.task_id = current_run_ids()
+        context = getattr(_local, "context", {})
+        for field in CONTEXT_FIELDS:
+            setattr(record, field, context.get(field))
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as one JSON object"""
+
+    def format(self, record):
+        return json.dumps(
+            {
+                "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+                "level": record.levelname,
+                "logger": record.name,
+                "module": record.module,
+                "message": record.getMessage(),
+                "exception": (
+                    self.formatException(record.exc_info) if record.exc_info else None
+                ),
+                "run_id": getattr(record, "run_id", None),
+                "task_id": getattr(record, "task_id", None),
+                **{field: getattr(record, field, None) for field in CONTEXT_FIELDS},
+            }
+        )
+
+
+class RunFileHandler(logging.Handler):
+    """
+    Appends formatted records to one file per run, shared by every task of the run, and buffers
+    them per run until ship_logs takes them
+
+    Parameters:
+        log_dir (str): Directory of the run files, created on first write
+        buffer (bool): Keep the records for ship_logs, otherwise they are only written to the files
+    """
+
+    def __init__(self, log_dir, buffer=False):
+        super().__init__()
+        self.log_dir = log_dir
+        self.buffer = buffer
+        self.pending = {}
+        self.streams = {}
+
+    def emit(self, record):
+        try:
+            line = self.format(record) + "\n"
+            run_id = getattr(record, "run_id", None) or _process_run_id
+            if run_id not in self.streams:
+                os.makedirs(self.log_dir, exist_ok=True)
+                self.streams[run_id] = open(
+                    os.path.join(self.log_dir, f"{safe_name(run_id)}.jsonl"),
+                    "a",
+                    encoding="utf-8",
+                )
+            # written through the file buffer, BatchingQueueListener flushes it once the queue is empty
+            self.streams[run_id].write(line)
+            if self.buffer:
+                self.pending.setdefault(run_id, []).append(line)
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        for stream in self.streams.values():
+            stream.flush()
+
+    def close(self):
+        for stream in self.streams.values():
+            stream.close()
+        self.streams = {}
+        super().close()
+
+    def take_pending(self):
+        """Remove and return the buffered lines, keyed by run id"""
+        self.acquire()
+        try:
+            pending, self.pending = self.pending, {}
+            return pending
+        finally:
+            self.release()
+
+
+def ship_logs(bucket_name=None):
+    """
+    Uploads the records logged since the last shipment to S3 in one object per run, at the end of
+    a task, under 'logs/{run_id}/{task_id}-{pid}-{timestamp}.jsonl' - so the logs of every task of
+    a run can be aggregated under one prefix
+
+    Parameters:
+        bucket_name (str): Target S3 bucket, defaults to the log_bucket environment variable - when
+            log_bucket isn't set, records are only kept in the local run files
+
+    Returns:
+        int: Number of records shipped
+
+    Side Effects:
+        On failure - error message logged, never raised, so shipping cannot fail the pipeline
+    """
+    bucket_name = bucket_name or os.environ.get("log_bucket")
+    listener, handler = _listener, _handler
+    if listener is None or not bucket_name or not handler.buffer:
+        return 0
+
+    try:
+        from scripts.aws import get_client
+    except ImportError:
+        from airflow_home.dags.scripts.aws import get_client
+
+    shipped = 0
+    _, task_id = current_run_ids()
+    # one shipment at a time, as tasks may ship from several threads
+    with _ship_lock:
+        try:
+            # every record logged before this call is in the buffer once the queue is drained
+            listener.drain()
+            pending = handler.take_pending()
+        except Exception as e:
+            logging.error(f"ship_logs Error, draining the log queue: {e}")
+            return 0
+
+        timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        for run_id, lines in pending.items():
+            try:
+                get_client("s3").put_object(
+                    Bucket=bucket_name,
+                    Key=f"logs/{safe_name(run_id)}/{safe_name(task_id or 'process')}-{os.getpid()}-{timestamp}.jsonl",
+                    Body="".join(lines).encode(),
+                )
+                shipped += len(lines)
+            except Exception as e:
+                logging.error(f"ship_logs Error, {len(lines)} records of {run_id}: {e}")
+    return shipped
+
+
+def safe_name(name):
+    """Replace the characters of an id that aren't safe in a file name or S3 key"""
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
@@ -0,0 +1,225 @@
+import os
+import json
+import time
+import logging
+import functools
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    from scripts.logs import setup_logging, current_run_ids, safe_name, ship_logs
+except ImportError:
+    from airflow_home.dags.scripts.logs import (
+        setup_logging,
+        current_run_ids,
+        safe_name,
+        ship_logs,
+    )
+
+setup_logging()
+
+METRICS_TABLE = "pipeline_run_metrics"
+
+# Number of finished spans buffered before they are flushed
+FLUSH_BATCH_SIZE = 100
+
+_buffer = []
+_buffer_lock = threading.Lock()
+_local = threading.local()
+_engine = None
+
+
+class Span:
+    """
+    Timing and counters of one call of a pipeline stage function
+
+    Parameters:
+        name (str): Name of the stage function
+        parent (str): Name of the enclosing span, if any
+    """
+
+    def __init__(self, name, parent=None):
+        self.name = name
+        self.parent = parent
+        self.run_id, self.task_id = current_run_ids()
+        self.started_at = datetime.utcnow()
+        self.duration_ms = 0.0
+        self.byte_count = 0
+        self.row_count = 0
+        self.retries = 0
+        self.status = "ok"
+
+    def as_dict(self):
+        return {
+            "run_id": self.run_id,
+            "task_id": self.task_id,
+            "span": self.name,
+            "parent": self.parent,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration_ms, 3),
+            "byte_count": self.byte_count,
+            "row_count": self.row_count,
+            "retries": self.retries,
+            "status": self.status,
+        }
+
+
+@contextmanager
+def span(name):
+    """Time the enclosed block as a span, buffered for flush_metrics when it finishes"""
+    stack = _span_stack()
+    current = Span(name, stack[-1].name if stack else None)
+    stack.append(current)
+    start_time = time.perf_counter()
+    try:
+        yield current
+    except BaseException:
+        current.status = "error"
+        raise
+    finally:
+        current.duration_ms = (time.perf_counter() - start_time) * 1000
+        stack.pop()
+        _buffer_span(current)
+
+
+def timed(func):
+    """Decorator recording every call of func as a span named after it"""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with span(func.__name__):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def flushes_metrics(func):
+    """Decorator for task entry points, flushing buffered spans and shipping the task's logs once func returns or raises"""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            flush_metrics()
+            ship_logs()
+
+    return wrapper
+
+
+def record(byte_count=0, row_count=0, retries=0):
+    """Add bytes moved, rows written and retries to the innermost running span, if any"""
+    stack = _span_stack()
+    if stack:
+        stack[-1].byte_count += byte_count
+        stack[-1].row_count += row_count
+        stack[-1].retries += retries
+
+
+def flush_metrics():
+    """
+    Writes buffered spans to the run's JSON artifact and the pipeline_run_metrics table
+
+    The artifact is written when the metrics_dir environment variable is set, and the table
+    when metrics_to_db is "true" (using the rds_* connection variables)
+
+    Parameters:
+        None
+
+    Returns:
+        int: Number of spans flushed
+
+    Side Effects:
+        On failure - error message logged, never raised, so metrics cannot fail the pipeline
+    """
+    global _buffer
+    with _buffer_lock:
+        spans, _buffer = _buffer, []
+    if not spans:
+        return 0
+
+    rows = [finished_span.as_dict() for finished_span in spans]
+    try:
+        if os.environ.get("metrics_dir"):
+            write_metrics_artifact(rows, os.environ["metrics_dir"])
+        if os.environ.get("metrics_to_db") == "true":
+            write_metrics_table(rows, _metrics_engine())
+    except Exception as e:
+        logging.error(f"flush_metrics Error, {len(rows)} spans dropped: {e}")
+    return len(rows)
+
+
+def write_metrics_artifact(rows, metrics_dir):
+    """Append spans to a JSON Lines file per run, shared by every task of the run"""
+    os.makedirs(metrics_dir, exist_ok=True)
+    for run_id in {row["run_id"] for row in rows}:
+        with open(
+            os.path.join(metrics_dir, f"{safe_name(run_id)}.jsonl"), "a"
+        ) as artifact:
+            artifact.write(
+                "".join(
+                    json.dumps(row) + "\n" for row in rows if row["run_id"] == run_id
+                )
+            )
+
+
+def write_metrics_table(rows, engine):
+    """Insert spans into the pipeline_run_metrics table in one executemany"""
+    columns = [
+        "run_id",
+        "task_id",
+        "span",
+        "parent",
+        "started_at",
+        "duration_ms",
+        "byte_count",
+        "row_count",
+        "retries",
+        "status",
+    ]
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.executemany(
+            f"INSERT INTO {METRICS_TABLE} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})",
+            [tuple(row[column] for column in columns) for row in rows],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _span_stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def _buffer_span(finished_span):
+    with _buffer_lock:
+        _buffer.append(finished_span)
+        full = len(_buffer) >= FLUSH_BATCH_SIZE
+    if full:
+        flush_metrics()
+
+
+def _metrics_engine():
+    """One engine per process for metrics writes, created on first use"""
+    global _engine
+    if _engine is None:
+        try:
+            from scripts.load import create_db_conn
+        except ImportError:
+            from airflow_home.dags.scripts.load import create_db_conn
+
+        _engine = create_db_conn(
+            os.environ["rds_user"],
+            os.environ["rds_password"],
+            os.environ["rds_host"],
+            os.environ["rds_port"],
+            os.environ["rds_db_name"],
+            pool_size=1,
+            dialect=os.environ.get("rds_dialect", "mysql"),
+        )
+    return _engine
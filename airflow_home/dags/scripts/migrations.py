@@ -0,0 +1,222 @@
+import logging
+
+try:
+    from scripts.logs import setup_logging
+    from scripts.helpers import season_of
+except ImportError:
+    from airflow_home.dags.scripts.logs import setup_logging
+    from airflow_home.dags.scripts.helpers import season_of
+
+setup_logging()
+
+# Range partitions of fact_players, one per gameweek, so gameweek filters only read their own partition
+GAMEWEEK_PARTITIONS = ", ".join(
+    [f"PARTITION p_gw_{gw:02d} VALUES LESS THAN ({gw + 1})" for gw in range(0, 39)]
+    + ["PARTITION p_gw_max VALUES LESS THAN MAXVALUE"]
+)
+
+# Season of the rows loaded before seasons were tracked - the pipeline started in the 2024-25 season
+LEGACY_SEASON = "2024-25"
+
+# Season column of each star schema table, filled with LEGACY_SEASON for the existing rows
+SEASON_COLUMNS = [
+    statement
+    for table_name in ["fact_players", "dim_players", "dim_teams", "dim_fixtures"]
+    for statement in [
+        f"ALTER TABLE {table_name} ADD COLUMN season varchar(7) NOT NULL DEFAULT '{LEGACY_SEASON}'",
+        f"ALTER TABLE {table_name} ALTER COLUMN season DROP DEFAULT",
+    ]
+]
+
+
+# Season of the live player stats rows written before seasons were tracked - live.py only polls the
+# gameweek under way, so they are taken to be of the season the migration runs in
+LIVE_SEASON_COLUMN = [
+    f"ALTER TABLE fact_player_stats ADD COLUMN season varchar(7) NOT NULL DEFAULT '{season_of()}'",
+    "ALTER TABLE fact_player_stats ALTER COLUMN season DROP DEFAULT",
+]
+
+
+def drop_primary_key_postgresql(table_name):
+    """
+    PostgreSQL statement dropping a table's primary key, whatever its name - swap loads rename a
+    staging table created with CREATE TABLE ... LIKE, so its key keeps the name '{table}_staging_pkey'
+    """
+    return (
+        f"DO $$ DECLARE pkey text; BEGIN "
+        f"SELECT conname INTO pkey FROM pg_constraint WHERE conrelid = '{table_name}'::regclass AND contype = 'p'; "
+        f"EXECUTE 'ALTER TABLE {table_name} DROP CONSTRAINT ' || quote_ident(pkey); "
+        f"END $$"
+    )
+
+
+# Ordered schema migrations for the production Database - (version, description, SQL statements)
+# Statements are either a list shared by every dialect, or a dict of lists keyed by dialect
+# Applied migrations must never be edited, add a new version instead
+MIGRATIONS = [
+    (
+        1,
+        "create star schema tables",
+        [
+            "CREATE TABLE IF NOT EXISTS fact_players ( player_id int, team_id int, gameweek_id int, fixture_id int, opposition_team_id int, fixture_difficulty_rating int, is_home bool )",
+            "CREATE TABLE IF NOT EXISTS dim_players ( first_name varchar(255), second_name varchar(255), web_name varchar(255), player_id int, team_id int )",
+            "CREATE TABLE IF NOT EXISTS dim_teams ( team_id int, team_name varchar(255), team_name_short varchar(255) )",
+            "CREATE TABLE IF NOT EXISTS dim_fixtures ( fixture_id int, gameweek_id int, fixture_date DATE, fixture_time TIME, match_finished bool, home_team_id int, away_team_id int, home_team_score int, away_team_score int, home_team_difficulty int, away_team_difficulty int )",
+        ],
+    ),
+    (
+        2,
+        "add primary keys",
+        [
+            "ALTER TABLE fact_players ADD PRIMARY KEY (player_id, gameweek_id, fixture_id)",
+            "ALTER TABLE dim_players ADD PRIMARY KEY (player_id)",
+            "ALTER TABLE dim_teams ADD PRIMARY KEY (team_id)",
+            "ALTER TABLE dim_fixtures ADD PRIMARY KEY (fixture_id)",
+        ],
+    ),
+    (
+        3,
+        "add join and filter indexes",
+        [
+            "CREATE INDEX idx_fact_players_gameweek ON fact_players (gameweek_id, team_id, fixture_difficulty_rating)",
+            "CREATE INDEX idx_fact_players_team ON fact_players (team_id, gameweek_id)",
+            "CREATE INDEX idx_fact_players_fixture ON fact_players (fixture_id)",
+            "CREATE INDEX idx_fact_players_opposition ON fact_players (opposition_team_id, gameweek_id)",
+            "CREATE INDEX idx_dim_players_team ON dim_players (team_id, web_name)",
+            "CREATE INDEX idx_dim_fixtures_gameweek ON dim_fixtures (gameweek_id, fixture_date, fixture_time)",
+            "CREATE INDEX idx_dim_fixtures_home_team ON dim_fixtures (home_team_id, gameweek_id)",
+            "CREATE INDEX idx_dim_fixtures_away_team ON dim_fixtures (away_team_id, gameweek_id)",
+        ],
+    ),
+    (
+        4,
+        "partition fact_players by gameweek",
+        {
+            "mysql": [
+                f"ALTER TABLE fact_players PARTITION BY RANGE (gameweek_id) ( {GAMEWEEK_PARTITIONS} )",
+            ],
+            # PostgreSQL cannot partition an existing table, and CREATE TABLE ... LIKE
+            # (used by swap loads) does not copy partitioning, so fact_players stays unpartitioned
+            "postgresql": [],
+        },
+    ),
+    (
+        5,
+        "create live player stats table",
+        [
+            "CREATE TABLE IF NOT EXISTS fact_player_stats ( player_id int, gameweek_id int, minutes int, goals_scored int, assists int, clean_sheets int, goals_conceded int, own_goals int, penalties_saved int, penalties_missed int, yellow_cards int, red_cards int, saves int, bonus int, bps int, total_points int, PRIMARY KEY (player_id, gameweek_id) )",
+        ],
+    ),
+    (
+        6,
+        "create pipeline run metrics table",
+        [
+            "CREATE TABLE IF NOT EXISTS pipeline_run_metrics ( run_id varchar(255), task_id varchar(255), span varchar(255), parent varchar(255), started_at timestamp NULL, duration_ms double precision, byte_count bigint, row_count bigint, retries int, status varchar(16) )",
+            "CREATE INDEX idx_pipeline_run_metrics_run ON pipeline_run_metrics (run_id)",
+            "CREATE INDEX idx_pipeline_run_metrics_span ON pipeline_run_metrics (span, started_at)",
+        ],
+    ),
+    (
+        7,
+        "add season to star schema tables",
+        {
+            "mysql": SEASON_COLUMNS
+            + [
+                "ALTER TABLE fact_players DROP PRIMARY KEY, ADD PRIMARY KEY (season, player_id, gameweek_id, fixture_id)",
+                "ALTER TABLE dim_players DROP PRIMARY KEY, ADD PRIMARY KEY (season, player_id)",
+                "ALTER TABLE dim_teams DROP PRIMARY KEY, ADD PRIMARY KEY (season, team_id)",
+                "ALTER TABLE dim_fixtures DROP PRIMARY KEY, ADD PRIMARY KEY (season, fixture_id)",
+            ],
+            "postgresql": SEASON_COLUMNS
+            + [
+                drop_primary_key_postgresql("fact_players"),
+                "ALTER TABLE fact_players ADD PRIMARY KEY (season, player_id, gameweek_id, fixture_id)",
+                drop_primary_key_postgresql("dim_players"),
+                "ALTER TABLE dim_players ADD PRIMARY KEY (season, player_id)",
+                drop_primary_key_postgresql("dim_teams"),
+                "ALTER TABLE dim_teams ADD PRIMARY KEY (season, team_id)",
+                drop_primary_key_postgresql("dim_fixtures"),
+                "ALTER TABLE dim_fixtures ADD PRIMARY KEY (season, fixture_id)",
+            ],
+        },
+    ),
+    (
+        8,
+        "create gameweek aggregate tables",
+        [
+            "CREATE TABLE IF NOT EXISTS agg_top_scorers ( season varchar(7), gameweek_id int, points_rank int, player_id int, team_id int, total_points int, goals_scored int, assists int, bonus int, PRIMARY KEY (season, gameweek_id, points_rank) )",
+            "CREATE TABLE IF NOT EXISTS agg_team_of_the_week ( season varchar(7), gameweek_id int, player_id int, team_id int, position_id int, total_points int, PRIMARY KEY (season, gameweek_id, player_id) )",
+            "CREATE TABLE IF NOT EXISTS agg_team_points ( season varchar(7), gameweek_id int, team_id int, total_points int, goals_scored int, assists int, bonus int, player_count int, PRIMARY KEY (season, gameweek_id, team_id) )",
+        ],
+    ),
+    (
+        9,
+        "add season to live player stats table",
+        {
+            "mysql": LIVE_SEASON_COLUMN
+            + [
+                "ALTER TABLE fact_player_stats DROP PRIMARY KEY, ADD PRIMARY KEY (season, player_id, gameweek_id)",
+            ],
+            "postgresql": LIVE_SEASON_COLUMN
+            + [
+                drop_primary_key_postgresql("fact_player_stats"),
+                "ALTER TABLE fact_player_stats ADD PRIMARY KEY (season, player_id, gameweek_id)",
+            ],
+        },
+    ),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def migrate(engine, target_version=None):
+    """
+    Apply pending schema migrations to the production MySQL or PostgreSQL Database
+
+    Parameters:
+        engine (str): SQLAlchemy connection object
+        target_version (int): Version to migrate up to, defaults to the latest migration
+
+    Returns:
+        int: Schema version of the database after migrating
+
+    Side Effects:
+        On success - pending migrations applied in order and recorded in schema_migrations
+        On failure - error message logged and exception raised, later migrations not applied
+    """
+    if target_version is None:
+        target_version = LATEST_VERSION
+    dialect = "postgresql" if engine.dialect.name == "postgresql" else "mysql"
+
+    with engine.connect() as conn:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ( version int PRIMARY KEY, description varchar(255), applied_at timestamp DEFAULT CURRENT_TIMESTAMP )"
+        )
+        applied_versions = {
+            row[0]
+            for row in conn.execute("SELECT version FROM schema_migrations").fetchall()
+        }
+        current_version = max(applied_versions, default=0)
+
+        for version, description, statements in MIGRATIONS:
+            if version in applied_versions or version > target_version:
+                continue
+
+            if isinstance(statements, dict):
+                statements = statements[dialect]
+
+            try:
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute(
+                    "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                    (version, description),
+                )
+            except Exception as e:
+                logging.error(f"migrate Error, version {version} ({description}): {e}")
+                raise
+
+            current_version = version
+            logging.info(f"migrate: applied version {version} ({description})")
+
+    return current_version
@@ -0,0 +1,166 @@
+import os
+import time
+import json
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+try:
+    from scripts.logs import setup_logging
+    from scripts.helpers import generate_filename, today_ds
+    from scripts.extract import generate_endpoints, retrieve_data, save_json_to_s3
+    from scripts.transform import transform_tables, save_df_to_parquet_s3
+    from scripts.load import load_data
+    from scripts.metrics import flushes_metrics
+except ImportError:
+    from airflow_home.dags.scripts.logs import setup_logging
+    from airflow_home.dags.scripts.helpers import generate_filename, today_ds
+    from airflow_home.dags.scripts.extract import (
+        generate_endpoints,
+        retrieve_data,
+        save_json_to_s3,
+    )
+    from airflow_home.dags.scripts.transform import (
+        transform_tables,
+        save_df_to_parquet_s3,
+    )
+    from airflow_home.dags.scripts.load import load_data
+    from airflow_home.dags.scripts.metrics import flushes_metrics
+
+setup_logging()
+
+
+@flushes_metrics
+def run_pipeline(
+    rds_user,
+    rds_password,
+    rds_host,
+    rds_port,
+    rds_db_name,
+    extract_bucket=None,
+    transform_bucket=None,
+    ds=None,
+    **load_kwargs,
+):
+    """
+    Executes Extract, Transform and Load in one process, passing API data and tables in memory
+    rather than through the extract and transform S3 buckets
+
+    Parameters:
+        rds_user (str): RDS username
+        rds_password (str): RDS password
+        rds_host (str): RDS hostname
+        rds_port (str): RDS port
+        rds_db_name (str): RDS database name
+        extract_bucket (str): S3 bucket to also save the raw JSON files to, skipped when None
+        transform_bucket (str): S3 bucket to also save the parquet files to, skipped when None
+        ds (str): Logical date of the run (YYYY-MM-DD), used as the key prefix, defaults to today
+        **load_kwargs: Further keyword arguments for load_data, e.g. mode or chunk_size
+
+    Returns:
+        dict: "timings" - seconds spent per stage, "load" - the return value of load_data
+
+    Side Effects:
+        On success - data fetched from API, transformed and inserted into SQL tables. Raw and parquet
+            files are saved to S3 in a background thread (write-behind), off the critical path
+        On failure - exception from the failed stage or background save raised
+    """
+    ds = ds or today_ds()
+    timings = {}
+    with ThreadPoolExecutor(max_workers=1) as persist_executor:
+        persisted = []
+
+        start_time = time.perf_counter()
+        payloads = {}
+        for endpoint in generate_endpoints():
+            payloads[endpoint] = retrieve_data(endpoint)
+            if extract_bucket:
+                persisted.append(
+                    persist_executor.submit(
+                        save_json_to_s3,
+                        payloads[endpoint],
+                        extract_bucket,
+                        f"{generate_filename(endpoint, ds)}.json",
+                    )
+                )
+        timings["extract"] = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        tables = transform_tables(payloads=payloads, ds=ds)
+        if transform_bucket:
+            for table_name, table_df in tables.items():
+                persisted.append(
+                    persist_executor.submit(
+                        save_df_to_parquet_s3,
+                        table_name,
+                        table_df,
+                        transform_bucket,
+                        ds,
+                    )
+                )
+        timings["transform"] = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        load_result = load_data(
+            rds_user,
+            rds_password,
+            rds_host,
+            rds_port,
+            rds_db_name,
+            transform_bucket,
+            tables=tables,
+            ds=ds,
+            **load_kwargs,
+        )
+        timings["load"] = time.perf_counter() - start_time
+
+        # wait for the write-behind saves, re-raising any failure
+        start_time = time.perf_counter()
+        for future in persisted:
+            future.result()
+        timings["persist_wait"] = time.perf_counter() - start_time
+
+    timings = {stage: round(seconds, 3) for stage, seconds in timings.items()}
+    logging.info(f"run_pipeline: completed in memory, stage timings {timings}")
+    return {"timings": timings, "load": load_result}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run Extract, Transform and Load in one process, without intermediate S3 hops"
+    )
+    parser.add_argument(
+        "--persist",
+        action="store_true",
+        help="Also save raw JSON and parquet files to the extract and transform buckets in .env",
+    )
+    parser.add_argument("--mode", choices=["replace", "merge", "swap"])
+    parser.add_argument("--method", choices=["executemany", "load_data", "copy"])
+    parser.add_argument("--chunk-size", type=int)
+    parser.add_argument("--dialect", choices=["mysql", "postgresql"])
+    args = parser.parse_args()
+
+    load_dotenv()
+    load_kwargs = {
+        "mode": args.mode or os.environ.get("rds_load_mode", "replace"),
+        "method": args.method or os.environ.get("rds_load_method", "executemany"),
+        "chunk_size": args.chunk_size
+        or int(os.environ.get("rds_load_chunk_size", 50000)),
+        "dialect": args.dialect or os.environ.get("rds_dialect", "mysql"),
+        "max_workers": int(os.environ.get("rds_load_max_workers", 4)),
+    }
+
+    extract_bucket = os.environ["s3_extract_bucket_name"] if args.persist else None
+    transform_bucket = os.environ["s3_transform_bucket_name"] if args.persist else None
+    result = run_pipeline(
+        os.environ["rds_user"],
+        os.environ["rds_password"],
+        os.environ["rds_host"],
+        os.environ["rds_port"],
+        os.environ["rds_db_name"],
+        extract_bucket=extract_bucket,
+        transform_bucket=transform_bucket,
+        **load_kwargs,
+    )
+    print(json.dumps(result, indent=2, default=str))
@@ -0,0 +1,120 @@
+import time
+import asyncio
+import logging
+import aiohttp
+
+try:
+    from scripts.logs import setup_logging
+except ImportError:
+    from airflow_home.dags.scripts.logs import setup_logging
+
+setup_logging()
+
+BASE_URL = "https://fantasy.premierleague.com/api/"
+
+
+def check_readiness(bootstrap, fixtures):
+    """
+    Check whether the FPL data of the latest matches is final, so it only needs transforming once
+
+    A fixture that has started is final once "finished" is set, after bonus points are confirmed
+    (until then only "finished_provisional" is set), and a finished gameweek once FPL has set its
+    "data_checked" flag
+
+    Parameters:
+        bootstrap (dict): bootstrap-static payload
+        fixtures (list): fixtures payload
+
+    Returns:
+        dict: {"ready": bool, "reason": str, "gameweek": id of the current gameweek or None}
+    """
+    events = bootstrap.get("events", [])
+    current = next((event for event in events if event.get("is_current")), None)
+    gameweek = current["id"] if current else None
+
+    unchecked = [
+        event["id"]
+        for event in events
+        if (event.get("is_current") or event.get("is_previous"))
+        and event.get("finished")
+        and not event.get("data_checked")
+    ]
+    if unchecked:
+        return {
+            "ready": False,
+            "reason": f"gameweek {unchecked[0]} finished, awaiting data check",
+            "gameweek": gameweek,
+        }
+
+    unsettled = [
+        fixture["id"]
+        for fixture in fixtures
+        if fixture.get("started") and not fixture.get("finished")
+    ]
+    if unsettled:
+        return {
+            "ready": False,
+            "reason": f"{len(unsettled)} started fixtures not final",
+            "gameweek": gameweek,
+        }
+
+    return {"ready": True, "reason": "data final", "gameweek": gameweek}
+
+
+async def fetch_json(session, endpoint):
+    """
+    Fetch an FPL API endpoint, or None while the API is unavailable - during its updates FPL returns
+    a 503 with "The game is being updated." rather than JSON
+    """
+    async with session.get(f"{BASE_URL}{endpoint}/") as response:
+        if response.status != 200 or response.content_type != "application/json":
+            return None
+        return await response.json()
+
+
+async def poll_readiness(session):
+    """Fetch bootstrap-static and fixtures concurrently and check them, see check_readiness"""
+    bootstrap, fixtures = await asyncio.gather(
+        fetch_json(session, "bootstrap-static"), fetch_json(session, "fixtures")
+    )
+    if bootstrap is None or fixtures is None:
+        return {"ready": False, "reason": "FPL API unavailable", "gameweek": None}
+    return check_readiness(bootstrap, fixtures)
+
+
+async def wait_until_ready(poll_interval=300, timeout=21600, request_timeout=10):
+    """
+    Polls the FPL API until the latest matches' data is final, sleeping without blocking the event
+    loop between polls, so many waits can share the Airflow triggerer
+
+    Parameters:
+        poll_interval (float): Seconds between polls
+        timeout (float): Seconds to wait before giving up
+        request_timeout (float): Seconds allowed for each poll's requests
+
+    Returns:
+        dict: The last check_readiness result, with "timed_out" set when the data was not final in time
+
+    Side Effects:
+        Failed requests are logged and retried at the next poll
+    """
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=request_timeout)
+    ) as session:
+        while True:
+            try:
+                status = await poll_readiness(session)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logging.warning(f"wait_until_ready: request failed: {e!r}")
+                status = {"ready": False, "reason": "request failed", "gameweek": None}
+
+            if status["ready"]:
+                logging.info(f"wait_until_ready: gameweek {status['gameweek']} final")
+                return {**status, "timed_out": False}
+            if time.monotonic() + poll_interval > deadline:
+                logging.warning(f"wait_until_ready: timed out, {status['reason']}")
+                return {**status, "timed_out": True}
+
+            logging.info(f"wait_until_ready: {status['reason']}, polling again")
+            await asyncio.sleep(poll_interval)
@@ -0,0 +1,117 @@
+import os
+import json
+import logging
+from datetime import datetime, timedelta
+import pandas as pd
+
+try:
+    from scripts.logs import setup_logging
+    from scripts.transform import retrieve_payload
+except ImportError:
+    from airflow_home.dags.scripts.logs import setup_logging
+    from airflow_home.dags.scripts.transform import retrieve_payload
+
+setup_logging()
+
+# Kickoff to final whistle, including half time and stoppage time
+MATCH_DURATION = timedelta(hours=2)
+
+
+def match_windows(fixtures):
+    """
+    Group fixtures into match windows, merging matches whose playing time overlaps
+
+    Parameters:
+        fixtures (list): Fixtures from the FPL fixtures endpoint
+
+    Returns:
+        list: (start, end) UTC datetimes of each window, in order
+    """
+    kickoffs = sorted(
+        pd.Timestamp(fixture["kickoff_time"]).to_pydatetime()
+        for fixture in fixtures
+        if fixture.get("kickoff_time")
+    )
+
+    windows = []
+    for kickoff in kickoffs:
+        if windows and kickoff <= windows[-1][1]:
+            windows[-1] = (
+                windows[-1][0],
+                max(windows[-1][1], kickoff + MATCH_DURATION),
+            )
+        else:
+            windows.append((kickoff, kickoff + MATCH_DURATION))
+    return windows
+
+
+def build_schedule(fixtures, events, delay=timedelta(minutes=30)):
+    """
+    Work out when the pipeline should run - shortly after each gameweek deadline and each match window closes
+
+    A run that would fall at or during the next match window is dropped, as the run after that window covers both
+
+    Parameters:
+        fixtures (list): Fixtures from the FPL fixtures endpoint
+        events (list): Gameweeks, the "events" of the FPL bootstrap-static endpoint
+        delay (timedelta): Time after a window closes or deadline passes, letting FPL finalise its data
+
+    Returns:
+        list: Run times as ISO 8601 UTC strings, in order
+    """
+    run_times = set()
+    previous_run = None
+    for window_start, window_end in match_windows(fixtures):
+        run_time = window_end + delay
+        if previous_run is not None and window_start <= previous_run:
+            run_times.discard(previous_run)
+        run_times.add(run_time)
+        previous_run = run_time
+
+    for event in events:
+        if event.get("deadline_time"):
+            run_times.add(pd.Timestamp(event["deadline_time"]).to_pydatetime() + delay)
+
+    return [run_time.isoformat() for run_time in sorted(run_times)]
+
+
+def update_schedule(bucket_name, schedule_path, ds=None, delay_minutes=30):
+    """
+    Rebuilds the schedule read by the gameweek timetable from a run's stored fixtures and bootstrap-static data
+
+    Parameters:
+        bucket_name (str): Name of the S3 bucket holding the extracted JSON files
+        schedule_path (str): Path of the schedule file read by GameweekTimetable
+        ds (str): Logical date of the run (YYYY-MM-DD), selecting the key prefix read
+        delay_minutes (int): Minutes after a window closes or deadline passes to run
+
+    Returns:
+        list: Run times as ISO 8601 UTC strings
+
+    Side Effects:
+        On success - schedule file replaced atomically, so the scheduler never reads a partial file
+        On failure - error message logged and exception raised, previous schedule file kept
+    """
+    try:
+        fixtures = retrieve_payload(bucket_name, "fixtures", ds=ds)
+        events = retrieve_payload(bucket_name, "bootstrap-static", ds=ds)["events"]
+        run_times = build_schedule(fixtures, events, timedelta(minutes=delay_minutes))
+
+        temp_path = f"{schedule_path}.tmp"
+        with open(temp_path, "w") as schedule_file:
+            json.dump(
+                {
+                    "generated_at": datetime.utcnow().isoformat(timespec="seconds"),
+                    "run_times": run_times,
+                },
+                schedule_file,
+            )
+        os.replace(temp_path, schedule_path)
+
+        logging.info(
+            f"update_schedule: {len(run_times)} run times written to {schedule_path}"
+        )
+        return run_times
+    except Exception as e:
+        logging.error(f"update_schedule Error: {e}")
+        raise
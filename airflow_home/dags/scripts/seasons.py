@@ -0,0 +1,198 @@
+import io
+import os
+import json
+import logging
+import argparse
+from datetime import datetime
+import pyarrow.parquet as pq
+from botocore.exceptions import ClientError
+from dotenv import load_dotenv
+
+try:
+    from scripts.logs import setup_logging
+    from scripts.helpers import (
+        generate_filename,
+        season_of,
+        TABLE_NAMES,
+        STAR_SCHEMA_TABLES,
+    )
+    from scripts.db_setup import PRIMARY_KEYS
+    from scripts.aws import get_client
+except ImportError:
+    from airflow_home.dags.scripts.logs import setup_logging
+    from airflow_home.dags.scripts.helpers import (
+        generate_filename,
+        season_of,
+        TABLE_NAMES,
+        STAR_SCHEMA_TABLES,
+    )
+    from airflow_home.dags.scripts.db_setup import PRIMARY_KEYS
+    from airflow_home.dags.scripts.aws import get_client
+
+setup_logging()
+
+# Key under a season's prefix marking it frozen, and the prefix of its compacted tables
+FROZEN_MARKER = "frozen.json"
+FINAL_PREFIX = "final"
+
+# Rows per row group of the compacted files, larger than the daily files as they are read far more than written
+FINAL_ROW_GROUP_SIZE = 1_000_000
+
+
+def freeze_season(bucket_name, season):
+    """
+    Freezes a finished season - its last complete run's tables are compacted into one sorted Parquet
+    file per table under '{season}/final/', and its daily files are deleted
+
+    Frozen seasons are skipped by backfills, and loads only ever replace the current season's rows,
+    so a frozen season is never reprocessed
+
+    Parameters:
+        bucket_name (str): Name of the S3 bucket holding the transformed parquet files
+        season (str): Season to freeze, e.g. "2023-24"
+
+    Returns:
+        dict: The frozen marker - season, ds of the compacted run, frozen_at and row counts per table
+
+    Side Effects:
+        On success - compacted files and the frozen marker written, daily files deleted
+        On failure - error message logged and exception raised, daily files kept
+    """
+    try:
+        if season == season_of():
+            raise ValueError(f"{season} is the current season")
+        if is_frozen(bucket_name, season):
+            logging.info(f"freeze_season: {season} is already frozen")
+            return read_marker(bucket_name, season)
+
+        s3 = get_client("s3")
+        dates = season_dates(bucket_name, season)
+        complete = [ds for ds in dates if has_output(bucket_name, ds)]
+        if not complete:
+            raise ValueError(f"{season} has no run with every table")
+        last_ds = complete[-1]
+
+        row_counts = {}
+        # runs transformed before the aggregate tables were added only hold the star schema
+        for table_name in output_tables(bucket_name, last_ds):
+            response = s3.get_object(
+                Bucket=bucket_name,
+                Key=f"{generate_filename(table_name, last_ds)}.parquet",
+            )
+            table = pq.read_table(io.BytesIO(response["Body"].read()))
+            table = table.sort_by(
+                [(column, "ascending") for column in PRIMARY_KEYS[table_name]]
+            )
+
+            buffer = io.BytesIO()
+            pq.write_table(
+                table,
+                buffer,
+                row_group_size=FINAL_ROW_GROUP_SIZE,
+                compression="zstd",
+            )
+            s3.put_object(
+                Bucket=bucket_name,
+                Key=f"{season}/{FINAL_PREFIX}/{table_name}.parquet",
+                Body=buffer.getvalue(),
+            )
+            row_counts[table_name] = table.num_rows
+
+        marker = {
+            "season": season,
+            "ds": last_ds,
+            "frozen_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "row_counts": row_counts,
+        }
+        # the marker is written before the daily files are deleted, so a failed delete still leaves
+        # the season frozen, with its compacted files in place
+        s3.put_object(
+            Bucket=bucket_name,
+            Key=f"{season}/{FROZEN_MARKER}",
+            Body=json.dumps(marker),
+        )
+        delete_daily_files(bucket_name, season, dates)
+
+        logging.info(
+            f"freeze_season: {season} frozen from {last_ds}, {len(dates)} daily runs compacted"
+        )
+        return marker
+    except Exception as e:
+        logging.error(f"freeze_season Error for {season}: {e}")
+        raise
+
+
+def is_frozen(bucket_name, season):
+    """Check whether a season has been frozen"""
+    try:
+        get_client("s3").head_object(
+            Bucket=bucket_name, Key=f"{season}/{FROZEN_MARKER}"
+        )
+        return True
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+            return False
+        raise
+
+
+def read_marker(bucket_name, season):
+    """The frozen marker of a season"""
+    response = get_client("s3").get_object(
+        Bucket=bucket_name, Key=f"{season}/{FROZEN_MARKER}"
+    )
+    return json.loads(response["Body"].read())
+
+
+def season_dates(bucket_name, season):
+    """Sorted run dates with files under a season's prefix"""
+    paginator = get_client("s3").get_paginator("list_objects_v2")
+    dates = []
+    for page in paginator.paginate(
+        Bucket=bucket_name, Prefix=f"{season}/", Delimiter="/"
+    ):
+        for prefix in page.get("CommonPrefixes", []):
+            ds = prefix["Prefix"][len(season) + 1 : -1]
+            if ds != FINAL_PREFIX:
+                dates.append(ds)
+    return sorted(dates)
+
+
+def has_output(bucket_name, ds):
+    """Check whether the parquet files of every star schema table exist under a date's prefix"""
+    return set(STAR_SCHEMA_TABLES) <= set(output_tables(bucket_name, ds))
+
+
+def output_tables(bucket_name, ds):
+    """The tables, in TABLE_NAMES order, with a parquet file under a date's prefix"""
+    response = get_client("s3").list_objects_v2(
+        Bucket=bucket_name, Prefix=generate_filename("", ds)
+    )
+    keys = {item["Key"] for item in response.get("Contents", [])}
+    return [
+        table_name
+        for table_name in TABLE_NAMES
+        if f"{generate_filename(table_name, ds)}.parquet" in keys
+    ]
+
+
+def delete_daily_files(bucket_name, season, dates):
+    """Delete every file under the daily prefixes of a season, 1000 keys per request"""
+    s3 = get_client("s3")
+    paginator = s3.get_paginator("list_objects_v2")
+    for ds in dates:
+        for page in paginator.paginate(Bucket=bucket_name, Prefix=f"{season}/{ds}/"):
+            keys = [{"Key": item["Key"]} for item in page.get("Contents", [])]
+            if keys:
+                s3.delete_objects(Bucket=bucket_name, Delete={"Objects": keys})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Freeze a finished season, compacting its transformed tables"
+    )
+    parser.add_argument("season", help="Season to freeze, e.g. 2023-24")
+    args = parser.parse_args()
+
+    load_dotenv()
+    marker = freeze_season(os.environ["s3_transform_bucket_name"], args.season)
+    print(json.dumps(marker, indent=2))
@@ -0,0 +1,262 @@
+import os
+import json
+import time
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+# Lambda's working directory is read-only, so the log files and metrics artifacts go to /tmp there
+if os.environ.get("AWS_LAMBDA_FUNCTION_NAME"):
+    os.chdir("/tmp")
+    os.environ.setdefault("log_dir", "/tmp/logs")
+
+try:
+    from scripts.logs import setup_logging, log_context
+    from scripts.helpers import (
+        generate_endpoints,
+        today_ds,
+        TABLE_NAMES,
+        TRANSFORM_GROUPS,
+    )
+    from scripts.aws import get_client
+    from scripts import tasks
+except ImportError:
+    from airflow_home.dags.scripts.logs import setup_logging, log_context
+    from airflow_home.dags.scripts.helpers import (
+        generate_endpoints,
+        today_ds,
+        TABLE_NAMES,
+        TRANSFORM_GROUPS,
+    )
+    from airflow_home.dags.scripts.aws import get_client
+    from airflow_home.dags.scripts import tasks
+
+setup_logging()
+
+# Endpoints extracted per invocation - the gameweek endpoints are small, so batching them keeps the
+# number of cold starts down while still extracting every batch in parallel
+EXTRACT_BATCH_SIZE = 10
+
+# Threads per extract invocation, the requests of a batch are I/O bound
+EXTRACT_THREADS = 5
+
+
+def lambda_handler(event, context):
+    """
+    Single Lambda entry point of the serverless execution mode, dispatching on the event's stage
+
+    Events:
+        {"stage": "extract", "endpoints": [...], "ds": ...} - extract a batch of endpoints
+        {"stage": "transform", "table_names": [...], "ds": ...} - transform a group of tables
+        {"stage": "prepare_db"} - apply pending schema migrations
+        {"stage": "load", "table_name": ..., "ds": ...} - load one table
+        {"stage": "swap"} - swap the staged tables into place, in swap mode
+        {"stage": "run", "ds": ...} - run the whole pipeline, fanning out to this function
+
+    Parameters:
+        event (dict): Invocation event
+        context (LambdaContext): Lambda runtime context, unused
+
+    Returns:
+        dict: {"stage": ..., "result": ...} - the stage's return value, JSON serialisable
+
+    Side Effects:
+        On failure - error message logged and exception raised, failing the invocation
+    """
+    stage = event.get("stage")
+    try:
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage {stage}")
+        with log_context(stage=stage):
+            result = STAGES[stage](event)
+            logging.info(f"lambda_handler: {stage} complete")
+        return {"stage": stage, "result": result}
+    except Exception as e:
+        logging.error(f"lambda_handler Error, stage {stage}: {e}")
+        raise
+
+
+def extract_stage(event):
+    """Extract a batch of endpoints into the extract bucket, see tasks.extract_task"""
+    endpoints = event["endpoints"]
+    with ThreadPoolExecutor(max_workers=EXTRACT_THREADS) as executor:
+        list(
+            executor.map(
+                lambda endpoint: tasks.extract_task(endpoint, ds=event.get("ds")),
+                endpoints,
+            )
+        )
+    return endpoints
+
+
+def transform_stage(event):
+    """Transform a group of tables into the transform bucket, see tasks.transform_task"""
+    tasks.transform_task(event["table_names"], ds=event.get("ds"))
+    return event["table_names"]
+
+
+def prepare_db_stage(event):
+    """Apply pending schema migrations, see tasks.prepare_db_task"""
+    return tasks.prepare_db_task()
+
+
+def load_stage(event):
+    """Load one table into the database, see tasks.load_task"""
+    return tasks.load_task(event["table_name"], ds=event.get("ds"))
+
+
+def swap_stage(event):
+    """Swap the staged tables into place in swap mode, see tasks.swap_task"""
+    return tasks.swap_task(ds=event.get("ds"))
+
+
+def run_stage(event):
+    """Run the whole pipeline, invoking the function named by lambda_function_name for each stage"""
+    function_name = event.get("function_name") or os.environ["lambda_function_name"]
+    return run_fanout(lambda_invoker(function_name), ds=event.get("ds"))
+
+
+STAGES = {
+    "extract": extract_stage,
+    "transform": transform_stage,
+    "prepare_db": prepare_db_stage,
+    "load": load_stage,
+    "swap": swap_stage,
+    "run": run_stage,
+}
+
+
+def run_fanout(invoke, ds=None, batch_size=EXTRACT_BATCH_SIZE, max_workers=None):
+    """
+    Runs Extract, Transform and Load as parallel invocations of lambda_handler, waiting for every
+    invocation of a stage to finish before the next stage starts
+
+    Extract fans out one invocation per batch of endpoints and Transform one per TRANSFORM_GROUPS
+    group of tables. Load
+    migrates the database once, fans out one invocation per table, then swaps in swap mode
+
+    Parameters:
+        invoke (function): Invokes lambda_handler with an event and returns its result - invoke_local
+            to run in this process, or lambda_invoker(function_name) to invoke a deployed function
+        ds (str): Logical date of the run (YYYY-MM-DD), defaults to today
+        batch_size (int): Endpoints extracted per invocation
+        max_workers (int): Concurrent invocations per stage, defaults to one per invocation
+
+    Returns:
+        dict: Seconds per stage, and the load results per table
+
+    Side Effects:
+        On success - raw JSON and parquet files saved to S3 and the database loaded
+        On failure - error message logged and exception raised, later stages not invoked
+    """
+    # resolve the date once, so a run spanning midnight writes a single prefix
+    ds = ds or today_ds()
+    endpoints = generate_endpoints()
+    batches = [
+        endpoints[i : i + batch_size] for i in range(0, len(endpoints), batch_size)
+    ]
+    timings = {}
+
+    try:
+        start_time = time.perf_counter()
+        fan_out(
+            invoke,
+            [{"stage": "extract", "endpoints": batch, "ds": ds} for batch in batches],
+            max_workers,
+        )
+        timings["extract"] = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        fan_out(
+            invoke,
+            [
+                {"stage": "transform", "table_names": table_names, "ds": ds}
+                for table_names in TRANSFORM_GROUPS
+            ],
+            max_workers,
+        )
+        timings["transform"] = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        invoke({"stage": "prepare_db"})
+        loads = fan_out(
+            invoke,
+            [
+                {"stage": "load", "table_name": table_name, "ds": ds}
+                for table_name in TABLE_NAMES
+            ],
+            max_workers,
+        )
+        invoke({"stage": "swap", "ds": ds})
+        timings["load"] = time.perf_counter() - start_time
+
+        logging.info(
+            f"run_fanout: {ds} complete, {len(batches)} extract invocations, {json.dumps(timings)}"
+        )
+        return {
+            "ds": ds,
+            "timings": timings,
+            "loads": dict(zip(TABLE_NAMES, (load["result"] for load in loads))),
+        }
+    except Exception as e:
+        logging.error(f"run_fanout Error for {ds}: {e}")
+        raise
+
+
+def fan_out(invoke, events, max_workers=None):
+    """Invoke every event concurrently and wait for all of them, raising the first failure"""
+    with ThreadPoolExecutor(max_workers=max_workers or len(events)) as executor:
+        return list(executor.map(invoke, events))
+
+
+def invoke_local(event):
+    """
+    Invokes lambda_handler in this process, round-tripping the event and result through JSON as
+    the Lambda service would
+    """
+    result = lambda_handler(json.loads(json.dumps(event)), None)
+    return json.loads(json.dumps(result))
+
+
+def lambda_invoker(function_name):
+    """
+    Creates an invoke function calling a deployed function synchronously
+
+    Parameters:
+        function_name (str): Name or ARN of the function deployed with lambda_handler
+
+    Returns:
+        function: Takes an event and returns the handler's result, raising if the invocation failed
+    """
+
+    def invoke(event):
+        response = get_client("lambda").invoke(
+            FunctionName=function_name,
+            InvocationType="RequestResponse",
+            Payload=json.dumps(event).encode(),
+        )
+        payload = json.loads(response["Payload"].read() or "null")
+        if response.get("FunctionError"):
+            raise RuntimeError(
+                f"{function_name} failed for {event.get('stage')}: "
+                f"{payload.get('errorMessage') if isinstance(payload, dict) else payload}"
+            )
+        return payload
+
+    return invoke
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run the pipeline as fanned out lambda_handler invocations"
+    )
+    parser.add_argument("--ds", help="Run date (YYYY-MM-DD), defaults to today")
+    parser.add_argument(
+        "--function-name",
+        help="Invoke this deployed Lambda function, defaults to invoking the handler locally",
+    )
+    parser.add_argument("--batch-size", type=int, default=EXTRACT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    invoke = lambda_invoker(args.function_name) if args.function_name else invoke_local
+    print(json.dumps(run_fanout(invoke, args.ds, args.batch_size), indent=2))
@@ -0,0 +1,174 @@
+import os
+import logging
+import importlib
+
+try:
+    from scripts.logs import setup_logging
+except ImportError:
+    from airflow_home.dags.scripts.logs import setup_logging
+
+# Task callables of etl_dag.py. The scheduler imports this module every time it parses the DAG
+# file, so only the standard library is imported at the top level - the pipeline scripts (and
+# pandas, awswrangler, boto3 and SQLAlchemy with them), .env, the environment variables and the
+# logging setup are only loaded once a task runs
+
+
+def extract_task(endpoint, ds=None):
+    """
+    Extracts one endpoint into the extract bucket, see extract.extract_endpoint
+
+    Parameters:
+        endpoint (str): FPL API endpoint
+        ds (str): Logical date of the run (YYYY-MM-DD)
+
+    Returns:
+        Nothing
+    """
+    settings = load_settings()
+    _script("extract").extract_endpoint(
+        endpoint, settings["extract_bucket_name"], ds=ds
+    )
+
+
+def update_schedule_task(schedule_path, ds=None):
+    """
+    Rebuilds the timetable's schedule file from the run's extracted data, see schedule.update_schedule
+
+    Parameters:
+        schedule_path (str): Path of the schedule file read by GameweekTimetable
+        ds (str): Logical date of the run (YYYY-MM-DD)
+
+    Returns:
+        list: Run times as ISO 8601 UTC strings
+    """
+    settings = load_settings()
+    return _script("schedule").update_schedule(
+        settings["extract_bucket_name"], schedule_path, ds=ds
+    )
+
+
+def transform_task(table_names, ds=None):
+    """
+    Transforms a group of tables into the transform bucket, see transform.transform_group
+
+    Parameters:
+        table_names (list): Names of the tables, one of TRANSFORM_GROUPS
+        ds (str): Logical date of the run (YYYY-MM-DD)
+
+    Returns:
+        Nothing
+    """
+    settings = load_settings()
+    _script("transform").transform_group(
+        table_names,
+        settings["extract_bucket_name"],
+        settings["transform_bucket_name"],
+        ds=ds,
+    )
+
+
+def prepare_db_task():
+    """
+    Applies pending schema migrations before the loads, see load.prepare_db
+
+    Parameters:
+        None
+
+    Returns:
+        int: Schema version of the database after migrating
+    """
+    settings = load_settings()
+    return _script("load").prepare_db(**settings["db_credentials"])
+
+
+def load_task(table_name, ds=None):
+    """
+    Loads one table into the database with the rds_* load settings, see load.load_single_table
+
+    Parameters:
+        table_name (str): Name of the table, one of TABLE_NAMES
+        ds (str): Logical date of the run (YYYY-MM-DD)
+
+    Returns:
+        dict: Inserted/updated/deleted row counts in merge mode, otherwise Nothing
+    """
+    settings = load_settings()
+    return _script("load").load_single_table(
+        **settings["db_credentials"],
+        bucket_name=settings["transform_bucket_name"],
+        table_name=table_name,
+        ds=ds,
+        **settings["load_options"],
+    )
+
+
+def swap_task(ds=None):
+    """
+    Swaps the staged tables into place once every table has loaded, see load.swap_tables
+
+    Parameters:
+        ds (str): Logical date of the run (YYYY-MM-DD)
+
+    Returns:
+        Nothing
+
+    Side Effects:
+        Unless rds_load_mode is swap - nothing to swap, so the task only logs and returns
+    """
+    settings = load_settings()
+    if settings["load_options"]["mode"] != "swap":
+        logging.info(
+            f"swap_task: rds_load_mode is {settings['load_options']['mode']}, nothing to swap"
+        )
+        return
+    _script("load").swap_tables(
+        **settings["db_credentials"],
+        bucket_name=settings["transform_bucket_name"],
+        ds=ds,
+    )
+
+
+def load_settings():
+    """
+    Reads .env and the pipeline's environment variables, and sets up logging with them, as every
+    task calls it first
+
+    Parameters:
+        None
+
+    Returns:
+        dict: Bucket names, db_credentials and load_options (keyword arguments of load_single_table)
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    setup_logging()
+    return {
+        "extract_bucket_name": os.environ["s3_extract_bucket_name"],
+        "transform_bucket_name": os.environ["s3_transform_bucket_name"],
+        "db_credentials": {
+            "rds_user": os.environ["rds_user"],
+            "rds_password": os.environ["rds_password"],
+            "rds_host": os.environ["rds_host"],
+            "rds_port": os.environ["rds_port"],
+            "rds_db_name": os.environ["rds_db_name"],
+            "dialect": os.environ.get("rds_dialect", "mysql"),
+        },
+        "load_options": {
+            "method": os.environ.get("rds_load_method", "executemany"),
+            "chunk_size": int(os.environ.get("rds_load_chunk_size", 50000)),
+            "commit_per_chunk": os.environ.get("rds_commit_per_chunk", "false")
+            == "true",
+            "mode": os.environ.get("rds_load_mode", "replace"),
+            "batch_transactions": os.environ.get("rds_batch_transactions", "none"),
+            "verify": os.environ.get("rds_verify_load", "true") == "true",
+        },
+    }
+
+
+def _script(name):
+    """Import a pipeline script module on first use"""
+    try:
+        return importlib.import_module(f"scripts.{name}")
+    except ModuleNotFoundError:
+        return importlib.import_module(f"airflow_home.dags.scripts.{name}")
@@ -1,46 +1,160 @@
 import json
-from datetime import datetime
 import logging
-import boto3
 import awswrangler as wr
 import pandas as pd
+from botocore.exceptions import ClientError
 
 try:
-    from scripts.helpers import generate_filename
+    from scripts.logs import setup_logging, log_context
+    from scripts.helpers import (
+        generate_filename,
+        today_ds,
+        season_of,
+        AGGREGATE_TABLES,
+        TRANSFORM_GROUPS,
+    )
+    from scripts.metrics import timed, record, flushes_metrics
+    from scripts.aws import get_client, get_session
 except ImportError:
-    from airflow_home.dags.scripts.helpers import generate_filename
+    from airflow_home.dags.scripts.logs import setup_logging, log_context
+    from airflow_home.dags.scripts.helpers import (
+        generate_filename,
+        today_ds,
+        season_of,
+        AGGREGATE_TABLES,
+        TRANSFORM_GROUPS,
+    )
+    from airflow_home.dags.scripts.metrics import timed, record, flushes_metrics
+    from airflow_home.dags.scripts.aws import get_client, get_session
+
+setup_logging()
+
+# Player stats of the event/{gw}/live endpoint
+LIVE_STATS_COLUMNS = [
+    "minutes",
+    "goals_scored",
+    "assists",
+    "clean_sheets",
+    "goals_conceded",
+    "own_goals",
+    "penalties_saved",
+    "penalties_missed",
+    "yellow_cards",
+    "red_cards",
+    "saves",
+    "bonus",
+    "bps",
+    "total_points",
+]
+
+# Players per gameweek in agg_top_scorers
+TOP_SCORERS = 10
+
+# Team of the week formation - (fewest, most) players of each FPL position (element_type:
+# 1 goalkeeper, 2 defender, 3 midfielder, 4 forward) in a team of TEAM_OF_THE_WEEK_SIZE
+FORMATION = {1: (1, 1), 2: (3, 5), 3: (2, 5), 4: (1, 3)}
+TEAM_OF_THE_WEEK_SIZE = 11
+
+
+@flushes_metrics
+def transform_data(source_bucket, destination_bucket, ds=None):
+    """
+    Executes full Transform process, invoking table transformation functions & save_df_to_parquet_s3
+
+    Parameters:
+        source_bucket (str): Name of the source S3 bucket (containing previously extracted JSON files)
+        destination_bucket (str): Name of the target S3 bucket
+        ds (str): Logical date of the run (YYYY-MM-DD), selecting the key prefix read and written
+
+    Returns:
+        Nothing
 
-logging.basicConfig(filename="logs.log", encoding="utf-8", level=logging.INFO)
+    Side Effects:
+        On success - JSON files fetched from source S3 bucket, transformed with pandas and saved to target S3 bucket in parquet format
+    """
+    # resolve the date once, so a run spanning midnight reads and writes a single prefix
+    ds = ds or today_ds()
+    for table_names in TRANSFORM_GROUPS:
+        transform_group(table_names, source_bucket, destination_bucket, ds)
 
 
-def transform_data(source_bucket, destination_bucket):
+def transform_group(table_names, source_bucket, destination_bucket, ds=None):
     """
-    Executes full Transform process, invoking table transformation functions & save_df_to_parquet_s3
+    Transforms and saves tables as one task, see TRANSFORM_GROUPS - aggregate tables are built from
+    one read of the live data
+
+    Parameters:
+        table_names (list): Names of the tables, keys of TABLE_TRANSFORMS
+        source_bucket (str): Name of the source S3 bucket (containing previously extracted JSON files)
+        destination_bucket (str): Name of the target S3 bucket
+        ds (str): Logical date of the run (YYYY-MM-DD), selecting the key prefix read and written
+
+    Returns:
+        Nothing
+    """
+    ds = ds or today_ds()
+    stats_df = None
+    if set(table_names) & set(AGGREGATE_TABLES):
+        stats_df = retrieve_gameweek_stats(source_bucket, ds=ds)
+    for table_name in table_names:
+        transform_table(
+            table_name, source_bucket, destination_bucket, ds, stats_df=stats_df
+        )
+
+
+@flushes_metrics
+def transform_table(
+    table_name, source_bucket, destination_bucket, ds=None, stats_df=None
+):
+    """
+    Transforms and saves a single table, tagged with the season of ds, so each table can run (and retry) as its own task
 
     Parameters:
+        table_name (str): Name of the table, a key of TABLE_TRANSFORMS
         source_bucket (str): Name of the source S3 bucket (containing previously extracted JSON files)
         destination_bucket (str): Name of the target S3 bucket
+        ds (str): Logical date of the run (YYYY-MM-DD), selecting the key prefix read and written
+        stats_df (dataFrame): Gameweek stats from retrieve_gameweek_stats, used by the aggregate
+            tables instead of reading the live data again
 
     Returns:
         Nothing
 
     Side Effects:
-        On success - JSON files fetched from source S3 bucket, transformed with pandas and saved to target S3 bucket in parquet format
+        On success - JSON files fetched from source S3 bucket, transformed and saved to target S3 bucket in parquet format
     """
-    save_df_to_parquet_s3(
-        "fact_players", transform_fact_players(source_bucket), destination_bucket
-    )
-    save_df_to_parquet_s3(
-        "dim_players", transform_dim_players(source_bucket), destination_bucket
-    )
-    save_df_to_parquet_s3(
-        "dim_teams", transform_dim_teams(source_bucket), destination_bucket
-    )
-    save_df_to_parquet_s3(
-        "dim_fixtures", transform_dim_fixtures(source_bucket), destination_bucket
-    )
+    kwargs = {"stats_df": stats_df} if table_name in AGGREGATE_TABLES else {}
+    with log_context(stage="transform", table=table_name):
+        table_df = TABLE_TRANSFORMS[table_name](source_bucket, ds=ds, **kwargs).assign(
+            season=season_of(ds)
+        )
+        save_df_to_parquet_s3(table_name, table_df, destination_bucket, ds)
+
 
+def transform_tables(source_bucket=None, payloads=None, ds=None):
+    """
+    Transforms extracted data into the fact and dimension tables
 
+    Parameters:
+        source_bucket (str): Name of the source S3 bucket (containing previously extracted JSON files)
+        payloads (dict): Extracted API data keyed by endpoint, read instead of the source bucket when given
+        ds (str): Logical date of the run (YYYY-MM-DD), selecting the key prefix read
+
+    Returns:
+        dict: transformed dataFrames keyed by table name, each with the season of ds
+    """
+    # the aggregate tables are built from one read of the live data
+    stats_df = retrieve_gameweek_stats(source_bucket, payloads, ds)
+    tables = {}
+    for table_name, transform in TABLE_TRANSFORMS.items():
+        kwargs = {"stats_df": stats_df} if table_name in AGGREGATE_TABLES else {}
+        tables[table_name] = transform(source_bucket, payloads, ds, **kwargs).assign(
+            season=season_of(ds)
+        )
+    return tables
+
+
+@timed
 def retrieve_s3_json(bucket_name, file_name):
     """
     Executes full Transform process, invoking table transformation functions & save_df_to_parquet_s3
@@ -56,12 +170,14 @@ def retrieve_s3_json(bucket_name, file_name):
         On failure - error message logged
     """
     try:
-        s3 = boto3.client("s3")
+        s3 = get_client("s3")
         response = s3.get_object(
             Bucket=bucket_name,
             Key=file_name,
         )
-        response = json.loads(response["Body"].read().decode("utf-8"))
+        body = response["Body"].read()
+        record(byte_count=len(body))
+        response = json.loads(body.decode("utf-8"))
         logging.info(f"{file_name} retrieved successfully")
         return response
     except Exception as e:
@@ -69,7 +185,34 @@ def retrieve_s3_json(bucket_name, file_name):
         raise
 
 
-def save_df_to_parquet_s3(table_name, table_df, destination_bucket):
+def retrieve_payload(bucket_name, endpoint, payloads=None, ds=None):
+    """
+    Retrieves the extracted data of one API endpoint
+
+    Parameters:
+        bucket_name (str): Name of the source S3 bucket
+        endpoint (str): The FPL API endpoint, e.g. "fixtures"
+        payloads (dict): Extracted API data keyed by endpoint, used instead of S3 when given
+        ds (str): Logical date of the run (YYYY-MM-DD), selecting the key prefix read
+
+    Returns:
+        dict: The extracted data
+    """
+    if payloads is not None:
+        return payloads[endpoint]
+    try:
+        return retrieve_s3_json(bucket_name, f"{generate_filename(endpoint, ds)}.json")
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "NoSuchKey":
+            raise
+        # data extracted before keys were prefixed with the season is stored under '{ds}/{endpoint}'
+        legacy_key = f"{ds or today_ds()}/{endpoint}.json"
+        logging.info(f"retrieve_payload: {endpoint} not found, trying {legacy_key}")
+        return retrieve_s3_json(bucket_name, legacy_key)
+
+
+@timed
+def save_df_to_parquet_s3(table_name, table_df, destination_bucket, ds=None):
     """
     Retrieves a desired table_name, dataframe, and s3 bucket name, converts the dataframe to parquet file format and uploads this file to the bucket using awswrangler.
 
@@ -77,33 +220,39 @@ def save_df_to_parquet_s3(table_name, table_df, destination_bucket):
         table_name (str): The name of the table which you want to use in the s3 key
         table_df (DataFrame): The DataFrame object which you want to convert to parquet
         bucket (str): The name of the S3 bucket you want to upload the file to
+        ds (str): Logical date of the run (YYYY-MM-DD), used as the key prefix, defaults to today
 
     Returns:
         Nothing
 
     Side Effects:
         On success - Parquet file added to S3 bucket
-        On failure - Exception printed to console
+        On failure - error message logged and exception raised, so the task fails
     """
 
     try:
         # set the desired location for the parquet file
-        path = f"s3://{destination_bucket}/{generate_filename(table_name)}.parquet"
+        path = f"s3://{destination_bucket}/{generate_filename(table_name, ds)}.parquet"
 
         # convert the DataFrame to parquet and save to path in s3 bucket
-        output = wr.s3.to_parquet(table_df, path)
+        output = wr.s3.to_parquet(table_df, path, boto3_session=get_session())
+        record(row_count=len(table_df))
 
         logging.info(f"Added to bucket: {output}")
     except Exception as e:
         logging.error(f"save_df_to_parquet_s3 Error processing {table_name}: {e}")
+        raise
 
 
-def transform_fact_players(bucket_name):
+@timed
+def transform_fact_players(bucket_name, payloads=None, ds=None):
     """
     Transforms data to create transform_fact_players table
 
     Parameters:
         bucket_name (str): Name of the source S3 bucket
+        payloads (dict): Extracted API data keyed by endpoint, used instead of the bucket when given
+        ds (str): Logical date of the run (YYYY-MM-DD), selecting the key prefix read
 
     Returns:
         dataFrame: transformed data object
@@ -112,15 +261,11 @@ def transform_fact_players(bucket_name):
         On failure - error message logged
     """
     try:
-        current_timestamp = datetime.now().strftime("%Y-%m-%d")
-
         # retrieve JSON files from S3 bucket
-        bootstrap_static_list = retrieve_s3_json(
-            bucket_name, f"{current_timestamp}/bootstrap-static.json"
-        )
-        fixtures_list = retrieve_s3_json(
-            bucket_name, f"{current_timestamp}/fixtures.json"
+        bootstrap_static_list = retrieve_payload(
+            bucket_name, "bootstrap-static", payloads, ds
         )
+        fixtures_list = retrieve_payload(bucket_name, "fixtures", payloads, ds)
 
         # transform lists into DataFrames
         bs_elements_df = pd.DataFrame(bootstrap_static_list["elements"])
@@ -185,6 +330,7 @@ def transform_fact_players(bucket_name):
         fact_players_df.dropna(inplace=True)
 
         logging.info("transform_fact_players transformed successfully")
+        record(row_count=len(fact_players_df))
         return fact_players_df
 
     except KeyError as e:
@@ -192,12 +338,15 @@ def transform_fact_players(bucket_name):
         raise KeyError(f"transform_fact_players Missing required columns: {e}")
 
 
-def transform_dim_players(bucket_name):
+@timed
+def transform_dim_players(bucket_name, payloads=None, ds=None):
     """
     Transforms data to create transform_dim_players table
 
     Parameters:
         bucket_name (str): Name of the source S3 bucket
+        payloads (dict): Extracted API data keyed by endpoint, used instead of the bucket when given
+        ds (str): Logical date of the run (YYYY-MM-DD), selecting the key prefix read
 
     Returns:
         dataFrame: transformed data object
@@ -206,11 +355,9 @@ def transform_dim_players(bucket_name):
         On failure - error message logged
     """
     try:
-        current_timestamp = datetime.now().strftime("%Y-%m-%d")
-
         # retrieve JSON files from S3 bucket
-        bootstrap_static_list = retrieve_s3_json(
-            bucket_name, f"{current_timestamp}/bootstrap-static.json"
+        bootstrap_static_list = retrieve_payload(
+            bucket_name, "bootstrap-static", payloads, ds
         )
 
         # transform list into DataFrame
@@ -223,6 +370,7 @@ def transform_dim_players(bucket_name):
 
         # return DataFrame
         logging.info("transform_dim_players transformed successfully")
+        record(row_count=len(dim_players_df))
         return dim_players_df[
             ["first_name", "second_name", "web_name", "player_id", "team_id"]
         ]
@@ -232,12 +380,15 @@ def transform_dim_players(bucket_name):
         raise KeyError(f"transform_dim_players Missing required columns: {e}")
 
 
-def transform_dim_teams(bucket_name):
+@timed
+def transform_dim_teams(bucket_name, payloads=None, ds=None):
     """
     Transforms data to create transform_dim_teams table
 
     Parameters:
         bucket_name (str): Name of the source S3 bucket
+        payloads (dict): Extracted API data keyed by endpoint, used instead of the bucket when given
+        ds (str): Logical date of the run (YYYY-MM-DD), selecting the key prefix read
 
     Returns:
         dataFrame: transformed data object
@@ -246,11 +397,9 @@ def transform_dim_teams(bucket_name):
         On failure - error message logged
     """
     try:
-        current_timestamp = datetime.now().strftime("%Y-%m-%d")
-
         # retrieve JSON files from S3 bucket
-        bootstrap_static_list = retrieve_s3_json(
-            bucket_name, f"{current_timestamp}/bootstrap-static.json"
+        bootstrap_static_list = retrieve_payload(
+            bucket_name, "bootstrap-static", payloads, ds
         )
 
         # transform list into DataFrame
@@ -268,6 +417,7 @@ def transform_dim_teams(bucket_name):
 
         # return DataFrame
         logging.info("transform_dim_teams transformed successfully")
+        record(row_count=len(dim_teams_df))
         return dim_teams_df[["team_id", "team_name", "team_name_short"]]
 
     except KeyError as e:
@@ -275,12 +425,15 @@ def transform_dim_teams(bucket_name):
         raise KeyError(f"transform_dim_teams Missing required columns: {e}")
 
 
-def transform_dim_fixtures(bucket_name):
+@timed
+def transform_dim_fixtures(bucket_name, payloads=None, ds=None):
     """
     Transforms data to create transform_dim_fixtures table
 
     Parameters:
         bucket_name (str): Name of the source S3 bucket
+        payloads (dict): Extracted API data keyed by endpoint, used instead of the bucket when given
+        ds (str): Logical date of the run (YYYY-MM-DD), selecting the key prefix read
 
     Returns:
         dataFrame: transformed data object
@@ -289,12 +442,8 @@ def transform_dim_fixtures(bucket_name):
         On failure - error message logged
     """
     try:
-        current_timestamp = datetime.now().strftime("%Y-%m-%d")
-
         # retrieve JSON files from S3 bucket
-        fixtures_list = retrieve_s3_json(
-            bucket_name, f"{current_timestamp}/fixtures.json"
-        )
+        fixtures_list = retrieve_payload(bucket_name, "fixtures", payloads, ds)
 
         # transform list into DataFrame
         dim_fixtures_df = pd.DataFrame(fixtures_list)
@@ -334,6 +483,7 @@ def transform_dim_fixtures(bucket_name):
 
         # return DataFrame
         logging.info("transform_dim_fixtures transformed successfully")
+        record(row_count=len(dim_fixtures_df))
         return dim_fixtures_df[
             [
                 "fixture_id",
@@ -353,3 +503,296 @@ def transform_dim_fixtures(bucket_name):
     except KeyError as e:
         logging.error(f"{e}")
         raise KeyError(f"transform_dim_fixtures Missing required columns: {e}")
+
+
+def live_stats_df(payload, gameweek_id):
+    """
+    Convert an event/{gw}/live payload into player stats rows
+
+    Parameters:
+        payload (dict): Data returned by the live endpoint
+        gameweek_id (int): Gameweek of the payload
+
+    Returns:
+        dataFrame: One row per player, indexed by player_id
+    """
+    elements = payload["elements"]
+    stats_df = pd.DataFrame(
+        [element["stats"] for element in elements], columns=LIVE_STATS_COLUMNS
+    )
+    stats_df = stats_df.fillna(0).astype("int64")
+    stats_df.insert(0, "gameweek_id", gameweek_id)
+    stats_df.index = pd.Index(
+        [element["id"] for element in elements], name="player_id", dtype="int64"
+    )
+    return stats_df
+
+
+@timed
+def retrieve_gameweek_stats(bucket_name, payloads=None, ds=None):
+    """
+    Player stats of every finished or current gameweek, from the extracted event/{gw}/live data
+
+    Parameters:
+        bucket_name (str): Name of the source S3 bucket
+        payloads (dict): Extracted API data keyed by endpoint, used instead of the bucket when given
+        ds (str): Logical date of the run (YYYY-MM-DD), selecting the key prefix read
+
+    Returns:
+        dataFrame: One row per player who played in a gameweek - player_id, team_id, position_id
+            and the LIVE_STATS_COLUMNS, sorted by gameweek, then points, bonus points system score
+            and player_id, so the best performers of each gameweek come first. team_id is the team
+            the player played for that gameweek, see gameweek_teams_df
+    """
+    bootstrap_static_list = retrieve_payload(
+        bucket_name, "bootstrap-static", payloads, ds
+    )
+    # later gameweeks' live data is all zeros, so only gameweeks under way are read
+    gameweek_ids = [
+        event["id"]
+        for event in bootstrap_static_list["events"]
+        if event.get("finished") or event.get("is_current")
+    ]
+    columns = ["player_id", "team_id", "position_id", "gameweek_id"]
+    if not gameweek_ids:
+        return pd.DataFrame(columns=columns + LIVE_STATS_COLUMNS, dtype="int64")
+
+    live_payloads = {
+        gw: retrieve_payload(bucket_name, f"event/{gw}/live", payloads, ds)
+        for gw in gameweek_ids
+    }
+    stats_df = pd.concat(
+        [
+            live_stats_df(payload, gw).reset_index()
+            for gw, payload in live_payloads.items()
+        ],
+        ignore_index=True,
+    )
+    players_df = pd.DataFrame(bootstrap_static_list["elements"])[
+        ["id", "team", "element_type"]
+    ].rename(
+        columns={"id": "player_id", "team": "team_id", "element_type": "position_id"}
+    )
+    teams_df = gameweek_teams_df(
+        live_payloads,
+        retrieve_payload(bucket_name, "fixtures", payloads, ds),
+        players_df[["player_id", "team_id"]],
+    )
+    stats_df = (
+        stats_df[stats_df["minutes"] > 0]
+        .merge(players_df[["player_id", "position_id"]], on="player_id")
+        .merge(teams_df, on=["player_id", "gameweek_id"])
+    )
+
+    return stats_df[columns + LIVE_STATS_COLUMNS].sort_values(
+        ["gameweek_id", "total_points", "bps", "player_id"],
+        ascending=[True, False, False, True],
+        ignore_index=True,
+    )
+
+
+def gameweek_teams_df(live_payloads, fixtures_list, players_df):
+    """
+    The team each player played for in each gameweek, so past gameweeks stay with the team they
+    were played for after a transfer
+
+    A player's fixtures of the gameweek come from the explain data of the live payload, and their
+    side of each from the fixture's bonus points system stats, which list every player who played
+    under the home or away team. Fixtures without stats fall back to the player's bootstrap-static
+    team, when it played in the fixture
+
+    Parameters:
+        live_payloads (dict): event/{gw}/live payloads keyed by gameweek
+        fixtures_list (list): Data returned by the fixtures endpoint
+        players_df (dataFrame): Current team_id of each player_id, from bootstrap-static
+
+    Returns:
+        dataFrame: player_id, gameweek_id and team_id of every player who played in a gameweek
+
+    Side Effects:
+        Players whose team can't be determined are dropped, with a warning logged
+    """
+    played_df = pd.DataFrame(
+        [
+            (element["id"], gw, explain["fixture"])
+            for gw, payload in live_payloads.items()
+            for element in payload["elements"]
+            if element["stats"].get("minutes")
+            for explain in element.get("explain", [])
+        ],
+        columns=["player_id", "gameweek_id", "fixture_id"],
+        dtype="int64",
+    )
+    fixtures_df = pd.DataFrame(
+        [
+            (fixture["id"], fixture["team_h"], fixture["team_a"])
+            for fixture in fixtures_list
+        ],
+        columns=["fixture_id", "team_h", "team_a"],
+        dtype="int64",
+    )
+    sides_df = pd.DataFrame(
+        [
+            (fixture["id"], entry["element"], fixture[f"team_{side}"])
+            for fixture in fixtures_list
+            for stat in fixture.get("stats", [])
+            if stat["identifier"] == "bps"
+            for side in ("h", "a")
+            for entry in stat[side]
+        ],
+        columns=["fixture_id", "player_id", "team_id"],
+        dtype="int64",
+    ).drop_duplicates(["fixture_id", "player_id"])
+
+    teams_df = (
+        played_df.merge(fixtures_df, on="fixture_id", how="left")
+        .merge(sides_df, on=["fixture_id", "player_id"], how="left")
+        .merge(
+            players_df.rename(columns={"team_id": "current_team_id"}),
+            on="player_id",
+            how="left",
+        )
+    )
+    in_fixture = (teams_df["current_team_id"] == teams_df["team_h"]) | (
+        teams_df["current_team_id"] == teams_df["team_a"]
+    )
+    teams_df["team_id"] = teams_df["team_id"].fillna(
+        teams_df["current_team_id"].where(in_fixture)
+    )
+
+    # a double gameweek has two fixtures, both of the same team
+    known_df = (
+        teams_df.dropna(subset=["team_id"])
+        .drop_duplicates(["player_id", "gameweek_id"])
+        .astype({"team_id": "int64"})
+    )
+    unknown = len(played_df.drop_duplicates(["player_id", "gameweek_id"])) - len(
+        known_df
+    )
+    if unknown:
+        logging.warning(
+            f"gameweek_teams_df: team unknown for {unknown} player gameweeks, dropped"
+        )
+    return known_df[["player_id", "gameweek_id", "team_id"]].reset_index(drop=True)
+
+
+@timed
+def transform_agg_top_scorers(bucket_name, payloads=None, ds=None, stats_df=None):
+    """
+    Transforms data to create agg_top_scorers table - the TOP_SCORERS highest scoring players of
+    each gameweek, ranked by points, then bonus points system score
+
+    Parameters:
+        bucket_name (str): Name of the source S3 bucket
+        payloads (dict): Extracted API data keyed by endpoint, used instead of the bucket when given
+        ds (str): Logical date of the run (YYYY-MM-DD), selecting the key prefix read
+        stats_df (dataFrame): Gameweek stats from retrieve_gameweek_stats, read when not given
+
+    Returns:
+        dataFrame: transformed data object
+    """
+    if stats_df is None:
+        stats_df = retrieve_gameweek_stats(bucket_name, payloads, ds)
+
+    # rows are already in rank order within each gameweek, so the top k are the first k
+    top_df = stats_df.groupby("gameweek_id").head(TOP_SCORERS)
+    top_df = top_df.assign(points_rank=top_df.groupby("gameweek_id").cumcount() + 1)
+
+    logging.info("transform_agg_top_scorers transformed successfully")
+    record(row_count=len(top_df))
+    return top_df[
+        [
+            "gameweek_id",
+            "points_rank",
+            "player_id",
+            "team_id",
+            "total_points",
+            "goals_scored",
+            "assists",
+            "bonus",
+        ]
+    ]
+
+
+@timed
+def transform_agg_team_of_the_week(bucket_name, payloads=None, ds=None, stats_df=None):
+    """
+    Transforms data to create agg_team_of_the_week table - the highest scoring eleven of each
+    gameweek in a valid FPL formation (see FORMATION)
+
+    Each gameweek's team is its best goalkeeper, three defenders, two midfielders and forward, plus
+    the best of the remaining players up to each position's maximum
+
+    Parameters:
+        bucket_name (str): Name of the source S3 bucket
+        payloads (dict): Extracted API data keyed by endpoint, used instead of the bucket when given
+        ds (str): Logical date of the run (YYYY-MM-DD), selecting the key prefix read
+        stats_df (dataFrame): Gameweek stats from retrieve_gameweek_stats, read when not given
+
+    Returns:
+        dataFrame: transformed data object
+    """
+    if stats_df is None:
+        stats_df = retrieve_gameweek_stats(bucket_name, payloads, ds)
+
+    position_rank = stats_df.groupby(["gameweek_id", "position_id"]).cumcount() + 1
+    fewest = stats_df["position_id"].map({p: low for p, (low, _) in FORMATION.items()})
+    most = stats_df["position_id"].map({p: high for p, (_, high) in FORMATION.items()})
+    required_df = stats_df[position_rank <= fewest]
+    # still in rank order within each gameweek, so the best remaining players come first
+    remaining_df = stats_df[(position_rank > fewest) & (position_rank <= most)]
+    spare_places = TEAM_OF_THE_WEEK_SIZE - sum(low for low, _ in FORMATION.values())
+    team_df = pd.concat(
+        [required_df, remaining_df.groupby("gameweek_id").head(spare_places)]
+    ).sort_values(
+        ["gameweek_id", "position_id", "total_points"], ascending=[True, True, False]
+    )
+
+    logging.info("transform_agg_team_of_the_week transformed successfully")
+    record(row_count=len(team_df))
+    return team_df[
+        ["gameweek_id", "player_id", "team_id", "position_id", "total_points"]
+    ].reset_index(drop=True)
+
+
+@timed
+def transform_agg_team_points(bucket_name, payloads=None, ds=None, stats_df=None):
+    """
+    Transforms data to create agg_team_points table - the points, goals, assists and bonus points
+    of each team's players per gameweek
+
+    Parameters:
+        bucket_name (str): Name of the source S3 bucket
+        payloads (dict): Extracted API data keyed by endpoint, used instead of the bucket when given
+        ds (str): Logical date of the run (YYYY-MM-DD), selecting the key prefix read
+        stats_df (dataFrame): Gameweek stats from retrieve_gameweek_stats, read when not given
+
+    Returns:
+        dataFrame: transformed data object
+    """
+    if stats_df is None:
+        stats_df = retrieve_gameweek_stats(bucket_name, payloads, ds)
+
+    team_df = stats_df.groupby(["gameweek_id", "team_id"], as_index=False).agg(
+        total_points=("total_points", "sum"),
+        goals_scored=("goals_scored", "sum"),
+        assists=("assists", "sum"),
+        bonus=("bonus", "sum"),
+        player_count=("player_id", "count"),
+    )
+
+    logging.info("transform_agg_team_points transformed successfully")
+    record(row_count=len(team_df))
+    return team_df
+
+
+# Transformation function of each table, keyed by table name
+TABLE_TRANSFORMS = {
+    "fact_players": transform_fact_players,
+    "dim_players": transform_dim_players,
+    "dim_teams": transform_dim_teams,
+    "dim_fixtures": transform_dim_fixtures,
+    "agg_top_scorers": transform_agg_top_scorers,
+    "agg_team_of_the_week": transform_agg_team_of_the_week,
+    "agg_team_points": transform_agg_team_points,
+}
@@ -0,0 +1,216 @@
+import math
+import zlib
+import hashlib
+import logging
+import pyarrow as pa
+import pyarrow.compute as pc
+
+try:
+    from scripts.logs import setup_logging
+    from scripts.metrics import timed
+except ImportError:
+    from airflow_home.dags.scripts.logs import setup_logging
+    from airflow_home.dags.scripts.metrics import timed
+
+setup_logging()
+
+# SQL expression summed per column kind, for each dialect - {} is replaced by the column name
+# Each must match how TableChecksum aggregates the same kind on the source data
+CHECKSUM_EXPRESSIONS = {
+    "mysql": {
+        "int": "{}",
+        "bool": "{}",
+        "float": "{}",
+        "date": "DATEDIFF({}, '1970-01-01')",
+        "time": "TIME_TO_SEC({})",
+        "string": "CRC32({})",
+    },
+    "postgresql": {
+        "int": "{}",
+        "bool": "{}::int",
+        "float": "{}",
+        "date": "({} - DATE '1970-01-01')",
+        "time": "EXTRACT(EPOCH FROM {})",
+        "string": "('x' || substr(md5({}), 1, 8))::bit(32)::bigint",
+    },
+}
+
+
+class TableChecksum:
+    """
+    Order-independent row count and per-column checksums of source data, accumulated batch by batch
+
+    Each column gets a non-null count and a sum - of the value for numbers and bools, of days
+    since 1970-01-01 for dates, of seconds for times, and of a 32 bit hash for strings
+
+    Parameters:
+        dialect (str): "mysql" or "postgresql", selects the string hash the server can reproduce
+    """
+
+    def __init__(self, dialect="mysql"):
+        self.dialect = "postgresql" if dialect == "postgresql" else "mysql"
+        self.row_count = 0
+        self.kinds = {}
+        self.counts = {}
+        self.sums = {}
+
+    def track(self, batches):
+        """Yield batches unchanged, updating the checksum with each one"""
+        for batch in batches:
+            self.update(batch)
+            yield batch
+
+    def update(self, batch):
+        """Add a dataFrame or Arrow RecordBatch to the checksum"""
+        if not isinstance(batch, (pa.RecordBatch, pa.Table)):
+            batch = pa.RecordBatch.from_pandas(batch, preserve_index=False)
+
+        self.row_count += batch.num_rows
+        for name in batch.schema.names:
+            column = batch[name]
+            # an all-null batch has no type, so its column takes the kind of a later batch
+            if self.kinds.get(name, "null") == "null":
+                self.kinds[name] = column_kind(column.type)
+            kind = self.kinds[name]
+            self.counts[name] = (
+                self.counts.get(name, 0) + len(column) - column.null_count
+            )
+            self.sums[name] = self.sums.get(name, 0) + self.column_sum(column, kind)
+
+    def column_sum(self, column, kind):
+        """Vectorised sum of one column, matching CHECKSUM_EXPRESSIONS"""
+        if column.null_count == len(column):
+            return 0
+        if kind in ("int", "bool"):
+            total = pc.sum(column.cast(pa.int64())).as_py()
+        elif kind == "float":
+            total = pc.sum(column).as_py()
+        elif kind == "date":
+            total = pc.sum(column.cast(pa.int32()).cast(pa.int64())).as_py()
+        elif kind == "time":
+            units_per_second = {"s": 1, "ms": 10**3, "us": 10**6, "ns": 10**9}
+            units = column.cast(pa.int64())
+            total = pc.sum(pc.divide(units, units_per_second[column.type.unit])).as_py()
+        elif kind == "string":
+            total = sum(
+                string_hash(value, self.dialect)
+                for value in column.to_pylist()
+                if value is not None
+            )
+        else:
+            total = 0
+        return total or 0
+
+    def sql(self, table_name, season=None):
+        """SELECT statement computing the same checksums on the server, as a single row - over one
+        season's rows, bound as a parameter, when season is given"""
+        expressions = ["COUNT(*)"]
+        for name, kind in self.kinds.items():
+            expressions.append(f"COUNT({name})")
+            if kind in CHECKSUM_EXPRESSIONS[self.dialect]:
+                expression = CHECKSUM_EXPRESSIONS[self.dialect][kind].format(name)
+                expressions.append(f"SUM({expression})")
+            else:
+                expressions.append("0")
+        sql = f"SELECT {', '.join(expressions)} FROM {table_name}"
+        return sql if season is None else f"{sql} WHERE season = %s"
+
+    def expected(self):
+        """Source checksums, in the same order as the columns of sql()"""
+        values = [self.row_count]
+        for name in self.kinds:
+            values.extend([self.counts[name], self.sums[name]])
+        return values
+
+
+def column_kind(arrow_type):
+    """Classify an Arrow type into a checksum kind"""
+    if pa.types.is_null(arrow_type):
+        return "null"
+    if pa.types.is_boolean(arrow_type):
+        return "bool"
+    if pa.types.is_integer(arrow_type):
+        return "int"
+    if pa.types.is_floating(arrow_type):
+        return "float"
+    if pa.types.is_date(arrow_type):
+        return "date"
+    if pa.types.is_time(arrow_type):
+        return "time"
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return "string"
+    return "other"
+
+
+def string_hash(value, dialect="mysql"):
+    """32 bit hash of a string - CRC32 on MySQL, the first 8 hex digits of MD5 on PostgreSQL"""
+    data = value.encode("utf-8")
+    if dialect == "postgresql":
+        return int(
+            hashlib.md5(data).hexdigest()[:8], 16
+        )  # nosec - not used for security
+    return zlib.crc32(data)
+
+
+@timed
+def verify_table(engine, table_name, checksum, season=None):
+    """
+    Compares server-side checksums of an SQL table against checksums of its source data
+
+    Parameters:
+        engine (str): SQLAlchemy connection object
+        table_name (str): Name of the SQL Table to verify
+        checksum (TableChecksum): Checksums accumulated over the source data
+        season (str): Season of the source data, so only its rows are compared, or None for the whole table
+
+    Returns:
+        Nothing
+
+    Side Effects:
+        On success - verification message logged
+        On mismatch - error message logged and ValueError raised, so the task fails
+    """
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        if season is None:
+            cursor.execute(checksum.sql(table_name))
+        else:
+            cursor.execute(checksum.sql(table_name, season), (season,))
+        actual = list(cursor.fetchone())
+    finally:
+        conn.close()
+
+    labels = ["rows"]
+    for name in checksum.kinds:
+        labels.extend([f"{name} count", f"{name} checksum"])
+
+    expected = checksum.expected()
+    if len(actual) != len(expected):
+        raise ValueError(
+            f"verify_table: {table_name} returned {len(actual)} checksums, expected {len(expected)}"
+        )
+
+    mismatches = []
+    for label, expected_value, actual_value in zip(labels, expected, actual):
+        actual_value = 0 if actual_value is None else actual_value
+        if isinstance(expected_value, float) or isinstance(actual_value, float):
+            matches = math.isclose(
+                float(expected_value), float(actual_value), rel_tol=1e-9
+            )
+        else:
+            matches = int(expected_value) == int(actual_value)
+        if not matches:
+            mismatches.append(f"{label} expected {expected_value}, got {actual_value}")
+
+    if mismatches:
+        logging.error(
+            f"verify_table Error, Table {table_name}: {'; '.join(mismatches)}"
+        )
+        raise ValueError(
+            f"verify_table: {table_name} does not match its source data - {'; '.join(mismatches)}"
+        )
+
+    logging.info(
+        f"verify_table: {table_name} verified ({checksum.row_count} rows, {len(checksum.kinds)} columns)"
+    )
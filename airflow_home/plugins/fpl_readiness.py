@@ -0,0 +1,68 @@
+from datetime import timedelta
+from airflow.exceptions import AirflowSensorTimeout, AirflowSkipException
+from airflow.sensors.base import BaseSensorOperator
+from airflow.triggers.base import BaseTrigger, TriggerEvent
+
+
+class FplReadinessTrigger(BaseTrigger):
+    """
+    Polls the FPL API in the triggerer with async HTTP until the latest matches' data is final,
+    see scripts/readiness.py, then fires a single event with the last readiness check
+
+    Parameters:
+        poll_interval (float): Seconds between polls
+        timeout (float): Seconds to wait before firing with timed_out set
+    """
+
+    def __init__(self, poll_interval, timeout):
+        super().__init__()
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+
+    def serialize(self):
+        return (
+            "fpl_readiness.FplReadinessTrigger",
+            {"poll_interval": self.poll_interval, "timeout": self.timeout},
+        )
+
+    async def run(self):
+        # imported here, so only the triggerer imports aiohttp and not every DAG parse
+        try:
+            from scripts.readiness import wait_until_ready
+        except ImportError:
+            from airflow_home.dags.scripts.readiness import wait_until_ready
+
+        yield TriggerEvent(await wait_until_ready(self.poll_interval, self.timeout))
+
+
+class FplReadinessSensor(BaseSensorOperator):
+    """
+    Waits for the FPL API to be available and the latest matches' data to be final (fixtures
+    finished with bonus points confirmed, finished gameweeks data checked) without holding a
+    worker slot - the task defers to FplReadinessTrigger straight away and only resumes on a
+    worker once the trigger fires
+
+    Uses poke_interval, timeout and soft_fail as other sensors do - with soft_fail a timeout skips
+    the run's downstream tasks rather than failing
+    """
+
+    def __init__(self, *, poke_interval=300, timeout=6 * 60 * 60, **kwargs):
+        super().__init__(poke_interval=poke_interval, timeout=timeout, **kwargs)
+
+    def execute(self, context):
+        self.defer(
+            trigger=FplReadinessTrigger(self.poke_interval, self.timeout),
+            method_name="execute_complete",
+            # fails the task rather than waiting forever when no triggerer runs the trigger
+            timeout=timedelta(seconds=self.timeout),
+        )
+
+    def execute_complete(self, context, event=None):
+        if event["ready"]:
+            self.log.info("FPL data final for gameweek %s", event["gameweek"])
+            return event["gameweek"]
+
+        message = f"FPL data not final after {self.timeout}s: {event['reason']}"
+        if self.soft_fail:
+            raise AirflowSkipException(message)
+        raise AirflowSensorTimeout(message)
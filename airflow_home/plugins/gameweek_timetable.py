@@ -0,0 +1,94 @@
+import json
+import os
+from datetime import timedelta
+import pendulum
+from airflow.plugins_manager import AirflowPlugin
+from airflow.timetables.base import DagRunInfo, DataInterval, Timetable
+
+
+class GameweekTimetable(Timetable):
+    """
+    Schedules DAG runs at the run times in a schedule file - shortly after each FPL match window
+    closes and each gameweek deadline passes - written by scripts/schedule.py from the stored
+    fixtures and bootstrap-static data
+
+    Between run times the DAG stays idle, apart from one run every max_idle_days, so the schedule
+    is refreshed when a new season's fixtures are published
+
+    Parameters:
+        schedule_path (str): Path of the schedule file
+        max_idle_days (int): Longest gap between runs when the schedule has no run times
+    """
+
+    description = "After each FPL match window and gameweek deadline"
+
+    def __init__(self, schedule_path, max_idle_days=7):
+        self.schedule_path = schedule_path
+        self.max_idle_days = max_idle_days
+
+    @property
+    def summary(self):
+        return "gameweek"
+
+    def serialize(self):
+        return {
+            "schedule_path": self.schedule_path,
+            "max_idle_days": self.max_idle_days,
+        }
+
+    @classmethod
+    def deserialize(cls, value):
+        return cls(value["schedule_path"], value["max_idle_days"])
+
+    def infer_manual_data_interval(self, *, run_after):
+        return DataInterval.exact(run_after)
+
+    def next_dagrun_info(self, *, last_automated_data_interval, restriction):
+        if last_automated_data_interval is not None:
+            after = last_automated_data_interval.end
+        elif restriction.earliest is not None:
+            after = restriction.earliest
+        else:
+            return None
+        now = pendulum.now("UTC")
+
+        run_times = self.read_run_times()
+        if run_times is None:
+            # no schedule yet - run once now to write it, then retry daily until it exists
+            if last_automated_data_interval is None:
+                next_run = after
+            else:
+                next_run = after + timedelta(days=1)
+            if not restriction.catchup:
+                next_run = max(next_run, now)
+        else:
+            pending = [run_time for run_time in run_times if run_time > after]
+            missed = [run_time for run_time in pending if run_time <= now]
+            if not restriction.catchup and missed:
+                # like the cron timetable, schedule only the latest missed run time, so runs due
+                # while the scheduler was down (or before a DAG re-parse) aren't skipped
+                next_run = missed[-1]
+            else:
+                next_run = after + timedelta(days=self.max_idle_days)
+                if pending:
+                    next_run = min(next_run, pending[0])
+                if not restriction.catchup:
+                    next_run = max(next_run, now)
+
+        if restriction.latest is not None and next_run > restriction.latest:
+            return None
+        # exact intervals, so each run's ds is the date it runs on
+        return DagRunInfo.exact(next_run)
+
+    def read_run_times(self):
+        """Sorted run times from the schedule file, or None when it doesn't exist"""
+        if not os.path.exists(self.schedule_path):
+            return None
+        with open(self.schedule_path) as schedule_file:
+            schedule = json.load(schedule_file)
+        return sorted(pendulum.parse(run_time) for run_time in schedule["run_times"])
+
+
+class GameweekTimetablePlugin(AirflowPlugin):
+    name = "gameweek_timetable_plugin"
+    timetables = [GameweekTimetable]
@@ -0,0 +1,125 @@
+import os
+import time
+import json
+import argparse
+import tempfile
+import statistics
+from dotenv import load_dotenv
+from airflow_home.dags.scripts.analytics import DASHBOARD_QUERIES, connect_parquet
+from airflow_home.dags.scripts.helpers import generate_filename
+from airflow_home.dags.scripts.load import create_db_conn, insert_df_into_db
+from airflow_home.dags.scripts.db_setup import seed_prod_db
+from benchmarks.synthetic_data import generate_star_schema
+from benchmarks.query_benchmark import time_queries
+
+BENCHMARK_DS = "2024-08-16"
+
+
+def write_parquet_tables(tables, directory):
+    """
+    Write dataFrames as Parquet files under the '{season}/{ds}/{table}.parquet' keys of the transform bucket
+
+    Parameters:
+        tables (dict): dataFrames keyed by table name
+        directory (str): Local directory standing in for the transform bucket
+
+    Returns:
+        Nothing
+    """
+    for table_name, df in tables.items():
+        path = os.path.join(
+            directory, f"{generate_filename(table_name, BENCHMARK_DS)}.parquet"
+        )
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        df.to_parquet(path, index=False)
+
+
+def time_duckdb_queries(conn, repeats):
+    """
+    Time each dashboard query on the DuckDB Parquet views
+
+    Parameters:
+        conn (duckdb.DuckDBPyConnection): Connection from connect_parquet
+        repeats (int): Number of runs per query, the median is reported
+
+    Returns:
+        dict: Median milliseconds per query name
+    """
+    timings = {}
+    for name, sql in DASHBOARD_QUERIES.items():
+        durations = []
+        for _ in range(repeats):
+            start_time = time.perf_counter()
+            conn.execute(sql).fetchall()
+            durations.append((time.perf_counter() - start_time) * 1000)
+        timings[name] = statistics.median(durations)
+    return timings
+
+
+def run_benchmark(players, repeats, engine=None):
+    """
+    Time dashboard queries on DuckDB over Parquet, and on the migrated database when given
+
+    Parameters:
+        players (int): Number of synthetic players, fact_players holds players * 38 rows
+        repeats (int): Number of runs per query
+        engine (SQLAlchemy Engine): db connection, or None to only time DuckDB
+
+    Returns:
+        dict: {"duckdb": timings, "database": timings or None, "time_to_query_s": ...} - time_to_query_s
+            is the time from the Parquet files existing to the first query being possible on each path
+    """
+    tables = generate_star_schema(players=players)
+    results = {"duckdb": None, "database": None, "time_to_query_s": {}}
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_parquet_tables(tables, directory)
+        start_time = time.perf_counter()
+        conn = connect_parquet(directory, BENCHMARK_DS, list(tables))
+        results["time_to_query_s"]["duckdb"] = time.perf_counter() - start_time
+        results["duckdb"] = time_duckdb_queries(conn, repeats)
+        conn.close()
+
+    if engine is not None:
+        start_time = time.perf_counter()
+        seed_prod_db(engine)
+        for table_name, df in tables.items():
+            insert_df_into_db(df, engine, table_name, chunk_size=50000)
+        results["time_to_query_s"]["database"] = time.perf_counter() - start_time
+        results["database"] = time_queries(engine, repeats)
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare dashboard queries on DuckDB over Parquet with the MySQL/PostgreSQL path"
+    )
+    parser.add_argument("--players", type=int, default=5000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument(
+        "--database",
+        action="store_true",
+        help="Also load and query the database configured in .env",
+    )
+    args = parser.parse_args()
+
+    engine = None
+    if args.database:
+        load_dotenv()
+        engine = create_db_conn(
+            os.environ["rds_user"],
+            os.environ["rds_password"],
+            os.environ["rds_host"],
+            os.environ["rds_port"],
+            os.environ["rds_db_name"],
+            dialect=os.environ.get("rds_dialect", "mysql"),
+        )
+
+    results = run_benchmark(args.players, args.repeats, engine)
+    for name in DASHBOARD_QUERIES:
+        line = f"{name:<26} duckdb {results['duckdb'][name]:>9.2f}ms"
+        if results["database"]:
+            line += f"  database {results['database'][name]:>9.2f}ms"
+        print(line)
+    print(json.dumps(results["time_to_query_s"]))
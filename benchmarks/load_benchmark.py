@@ -0,0 +1,167 @@
+import io
+import os
+import json
+import time
+import argparse
+import tracemalloc
+from datetime import datetime
+import boto3
+from moto import mock_aws
+from dotenv import load_dotenv
+from airflow_home.dags.scripts.load import load_data, create_db_conn
+from airflow_home.dags.scripts.db_setup import seed_prod_db
+from airflow_home.dags.scripts.helpers import generate_filename
+from benchmarks.synthetic_data import generate_star_schema
+
+BENCHMARK_BUCKET = "load-benchmark-bucket"
+
+# Insert strategies compared by the benchmark - load_data keyword arguments for each
+STRATEGIES = {
+    "executemany": {"method": "executemany", "chunk_size": 10**9},
+    "chunked": {"method": "executemany", "chunk_size": 10000},
+    "load_data": {"method": "load_data", "chunk_size": 10**9},
+    "upsert": {"mode": "merge", "chunk_size": 10000},
+    "swap": {"mode": "swap", "chunk_size": 10000},
+}
+
+
+def upload_tables(tables):
+    """
+    Upload dataFrames as parquet files to the benchmark bucket, under the keys load_data reads
+
+    Parameters:
+        tables (dict): dataFrames keyed by table name
+
+    Returns:
+        Nothing
+    """
+    s3 = boto3.client("s3")
+    for table_name, df in tables.items():
+        buffer = io.BytesIO()
+        df.to_parquet(buffer, index=False)
+        s3.put_object(
+            Bucket=BENCHMARK_BUCKET,
+            Key=f"{generate_filename(table_name)}.parquet",
+            Body=buffer.getvalue(),
+        )
+
+
+def changed_tables(tables, fraction=0.01):
+    """
+    Copy the tables with a fraction of fact_players rows changed, as on a quiet day
+
+    Parameters:
+        tables (dict): dataFrames keyed by table name
+        fraction (float): Fraction of fact_players rows to change
+
+    Returns:
+        dict: dataFrames keyed by table name
+    """
+    fact_players = tables["fact_players"].copy()
+    changed = fact_players.sample(frac=fraction, random_state=0).index
+    fact_players.loc[changed, "fixture_difficulty_rating"] = (
+        fact_players.loc[changed, "fixture_difficulty_rating"] % 5 + 1
+    )
+    return {**tables, "fact_players": fact_players}
+
+
+def run_strategy(db_credentials, tables, strategy):
+    """
+    Reset the schema and time one load_data run with the given strategy
+
+    Parameters:
+        db_credentials (dict): rds_* keyword arguments for load_data
+        tables (dict): dataFrames keyed by table name
+        strategy (str): Key of STRATEGIES
+
+    Returns:
+        dict: rows, seconds, rows_per_sec and peak_memory_mb of the run
+    """
+    seed_prod_db(create_db_conn(**db_credentials, pool_size=1))
+    upload_tables(tables)
+
+    if strategy == "upsert":
+        # merge into yesterday's data, with 1% of rows changed today
+        load_data(**db_credentials, bucket_name=BENCHMARK_BUCKET)
+        tables = changed_tables(tables)
+        upload_tables(tables)
+
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    load_data(**db_credentials, bucket_name=BENCHMARK_BUCKET, **STRATEGIES[strategy])
+    elapsed = time.perf_counter() - start_time
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rows = sum(len(df) for df in tables.values())
+    return {
+        "strategy": strategy,
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(rows / elapsed),
+        "peak_memory_mb": round(peak_memory / 2**20, 1),
+    }
+
+
+def run_benchmark(db_credentials, players, strategies):
+    """
+    Load synthetic star schema tables through load_data with each strategy
+
+    S3 is replaced by an in-process moto stand-in, so only the database is real
+
+    Parameters:
+        db_credentials (dict): rds_* keyword arguments for load_data
+        players (int): Number of synthetic players, fact_players holds players * 38 rows
+        strategies (list): Keys of STRATEGIES to run
+
+    Returns:
+        dict: Benchmark parameters and one result per strategy
+    """
+    tables = generate_star_schema(players=players)
+
+    with mock_aws():
+        os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+        os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+        os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+        boto3.client("s3").create_bucket(Bucket=BENCHMARK_BUCKET)
+
+        results = [
+            run_strategy(db_credentials, tables, strategy) for strategy in strategies
+        ]
+
+    return {
+        "run_at": datetime.now().isoformat(timespec="seconds"),
+        "database": f"{db_credentials['rds_host']}:{db_credentials['rds_port']}",
+        "players": players,
+        "table_rows": {table_name: len(df) for table_name, df in tables.items()},
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark load_data insert strategies against a local MySQL/MariaDB"
+    )
+    parser.add_argument("--players", type=int, default=2000)
+    parser.add_argument(
+        "--strategies", nargs="+", default=list(STRATEGIES), choices=list(STRATEGIES)
+    )
+    parser.add_argument("--output", help="Path to write the JSON results to")
+    args = parser.parse_args()
+
+    load_dotenv()
+    db_credentials = {
+        "rds_user": os.environ["rds_user"],
+        "rds_password": os.environ["rds_password"],
+        "rds_host": os.environ["rds_host"],
+        "rds_port": os.environ["rds_port"],
+        "rds_db_name": os.environ["rds_db_name"],
+    }
+
+    output = json.dumps(
+        run_benchmark(db_credentials, args.players, args.strategies), indent=2
+    )
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(output)
+    print(output)
@@ -0,0 +1,89 @@
+import os
+import json
+import time
+import logging
+import argparse
+import tempfile
+import statistics
+import threading
+from airflow_home.dags.scripts.logs import setup_logging, reset_logging, log_context
+
+
+def time_calls(records, threads):
+    """
+    Time logging.info calls made by concurrent threads, as the table loads and extract batches do
+
+    Parameters:
+        records (int): Records logged by each thread
+        threads (int): Number of logging threads
+
+    Returns:
+        list: Microseconds per logging call, from every thread
+    """
+    durations = []
+    lock = threading.Lock()
+
+    def log_records():
+        thread_durations = []
+        with log_context(stage="load", table="fact_players"):
+            for i in range(records):
+                start_time = time.perf_counter()
+                logging.info(f"insert_chunk: batch {i} inserted")
+                thread_durations.append((time.perf_counter() - start_time) * 1e6)
+        with lock:
+            durations.extend(thread_durations)
+
+    workers = [threading.Thread(target=log_records) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return durations
+
+
+def run_benchmark(records, threads):
+    """
+    Compare the per-call cost of the former basicConfig file handler with the queue handler of logs.py
+
+    Parameters:
+        records (int): Records logged by each thread
+        threads (int): Number of logging threads
+
+    Returns:
+        dict: Median and p99 microseconds per call for each setup
+    """
+    results = {}
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    with tempfile.TemporaryDirectory() as directory:
+        reset_logging()
+        file_handler = logging.FileHandler(os.path.join(directory, "logs.log"))
+        root.addHandler(file_handler)
+        results["file_handler"] = time_calls(records, threads)
+        root.removeHandler(file_handler)
+        file_handler.close()
+
+        os.environ["log_dir"] = directory
+        setup_logging()
+        results["queue_handler"] = time_calls(records, threads)
+        reset_logging()
+
+    summary = {}
+    for name, durations in results.items():
+        durations.sort()
+        summary[name] = {
+            "median_us": round(statistics.median(durations), 2),
+            "p99_us": round(durations[int(len(durations) * 0.99) - 1], 2),
+        }
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the cost of logging calls with a file handler and with the queue handler"
+    )
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.records, args.threads), indent=2))
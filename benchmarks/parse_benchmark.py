@@ -0,0 +1,127 @@
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+DAGS_FOLDER = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "airflow_home", "dags"
+)
+
+# Modules imported by the scheduler while parsing etl_dag.py - before, the DAG imported the
+# pipeline scripts (and read .env) at the top level, now only the lightweight task callables
+PARSE_IMPORTS = {
+    "before": ["dotenv", "scripts.extract", "scripts.transform", "scripts.load"],
+    "after": ["scripts.helpers", "scripts.tasks"],
+}
+
+DAGBAG_CODE = """
+import time
+from airflow.models import DagBag
+start_time = time.perf_counter()
+dagbag = DagBag(dag_folder={path!r}, include_examples=False)
+assert not dagbag.import_errors, dagbag.import_errors
+print((time.perf_counter() - start_time) * 1000)
+"""
+
+
+def time_imports(modules):
+    """
+    Import modules in a fresh interpreter with -X importtime
+
+    Parameters:
+        modules (list): Module names, importable from the dags folder
+
+    Returns:
+        dict: Total import milliseconds, number of modules imported and peak RSS in MB
+    """
+    code = "".join(f"import {module}\n" for module in modules)
+    code += "import resource\nprint(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=DAGS_FOLDER,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    total_us = 0
+    module_count = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        module_count += 1
+        # nested imports are indented, and already counted in their top-level import
+        if not name[1:].startswith(" "):
+            total_us += int(cumulative)
+    return {
+        "import_ms": total_us / 1000,
+        "modules": module_count,
+        "peak_rss_mb": int(result.stdout.split()[-1]) / 1024,
+    }
+
+
+def time_dagbag(repeats):
+    """
+    Time DagBag parsing etl_dag.py in fresh interpreters, as each scheduler parser process does
+
+    Parameters:
+        repeats (int): Number of parses, the median is reported
+
+    Returns:
+        float: Median milliseconds per parse, or None when Airflow isn't installed
+    """
+    try:
+        import airflow
+    except ImportError:
+        return None
+
+    durations = []
+    for _ in range(repeats):
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                DAGBAG_CODE.format(path=os.path.join(DAGS_FOLDER, "etl_dag.py")),
+            ],
+            cwd=DAGS_FOLDER,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        durations.append(float(result.stdout.split()[-1]))
+    return statistics.median(durations)
+
+
+def run_benchmark(repeats):
+    """
+    Compare the parse-time imports of etl_dag.py before and after deferring the pipeline scripts
+
+    Parameters:
+        repeats (int): Number of fresh interpreters per measurement, the median is reported
+
+    Returns:
+        dict: Import timings per variant, and the DagBag parse time of the current DAG
+    """
+    results = {}
+    for variant, modules in PARSE_IMPORTS.items():
+        runs = [time_imports(modules) for _ in range(repeats)]
+        results[variant] = {
+            "import_ms": statistics.median(run["import_ms"] for run in runs),
+            "modules": runs[0]["modules"],
+            "peak_rss_mb": statistics.median(run["peak_rss_mb"] for run in runs),
+        }
+    results["dagbag_parse_ms"] = time_dagbag(repeats)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the imports made while the scheduler parses etl_dag.py"
+    )
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.repeats), indent=2))
@@ -0,0 +1,96 @@
+import os
+import time
+import argparse
+import statistics
+from dotenv import load_dotenv
+from airflow_home.dags.scripts.load import create_db_conn, insert_df_into_db
+from airflow_home.dags.scripts.db_setup import seed_prod_db
+from airflow_home.dags.scripts.helpers import STAR_SCHEMA_TABLES
+from airflow_home.dags.scripts.analytics import DASHBOARD_QUERIES
+from benchmarks.synthetic_data import generate_star_schema
+
+
+def time_queries(engine, repeats):
+    """
+    Time each dashboard query
+
+    Parameters:
+        engine (SQLAlchemy Engine): db connection
+        repeats (int): Number of runs per query, the median is reported
+
+    Returns:
+        dict: Median milliseconds per query name
+    """
+    timings = {}
+    with engine.connect() as conn:
+        for name, sql in DASHBOARD_QUERIES.items():
+            durations = []
+            for _ in range(repeats):
+                start_time = time.perf_counter()
+                conn.execute(sql).fetchall()
+                durations.append((time.perf_counter() - start_time) * 1000)
+            timings[name] = statistics.median(durations)
+    return timings
+
+
+def run_benchmark(engine, players, repeats):
+    """
+    Time dashboard queries on the original unkeyed schema, then again on the fully migrated schema
+
+    Parameters:
+        engine (SQLAlchemy Engine): db connection
+        players (int): Number of synthetic players, fact_players holds players * 38 rows
+        repeats (int): Number of runs per query
+
+    Returns:
+        dict: {"before": timings, "after": timings}
+    """
+    tables = generate_star_schema(players=players)
+
+    # version 1 is the original schema, without keys, indexes, partitions or seasons - the queries
+    # join on season, so the column is added without its keys
+    seed_prod_db(engine, target_version=1)
+    with engine.connect() as conn:
+        for table_name in STAR_SCHEMA_TABLES:
+            conn.execute(f"ALTER TABLE {table_name} ADD COLUMN season varchar(7)")
+    insert_star_schema(engine, tables)
+    before = time_queries(engine, repeats)
+
+    seed_prod_db(engine)
+    insert_star_schema(engine, tables)
+    after = time_queries(engine, repeats)
+
+    return {"before": before, "after": after}
+
+
+def insert_star_schema(engine, tables):
+    """Insert the star schema tables of generate_star_schema - the aggregate tables aren't queried"""
+    for table_name in STAR_SCHEMA_TABLES:
+        insert_df_into_db(tables[table_name], engine, table_name, chunk_size=50000)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark dashboard queries before and after schema migrations"
+    )
+    parser.add_argument("--players", type=int, default=5000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    load_dotenv()
+    engine = create_db_conn(
+        os.environ["rds_user"],
+        os.environ["rds_password"],
+        os.environ["rds_host"],
+        os.environ["rds_port"],
+        os.environ["rds_db_name"],
+    )
+
+    results = run_benchmark(engine, args.players, args.repeats)
+    for name in DASHBOARD_QUERIES:
+        before_ms = results["before"][name]
+        after_ms = results["after"][name]
+        print(
+            f"{name:<26} before {before_ms:>9.2f}ms  after {after_ms:>9.2f}ms  "
+            f"({before_ms / max(after_ms, 1e-9):.1f}x)"
+        )
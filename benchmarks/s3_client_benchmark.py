@@ -0,0 +1,99 @@
+import os
+import json
+import time
+import argparse
+import statistics
+import boto3
+from moto import mock_aws
+from dotenv import load_dotenv
+from airflow_home.dags.scripts.aws import get_client, reset_clients
+
+BENCHMARK_BUCKET = "s3-client-benchmark-bucket"
+
+# How each strategy gets its S3 client for every object - the scripts used to create a client
+# per call, they now share get_client's cached client
+STRATEGIES = {
+    "client_per_call": lambda: boto3.client("s3"),
+    "shared_client": lambda: get_client("s3"),
+}
+
+
+def time_objects(bucket_name, make_client, objects, payload):
+    """
+    Write then read objects, getting the S3 client for each call as the pipeline scripts do
+
+    Parameters:
+        bucket_name (str): Name of the benchmark bucket
+        make_client (function): Returns the client used for one call
+        objects (int): Number of objects written and read
+        payload (bytes): Body of each object
+
+    Returns:
+        list: Milliseconds per object, for one put and one get
+    """
+    durations = []
+    for i in range(objects):
+        start_time = time.perf_counter()
+        make_client().put_object(Bucket=bucket_name, Key=f"benchmark/{i}", Body=payload)
+        response = make_client().get_object(Bucket=bucket_name, Key=f"benchmark/{i}")
+        response["Body"].read()
+        durations.append((time.perf_counter() - start_time) * 1000)
+    return durations
+
+
+def run_benchmark(bucket_name, objects, payload_bytes):
+    """
+    Compare per-object latency of a new client per call with the shared client
+
+    Parameters:
+        bucket_name (str): Name of an existing bucket the benchmark objects are written to
+        objects (int): Number of objects per strategy
+        payload_bytes (int): Size of each object
+
+    Returns:
+        dict: Median and p95 milliseconds per object for each strategy
+    """
+    payload = b"x" * payload_bytes
+    results = {}
+    for name, make_client in STRATEGIES.items():
+        reset_clients()
+        durations = sorted(time_objects(bucket_name, make_client, objects, payload))
+        results[name] = {
+            "median_ms": round(statistics.median(durations), 3),
+            "p95_ms": round(durations[int(len(durations) * 0.95) - 1], 3),
+        }
+    get_client("s3").delete_objects(
+        Bucket=bucket_name,
+        Delete={"Objects": [{"Key": f"benchmark/{i}"} for i in range(objects)]},
+    )
+    results["saved_per_object_ms"] = round(
+        results["client_per_call"]["median_ms"] - results["shared_client"]["median_ms"],
+        3,
+    )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark per-object S3 latency of a new client per call against the shared client"
+    )
+    parser.add_argument(
+        "--bucket",
+        help="Existing S3 bucket to benchmark against, defaults to an in-process moto bucket, "
+        "which shows client creation cost but not the TLS handshakes saved",
+    )
+    parser.add_argument("--objects", type=int, default=40)
+    parser.add_argument("--payload-bytes", type=int, default=4096)
+    args = parser.parse_args()
+
+    load_dotenv()
+    if args.bucket:
+        results = run_benchmark(args.bucket, args.objects, args.payload_bytes)
+    else:
+        with mock_aws():
+            os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+            os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+            os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+            boto3.client("s3").create_bucket(Bucket=BENCHMARK_BUCKET)
+            results = run_benchmark(BENCHMARK_BUCKET, args.objects, args.payload_bytes)
+    print(json.dumps(results, indent=2))
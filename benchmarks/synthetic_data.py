@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+from datetime import date, time, timedelta
+from airflow_home.dags.scripts.helpers import season_of
+
+
+def generate_star_schema(players=600, gameweeks=38, teams=20, seed=0, season=None):
+    """
+    Generate synthetic fact and dimension tables matching the production star schema
+
+    Parameters:
+        players (int): Number of players in dim_players
+        gameweeks (int): Number of gameweeks, each with teams / 2 fixtures
+        teams (int): Number of teams in dim_teams, must be even
+        seed (int): Random seed, so repeated runs generate identical data
+        season (str): Value of every table's season column, defaults to the current season
+
+    Returns:
+        dict: dataFrames keyed by table name - fact_players, dim_players, dim_teams, dim_fixtures
+            and the agg_* tables, built from random gameweek points
+    """
+    rng = np.random.default_rng(seed)
+    team_ids = np.arange(1, teams + 1)
+
+    dim_teams = pd.DataFrame(
+        {
+            "team_id": team_ids,
+            "team_name": [f"Team {team_id}" for team_id in team_ids],
+            "team_name_short": [f"T{team_id:02d}" for team_id in team_ids],
+        }
+    )
+
+    player_ids = np.arange(1, players + 1)
+    dim_players = pd.DataFrame(
+        {
+            "first_name": [f"First{player_id}" for player_id in player_ids],
+            "second_name": [f"Second{player_id}" for player_id in player_ids],
+            "web_name": [f"Player{player_id}" for player_id in player_ids],
+            "player_id": player_ids,
+            "team_id": rng.choice(team_ids, players),
+        }
+    )
+
+    # each gameweek pairs a shuffled list of teams into home and away fixtures
+    pairings = np.array([rng.permutation(team_ids) for _ in range(gameweeks)])
+    home_team_ids = pairings[:, : teams // 2].ravel()
+    away_team_ids = pairings[:, teams // 2 :].ravel()
+    fixture_count = len(home_team_ids)
+    gameweek_ids = np.repeat(np.arange(1, gameweeks + 1), teams // 2)
+    dim_fixtures = pd.DataFrame(
+        {
+            "fixture_id": np.arange(1, fixture_count + 1),
+            "gameweek_id": gameweek_ids,
+            "fixture_date": [
+                date(2024, 8, 16) + timedelta(weeks=int(gw) - 1) for gw in gameweek_ids
+            ],
+            "fixture_time": [time(15, 0)] * fixture_count,
+            "match_finished": rng.integers(0, 2, fixture_count).astype(bool),
+            "home_team_id": home_team_ids,
+            "away_team_id": away_team_ids,
+            "home_team_score": rng.integers(0, 5, fixture_count),
+            "away_team_score": rng.integers(0, 5, fixture_count),
+            "home_team_difficulty": rng.integers(1, 6, fixture_count),
+            "away_team_difficulty": rng.integers(1, 6, fixture_count),
+        }
+    )
+
+    home = dim_fixtures.rename(
+        columns={
+            "home_team_id": "team_id",
+            "away_team_id": "opposition_team_id",
+            "home_team_difficulty": "fixture_difficulty_rating",
+        }
+    ).assign(is_home=True)
+    away = dim_fixtures.rename(
+        columns={
+            "away_team_id": "team_id",
+            "home_team_id": "opposition_team_id",
+            "away_team_difficulty": "fixture_difficulty_rating",
+        }
+    ).assign(is_home=False)
+    team_fixtures = pd.concat([home, away], ignore_index=True)
+
+    fact_players = dim_players[["player_id", "team_id"]].merge(
+        team_fixtures, on="team_id"
+    )[
+        [
+            "player_id",
+            "team_id",
+            "gameweek_id",
+            "fixture_id",
+            "opposition_team_id",
+            "fixture_difficulty_rating",
+            "is_home",
+        ]
+    ]
+
+    # gameweek points of every player, ranked as transform ranks them
+    player_points = fact_players[["player_id", "team_id", "gameweek_id"]].assign(
+        position_id=lambda df: df["player_id"] % 4 + 1,
+        total_points=rng.integers(0, 16, len(fact_players)),
+        goals_scored=rng.integers(0, 3, len(fact_players)),
+        assists=rng.integers(0, 3, len(fact_players)),
+        bonus=rng.integers(0, 4, len(fact_players)),
+    )
+    player_points = player_points.sort_values(
+        ["gameweek_id", "total_points", "player_id"],
+        ascending=[True, False, True],
+        ignore_index=True,
+    ).drop_duplicates(["gameweek_id", "player_id"])
+
+    agg_top_scorers = player_points.groupby("gameweek_id").head(10)
+    agg_top_scorers = agg_top_scorers.assign(
+        points_rank=agg_top_scorers.groupby("gameweek_id").cumcount() + 1
+    )[
+        [
+            "gameweek_id",
+            "points_rank",
+            "player_id",
+            "team_id",
+            "total_points",
+            "goals_scored",
+            "assists",
+            "bonus",
+        ]
+    ]
+    # one goalkeeper, four defenders, four midfielders and two forwards
+    formation = {1: 1, 2: 4, 3: 4, 4: 2}
+    position_rank = player_points.groupby(["gameweek_id", "position_id"]).cumcount()
+    agg_team_of_the_week = player_points[
+        position_rank < player_points["position_id"].map(formation)
+    ][["gameweek_id", "player_id", "team_id", "position_id", "total_points"]]
+    agg_team_points = player_points.groupby(
+        ["gameweek_id", "team_id"], as_index=False
+    ).agg(
+        total_points=("total_points", "sum"),
+        goals_scored=("goals_scored", "sum"),
+        assists=("assists", "sum"),
+        bonus=("bonus", "sum"),
+        player_count=("player_id", "count"),
+    )
+
+    tables = {
+        "fact_players": fact_players,
+        "dim_players": dim_players,
+        "dim_teams": dim_teams,
+        "dim_fixtures": dim_fixtures,
+        "agg_top_scorers": agg_top_scorers.reset_index(drop=True),
+        "agg_team_of_the_week": agg_team_of_the_week.reset_index(drop=True),
+        "agg_team_points": agg_team_points,
+    }
+    return {
+        table_name: df.assign(season=season or season_of())
+        for table_name, df in tables.items()
+    }
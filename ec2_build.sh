@@ -37,5 +37,9 @@ airflow db init
 airflow users create -u airflow -f airflow -l airflow -r Admin -e airflow@gmail.com
 echo "Please enter account password"
 
+echo "Create Airflow pools capping concurrent FPL API requests and database loads"
+airflow pools set fpl_api 4 "Concurrent FPL API requests"
+airflow pools set rds 4 "Concurrent database table loads"
+
 echo "Install other dependencies"
 pip install -r requirements.txt
\ No newline at end of file
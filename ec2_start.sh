@@ -5,4 +5,5 @@ cd Fantasy-Premier-League-ETL/
 source venv/bin/activate
 export PYTHONPATH=$(pwd)
 airflow webserver &
+airflow triggerer &
 airflow scheduler
\ No newline at end of file
@@ -113,6 +113,9 @@ resource "aws_lambda_function" "ec2_start" {
 
 ##### Eventbridge Rules
 
+# The instance must stay up for the gameweek timetable, whose runs fall after each match window
+# closes - there is no stop rule, the daily start only restarts it if it has been stopped
+# (ec2_stop_auto is kept for stopping it by hand)
 resource "aws_cloudwatch_event_rule" "start_rule" {
   name        = "start_rule"
   description = "Rule to trigger Lambda function at 8 AM"
@@ -120,36 +123,16 @@ resource "aws_cloudwatch_event_rule" "start_rule" {
 
 }
 
-resource "aws_cloudwatch_event_rule" "stop_rule" {
-  name        = "stop_rule"
-  description = "Rule to trigger Lambda function at 8:15 AM"
-  schedule_expression = "cron(15 8 * * ? *)"
-
-}
-
 resource "aws_cloudwatch_event_target" "start_lambda_target" {
   rule      = aws_cloudwatch_event_rule.start_rule.name
   arn       = aws_lambda_function.ec2_start.arn
   target_id = "start_lambda_target"
 }
 
-resource "aws_cloudwatch_event_target" "stop_lambda_target" {
-  rule      = aws_cloudwatch_event_rule.stop_rule.name
-  arn       = aws_lambda_function.ec2_stop.arn
-  target_id = "stop_lambda_target"
-}
-
 
 resource "aws_lambda_permission" "ec2_start_perm" {
   action        = "lambda:InvokeFunction"
   function_name = aws_lambda_function.ec2_start.function_name
   principal     = "events.amazonaws.com"
   source_arn    = aws_cloudwatch_event_rule.start_rule.arn
-}
-
-resource "aws_lambda_permission" "ec2_stop_perm" {
-  action        = "lambda:InvokeFunction"
-  function_name = aws_lambda_function.ec2_stop.function_name
-  principal     = "events.amazonaws.com"
-  source_arn    = aws_cloudwatch_event_rule.stop_rule.arn
 }
\ No newline at end of file
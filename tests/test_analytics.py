@@ -0,0 +1,107 @@
+import duckdb
+import pandas as pd
+import pytest
+from airflow_home.dags.scripts.analytics import connect_parquet, run_query
+
+
+@pytest.fixture
+def parquet_dir(tmp_path):
+    """Transform bucket layout on local disk, for one run date"""
+    (tmp_path / "2024-25" / "2024-08-16").mkdir(parents=True)
+    pd.DataFrame(
+        {
+            "player_id": [100, 100, 101],
+            "gameweek_id": [20, 21, 20],
+            "fixture_id": [1, 2, 1],
+            "team_id": [1, 1, 2],
+            "opposition_team_id": [2, 3, 1],
+            "fixture_difficulty_rating": [3, 4, 2],
+            "is_home": [True, False, False],
+            "season": "2024-25",
+        }
+    ).to_parquet(tmp_path / "2024-25" / "2024-08-16" / "fact_players.parquet")
+    pd.DataFrame(
+        {
+            "player_id": [100, 101],
+            "web_name": ["Saka", "Salah"],
+            "team_id": [1, 2],
+            "season": "2024-25",
+        }
+    ).to_parquet(tmp_path / "2024-25" / "2024-08-16" / "dim_players.parquet")
+    pd.DataFrame(
+        {
+            "team_id": [1, 2, 3],
+            "team_name": ["Arsenal", "Liverpool", "Chelsea"],
+            "season": "2024-25",
+        }
+    ).to_parquet(tmp_path / "2024-25" / "2024-08-16" / "dim_teams.parquet")
+    return str(tmp_path)
+
+
+class TestConnectParquet:
+    def test_named_query_runs_on_views(self, parquet_dir):
+        conn = connect_parquet(
+            parquet_dir, "2024-08-16", ["fact_players", "dim_players", "dim_teams"]
+        )
+
+        output = run_query(conn, "gameweek_player_fixtures")
+
+        assert sorted(output["web_name"]) == ["Saka", "Salah"]
+        assert sorted(output["team_name"]) == ["Arsenal", "Liverpool"]
+
+    def test_runs_sql_statement(self, parquet_dir):
+        conn = connect_parquet(parquet_dir, "2024-08-16", ["fact_players"])
+
+        output = run_query(conn, "SELECT COUNT(*) AS row_count FROM fact_players")
+
+        assert output["row_count"][0] == 3
+
+    def test_missing_date_raises(self, parquet_dir):
+        with pytest.raises(Exception):
+            connect_parquet(parquet_dir, "2024-08-17", ["fact_players"])
+
+
+class TestDashboardQueries:
+    def test_joins_match_on_season(self):
+        """Database holding two seasons, whose player and team ids overlap"""
+        conn = duckdb.connect()
+        fact_players = pd.DataFrame(
+            {
+                "season": ["2024-25", "2025-26"],
+                "player_id": [100, 100],
+                "gameweek_id": [20, 20],
+                "opposition_team_id": [2, 2],
+                "fixture_difficulty_rating": [3, 4],
+                "is_home": [True, False],
+            }
+        )
+        dim_players = pd.DataFrame(
+            {
+                "season": ["2024-25", "2025-26"],
+                "player_id": [100, 100],
+                "web_name": ["Saka", "Palmer"],
+            }
+        )
+        dim_teams = pd.DataFrame(
+            {
+                "season": ["2024-25", "2025-26"],
+                "team_id": [2, 2],
+                "team_name": ["Liverpool", "Chelsea"],
+            }
+        )
+
+        for name, df in [
+            ("fact_players", fact_players),
+            ("dim_players", dim_players),
+            ("dim_teams", dim_teams),
+        ]:
+            conn.register(name, df)
+
+        output = run_query(conn, "gameweek_player_fixtures")
+
+        assert sorted(
+            zip(output["season"], output["web_name"], output["team_name"])
+        ) == [
+            ("2024-25", "Saka", "Liverpool"),
+            ("2025-26", "Palmer", "Chelsea"),
+        ]
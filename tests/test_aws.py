@@ -0,0 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor
+from airflow_home.dags.scripts.aws import (
+    get_client,
+    get_session,
+    reset_clients,
+    CLIENT_CONFIG,
+)
+
+
+class TestGetClient:
+    def setup_method(self):
+        reset_clients()
+
+    def teardown_method(self):
+        # clients created here hold no credentials, so drop them before the moto tests
+        reset_clients()
+
+    def test_returns_one_client_per_service(self):
+        s3 = get_client("s3")
+
+        assert get_client("s3") is s3
+        assert get_client("sts") is not s3
+
+    def test_threads_share_client(self):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            clients = list(executor.map(lambda _: get_client("s3"), range(8)))
+
+        assert all(client is clients[0] for client in clients)
+
+    def test_reset_creates_new_client_and_session(self):
+        s3 = get_client("s3")
+        session = get_session()
+
+        reset_clients()
+
+        assert get_client("s3") is not s3
+        assert get_session() is not session
+
+    def test_client_uses_shared_config(self):
+        config = get_client("s3").meta.config
+
+        assert config.max_pool_connections == CLIENT_CONFIG.max_pool_connections
+        assert config.retries["mode"] == "adaptive"
+        assert config.tcp_keepalive is True
+
+    def test_lambda_client_outlasts_invocations_without_retries(self, monkeypatch):
+        monkeypatch.setenv("AWS_DEFAULT_REGION", "eu-west-2")
+        config = get_client("lambda").meta.config
+
+        assert config.read_timeout >= 900
+        assert config.retries["total_max_attempts"] == 1
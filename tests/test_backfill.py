@@ -0,0 +1,97 @@
+import os
+import json
+import unittest
+from unittest.mock import patch
+import pytest
+import boto3
+from moto import mock_aws
+from airflow_home.dags.scripts.backfill import (
+    backfill,
+    date_range,
+    has_output,
+    load_seasons,
+)
+from tests.test_pipeline import api_payloads
+
+
+@mock_aws
+class TestBackfill(unittest.TestCase):
+    def setUp(self):
+        """Mocked AWS Credentials for moto, and raw data stored for two dates"""
+        os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+        os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+        os.environ["AWS_SECURITY_TOKEN"] = "testing"
+        os.environ["AWS_SESSION_TOKEN"] = "testing"
+        os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+
+        s3 = boto3.client("s3")
+        s3.create_bucket(Bucket="extract-bucket")
+        s3.create_bucket(Bucket="transform-bucket")
+        for ds in ["2024-08-16", "2024-08-17"]:
+            for endpoint, payload in api_payloads.items():
+                s3.put_object(
+                    Bucket="extract-bucket",
+                    Key=f"2024-25/{ds}/{endpoint}.json",
+                    Body=json.dumps(payload),
+                )
+
+    def test_transforms_each_date_from_raw_data(self):
+        results = backfill(
+            "extract-bucket", "transform-bucket", "2024-08-16", "2024-08-18", 1
+        )
+
+        assert results["2024-08-16"] == "transformed"
+        assert results["2024-08-17"] == "transformed"
+        assert results["2024-08-18"].startswith("failed")
+        assert has_output("transform-bucket", "2024-08-17")
+        assert not has_output("transform-bucket", "2024-08-18")
+
+    def test_skips_dates_with_existing_output(self):
+        backfill("extract-bucket", "transform-bucket", "2024-08-16", "2024-08-16", 1)
+
+        results = backfill(
+            "extract-bucket", "transform-bucket", "2024-08-16", "2024-08-17", 1
+        )
+        forced = backfill(
+            "extract-bucket",
+            "transform-bucket",
+            "2024-08-16",
+            "2024-08-16",
+            1,
+            force=True,
+        )
+
+        assert results == {"2024-08-16": "skipped", "2024-08-17": "transformed"}
+        assert forced == {"2024-08-16": "transformed"}
+
+
+@patch("airflow_home.dags.scripts.backfill.prepare_db")
+@patch("airflow_home.dags.scripts.backfill.load_data")
+def test_load_seasons_loads_last_date_of_each_season(mock_load_data, mock_prepare_db):
+    load_seasons(
+        {"rds_user": "user"},
+        "transform-bucket",
+        ["2024-05-18", "2024-05-19", "2024-08-16"],
+        load_max_workers=2,
+        mode="merge",
+    )
+
+    loads = sorted(
+        (call.kwargs["ds"], call.kwargs["max_workers"], call.kwargs["mode"])
+        for call in mock_load_data.call_args_list
+    )
+    assert loads == [("2024-05-19", 2, "merge"), ("2024-08-16", 2, "merge")]
+    mock_prepare_db.assert_called_once_with(rds_user="user")
+
+
+class TestDateRange:
+    def test_includes_both_ends(self):
+        assert date_range("2024-12-31", "2025-01-02") == [
+            "2024-12-31",
+            "2025-01-01",
+            "2025-01-02",
+        ]
+
+    def test_rejects_reversed_range(self):
+        with pytest.raises(ValueError):
+            date_range("2025-01-02", "2024-12-31")
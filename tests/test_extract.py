@@ -11,6 +11,7 @@ from botocore.exceptions import ClientError
 from datetime import datetime
 from airflow_home.dags.scripts.extract import (
     extract_data,
+    extract_endpoint,
     generate_endpoints,
     retrieve_data,
     save_json_to_s3,
@@ -42,6 +43,18 @@ class TestExtractData(unittest.TestCase):
         output = s3.list_objects_v2(Bucket="test-bucket")
         assert output["KeyCount"] == 2
 
+    @patch("airflow_home.dags.scripts.extract.retrieve_data")
+    def test_extract_endpoint_saves_one_file(self, mock_retrieve_data):
+        mock_retrieve_data.return_value = [{"key": "value"}]
+
+        extract_endpoint("fixtures", "test-bucket", "2024-08-16")
+
+        s3 = boto3.client("s3", region_name="us-east-1")
+        output = s3.list_objects_v2(Bucket="test-bucket")
+        assert [item["Key"] for item in output["Contents"]] == [
+            "2024-25/2024-08-16/fixtures.json"
+        ]
+
 
 class TestGenerateEndpoints:
 
@@ -1,5 +1,9 @@
 from datetime import datetime
-from airflow_home.dags.scripts.helpers import generate_filename
+from airflow_home.dags.scripts.helpers import (
+    generate_filename,
+    generate_endpoints,
+    season_of,
+)
 
 
 class TestGenerateFileName:
@@ -7,4 +11,31 @@ class TestGenerateFileName:
         endpoint = "test"
         current_timestamp = datetime.now().strftime("%Y-%m-%d")
         output = generate_filename(endpoint)
-        assert output == f"{current_timestamp}/{endpoint}"
+        assert (
+            output == f"{season_of(current_timestamp)}/{current_timestamp}/{endpoint}"
+        )
+
+    def test_function_uses_logical_date(self):
+        output = generate_filename("test", "2024-08-16")
+        assert output == "2024-25/2024-08-16/test"
+
+
+class TestSeasonOf:
+    def test_season_starts_in_july(self):
+        assert season_of("2024-06-30") == "2023-24"
+        assert season_of("2024-07-01") == "2024-25"
+        assert season_of("2025-01-21") == "2024-25"
+
+    def test_century_rollover(self):
+        assert season_of("2099-08-01") == "2099-00"
+
+
+class TestGenerateEndpoints:
+    def test_live_endpoint_per_gameweek(self):
+        output = generate_endpoints(gameweeks=2)
+        assert output == [
+            "fixtures",
+            "bootstrap-static",
+            "event/1/live",
+            "event/2/live",
+        ]
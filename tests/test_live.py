@@ -0,0 +1,106 @@
+from unittest.mock import patch, MagicMock
+import pytest
+from airflow_home.dags.scripts.helpers import season_of
+from airflow_home.dags.scripts.live import (
+    run_live,
+    live_stats_df,
+    diff_live_stats,
+    current_gameweek,
+)
+
+
+def live_payload(points):
+    """event/{gw}/live payload with the given total_points per player id"""
+    return {
+        "elements": [
+            {"id": player_id, "stats": {"minutes": 90, "total_points": total_points}}
+            for player_id, total_points in points.items()
+        ]
+    }
+
+
+class TestLiveStatsDf:
+    def test_one_row_per_player(self):
+        output = live_stats_df(live_payload({1: 2, 2: 6}), 20)
+
+        assert list(output.index) == [1, 2]
+        assert list(output["gameweek_id"]) == [20, 20]
+        assert list(output["total_points"]) == [2, 6]
+        assert list(output["goals_scored"]) == [0, 0]
+
+
+class TestDiffLiveStats:
+    def test_first_poll_returns_every_row(self):
+        current = live_stats_df(live_payload({1: 2, 2: 6}), 20)
+
+        output = diff_live_stats(None, current)
+
+        assert list(output["player_id"]) == [1, 2]
+
+    def test_returns_only_changed_and_new_rows(self):
+        previous = live_stats_df(live_payload({1: 2, 2: 6, 3: 1}), 20)
+        current = live_stats_df(live_payload({1: 2, 2: 9, 3: 1, 4: 1}), 20)
+
+        output = diff_live_stats(previous, current)
+
+        assert list(output["player_id"]) == [2, 4]
+        assert list(output["total_points"]) == [9, 1]
+
+
+class TestRunLive:
+    @patch("airflow_home.dags.scripts.live.retrieve_data")
+    def test_applies_only_changes_after_first_poll(self, mock_retrieve_data):
+        mock_retrieve_data.side_effect = [
+            live_payload({1: 2, 2: 6}),
+            live_payload({1: 2, 2: 6}),
+            live_payload({1: 3, 2: 6}),
+        ]
+        mock_engine = MagicMock()
+        mock_engine.dialect.name = "mysql"
+        mock_conn = mock_engine.raw_connection.return_value
+        mock_cursor = mock_conn.cursor.return_value
+
+        output = run_live(mock_engine, gameweek_id=20, interval=0, max_polls=3)
+
+        assert output == 3
+        mock_retrieve_data.assert_called_with("event/20/live")
+        upserted = [call[0][1] for call in mock_cursor.executemany.call_args_list]
+        assert [len(rows) for rows in upserted] == [2, 1]
+        assert upserted[1][0][:2] == (1, 20)
+        assert upserted[1][0][-1] == season_of()
+        assert "ON DUPLICATE KEY UPDATE" in mock_cursor.executemany.call_args[0][0]
+        assert mock_conn.commit.call_count == 2
+
+    @patch("airflow_home.dags.scripts.live.retrieve_data")
+    def test_failed_poll_is_retried_against_last_applied(self, mock_retrieve_data):
+        mock_retrieve_data.side_effect = [
+            live_payload({1: 2}),
+            live_payload({1: 3}),
+            live_payload({1: 3}),
+        ]
+        mock_engine = MagicMock()
+        mock_engine.dialect.name = "mysql"
+        mock_cursor = mock_engine.raw_connection.return_value.cursor.return_value
+        mock_cursor.executemany.side_effect = [None, Exception("Deadlock"), None]
+
+        output = run_live(mock_engine, gameweek_id=20, interval=0, max_polls=3)
+
+        assert output == 2
+        mock_engine.raw_connection.return_value.rollback.assert_called_once()
+
+
+class TestCurrentGameweek:
+    @patch("airflow_home.dags.scripts.live.retrieve_data")
+    def test_returns_current_event(self, mock_retrieve_data):
+        mock_retrieve_data.return_value = {
+            "events": [{"id": 1, "is_current": False}, {"id": 2, "is_current": True}]
+        }
+
+        assert current_gameweek() == 2
+
+    @patch("airflow_home.dags.scripts.live.retrieve_data")
+    def test_raises_between_seasons(self, mock_retrieve_data):
+        mock_retrieve_data.return_value = {"events": [{"id": 1, "is_current": False}]}
+
+        with pytest.raises(ValueError, match="no gameweek"):
+            current_gameweek()
@@ -9,7 +9,27 @@ from moto import mock_aws
 import pandas as pd
 import pyarrow as pa
 import pyarrow.parquet as pq
-from airflow_home.dags.scripts.load import retrieve_s3_parquet
+from datetime import date, time, timedelta
+from airflow_home.dags.scripts.helpers import TABLE_NAMES, STAR_SCHEMA_TABLES
+from airflow_home.dags.scripts.load import (
+    load_data,
+    load_single_table,
+    prepare_db,
+    swap_tables,
+    AdaptiveBatcher,
+    create_batcher,
+    retrieve_s3_parquet,
+    iter_s3_parquet_batches,
+    insert_df_into_db,
+    insert_batches_into_db,
+    insert_chunk,
+    create_db_conn,
+    upsert_chunk,
+    merge_batches_into_db,
+    stage_batches_into_db,
+    swap_staging_tables,
+    df_to_load_data_tsv,
+)
 
 
 @mock_aws
@@ -25,8 +45,8 @@ class TestRetrieveS3Parquet(unittest.TestCase):
         s3 = boto3.client("s3", region_name="us-east-1")
         s3.create_bucket(Bucket="test-bucket")
 
-    @patch("airflow_home.dags.scripts.load.boto3.client")
-    def test_function_returns_DataFrame(self, mock_boto3_client):
+    @patch("airflow_home.dags.scripts.load.get_client")
+    def test_function_returns_DataFrame(self, mock_get_client):
         example_df = pd.DataFrame({"test1": [1, 2], "test2": [1, 2]})
 
         buffer = io.BytesIO()
@@ -34,7 +54,7 @@ class TestRetrieveS3Parquet(unittest.TestCase):
         buffer.seek(0)
 
         mock_s3 = MagicMock()
-        mock_boto3_client.return_value = mock_s3
+        mock_get_client.return_value = mock_s3
         mock_s3.get_object.return_value = {"Body": io.BytesIO(buffer.read())}
 
         output = retrieve_s3_parquet("test-bucket", "test-key")
@@ -49,3 +69,538 @@ class TestRetrieveS3Parquet(unittest.TestCase):
             str(err.value)
             == "An error occurred (NoSuchKey) when calling the GetObject operation: The specified key does not exist."
         )
+
+
+@mock_aws
+class TestIterS3ParquetBatches(unittest.TestCase):
+    def setUp(self):
+        """Mocked AWS Credentials for moto and test bucket"""
+        os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+        os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+        os.environ["AWS_SECURITY_TOKEN"] = "testing"
+        os.environ["AWS_SESSION_TOKEN"] = "testing"
+        os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+
+        buffer = io.BytesIO()
+        pd.DataFrame({"test1": range(5), "test2": range(5)}).to_parquet(
+            buffer, index=False
+        )
+
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket="test-bucket")
+        s3.put_object(Bucket="test-bucket", Key="test-key", Body=buffer.getvalue())
+
+    def test_function_yields_bounded_batches(self):
+        output = list(iter_s3_parquet_batches("test-bucket", "test-key", 2))
+
+        assert [len(batch) for batch in output] == [2, 2, 1]
+        assert list(pd.concat(output)["test1"]) == [0, 1, 2, 3, 4]
+
+    def test_incorrect_file_name_raises_exception(self):
+        with pytest.raises(ClientError):
+            list(iter_s3_parquet_batches("test-bucket", "invalid-key"))
+
+    def test_function_reads_only_requested_columns_and_row_groups(self):
+        buffer = io.BytesIO()
+        pq.write_table(
+            pa.table(
+                {
+                    "gameweek_id": [gw for gw in range(1, 5) for _ in range(100)],
+                    "test1": ["x" * 100] * 400,
+                }
+            ),
+            buffer,
+            row_group_size=100,
+        )
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.put_object(Bucket="test-bucket", Key="gw-key", Body=buffer.getvalue())
+
+        output = list(
+            iter_s3_parquet_batches(
+                "test-bucket",
+                "gw-key",
+                columns=["gameweek_id"],
+                row_filter={"gameweek_id": [3]},
+                as_arrow=True,
+            )
+        )
+
+        assert isinstance(output[0], pa.RecordBatch)
+        assert output[0].schema.names == ["gameweek_id"]
+        assert set(pa.Table.from_batches(output)["gameweek_id"].to_pylist()) == {3}
+        assert sum(len(batch) for batch in output) == 100
+
+
+class TestInsertDfIntoDb:
+    def test_executemany_inserts_all_rows(self):
+        df = pd.DataFrame({"test1": [1, 2], "test2": [3, 4]})
+        mock_engine = MagicMock()
+        mock_cursor = mock_engine.raw_connection.return_value.cursor.return_value
+
+        insert_df_into_db(df, mock_engine, "test_table")
+
+        sql, values = mock_cursor.executemany.call_args[0]
+        assert sql == "INSERT INTO test_table (test1, test2) VALUES (%s, %s)"
+        assert values == [(1, 3), (2, 4)]
+        mock_engine.raw_connection.return_value.commit.assert_called_once()
+
+    def test_arrow_chunk_inserts_native_values(self):
+        batch = pa.RecordBatch.from_pydict(
+            {"fixture_id": [1, None], "fixture_date": [date(2024, 8, 16), None]}
+        )
+        mock_cursor = MagicMock()
+
+        insert_chunk(batch, mock_cursor, "test_table")
+
+        sql, values = mock_cursor.executemany.call_args[0]
+        assert (
+            sql == "INSERT INTO test_table (fixture_id, fixture_date) VALUES (%s, %s)"
+        )
+        assert values == [(1, date(2024, 8, 16)), (None, None)]
+
+    def test_chunked_insert_commits_per_chunk(self):
+        df = pd.DataFrame({"test1": [1, 2, 3], "test2": [4, 5, 6]})
+        mock_engine = MagicMock()
+        mock_conn = mock_engine.raw_connection.return_value
+        mock_cursor = mock_conn.cursor.return_value
+
+        insert_df_into_db(
+            df, mock_engine, "test_table", chunk_size=2, commit_per_chunk=True
+        )
+
+        assert mock_cursor.executemany.call_count == 2
+        assert mock_conn.commit.call_count == 3
+
+    def test_load_data_uses_local_infile(self):
+        df = pd.DataFrame({"test1": [1, 2], "test2": [3, 4]})
+        mock_engine = MagicMock()
+        mock_cursor = mock_engine.raw_connection.return_value.cursor.return_value
+
+        insert_df_into_db(df, mock_engine, "test_table", "load_data")
+
+        sql = mock_cursor.execute.call_args[0][0]
+        assert sql.startswith("LOAD DATA LOCAL INFILE %s INTO TABLE test_table")
+        mock_cursor.executemany.assert_not_called()
+
+    def test_load_data_falls_back_when_local_infile_disabled(self):
+        df = pd.DataFrame({"test1": [1, 2], "test2": [3, 4]})
+        mock_engine = MagicMock()
+        mock_cursor = mock_engine.raw_connection.return_value.cursor.return_value
+        # SHOW VARIABLES, TRUNCATE, then LOAD DATA
+        mock_cursor.execute.side_effect = [
+            None,
+            None,
+            Exception(3948, "Loading local data is disabled"),
+        ]
+
+        insert_df_into_db(df, mock_engine, "test_table", "load_data")
+
+        mock_cursor.executemany.assert_called_once()
+        mock_engine.raw_connection.return_value.commit.assert_called_once()
+
+    def test_season_replaces_only_its_rows(self):
+        df = pd.DataFrame({"season": ["2024-25"], "test1": [1]})
+        mock_engine = MagicMock()
+        mock_cursor = mock_engine.raw_connection.return_value.cursor.return_value
+
+        insert_batches_into_db([df], mock_engine, "test_table", season="2024-25")
+
+        statements = [call[0] for call in mock_cursor.execute.call_args_list]
+        assert ("DELETE FROM test_table WHERE season = %s", ("2024-25",)) in statements
+        assert not any("TRUNCATE" in statement[0] for statement in statements)
+
+
+class TestMergeBatchesIntoDb:
+    def test_applies_only_changed_rows(self):
+        # current table state as returned by MySQL - bools as ints, TIME as timedelta
+        mock_engine = MagicMock()
+        mock_cursor = mock_engine.raw_connection.return_value.cursor.return_value
+        mock_cursor.fetchall.return_value = [
+            (1, 1, timedelta(hours=19)),
+            (2, 0, timedelta(hours=15)),
+            (3, 0, timedelta(hours=15)),
+        ]
+        df = pd.DataFrame(
+            {
+                "fixture_id": [1.0, 2.0, 4.0],
+                "match_finished": [True, True, False],
+                "fixture_time": [time(19, 0), time(15, 0), time(20, 0)],
+            }
+        )
+
+        output = merge_batches_into_db([df], mock_engine, "test_table", ["fixture_id"])
+
+        assert output == {"inserted": 1, "updated": 1, "deleted": 1}
+        sql, values = mock_cursor.executemany.call_args[0]
+        assert sql.endswith(
+            "ON DUPLICATE KEY UPDATE match_finished = VALUES(match_finished), fixture_time = VALUES(fixture_time)"
+        )
+        assert [row[0] for row in values] == [4.0, 2.0]
+        delete_sql, delete_values = mock_cursor.execute.call_args[0]
+        assert delete_sql == "DELETE FROM test_table WHERE (fixture_id) IN ((%s))"
+        assert delete_values == [3]
+
+    def test_unchanged_table_writes_nothing(self):
+        mock_engine = MagicMock()
+        mock_cursor = mock_engine.raw_connection.return_value.cursor.return_value
+        mock_cursor.fetchall.return_value = [(1, "Arsenal"), (2, "Chelsea")]
+        df = pd.DataFrame({"team_id": [1, 2], "team_name": ["Arsenal", "Chelsea"]})
+
+        output = merge_batches_into_db([df], mock_engine, "test_table", ["team_id"])
+
+        assert output == {"inserted": 0, "updated": 0, "deleted": 0}
+        mock_cursor.executemany.assert_not_called()
+
+    def test_season_compares_only_its_rows(self):
+        mock_engine = MagicMock()
+        mock_cursor = mock_engine.raw_connection.return_value.cursor.return_value
+        mock_cursor.fetchall.return_value = [("2024-25", 1, "Arsenal")]
+        df = pd.DataFrame(
+            {"season": ["2024-25"], "team_id": [1], "team_name": ["Arsenal"]}
+        )
+
+        output = merge_batches_into_db(
+            [df], mock_engine, "test_table", ["season", "team_id"], season="2024-25"
+        )
+
+        assert output == {"inserted": 0, "updated": 0, "deleted": 0}
+        sql, values = mock_cursor.execute.call_args_list[0][0]
+        assert sql.endswith("FROM test_table WHERE season = %s")
+        assert values == ("2024-25",)
+
+
+class TestSwapLoad:
+    def test_stage_raises_when_row_count_does_not_match(self):
+        df = pd.DataFrame({"test1": [1, 2], "test2": [3, 4]})
+        mock_engine = MagicMock()
+        mock_cursor = mock_engine.raw_connection.return_value.cursor.return_value
+        mock_cursor.fetchone.return_value = (1,)
+
+        with pytest.raises(ValueError, match="expected 2"):
+            stage_batches_into_db([df], mock_engine, "test_table")
+
+    def test_stage_allows_empty_aggregate_tables_only(self):
+        mock_engine = MagicMock()
+        mock_cursor = mock_engine.raw_connection.return_value.cursor.return_value
+        mock_cursor.fetchone.return_value = (0,)
+
+        assert stage_batches_into_db([], mock_engine, "agg_top_scorers") == 0
+        with pytest.raises(ValueError, match="expected 0"):
+            stage_batches_into_db([], mock_engine, "fact_players")
+
+    def test_swap_renames_all_tables_in_one_statement(self):
+        mock_engine = MagicMock()
+        mock_cursor = mock_engine.raw_connection.return_value.cursor.return_value
+
+        swap_staging_tables(mock_engine, ["table_a", "table_b"])
+
+        executed = [call[0][0] for call in mock_cursor.execute.call_args_list]
+        assert (
+            "RENAME TABLE table_a TO table_a_old, table_a_staging TO table_a, "
+            "table_b TO table_b_old, table_b_staging TO table_b"
+        ) in executed
+
+    @patch("airflow_home.dags.scripts.load.output_tables", return_value=TABLE_NAMES)
+    @patch("airflow_home.dags.scripts.load.iter_s3_parquet_batches")
+    @patch("airflow_home.dags.scripts.load.create_db_conn")
+    def test_failed_stage_leaves_live_tables(
+        self, mock_create_db_conn, mock_batches, mock_output_tables
+    ):
+        mock_engine = mock_create_db_conn.return_value
+        mock_cursor = mock_engine.raw_connection.return_value.cursor.return_value
+
+        def batches_or_error(bucket_name, file_name, chunk_size, **kwargs):
+            if "dim_teams" in file_name:
+                raise Exception("NoSuchKey")
+            return [pd.DataFrame({"test1": [1]})]
+
+        mock_batches.side_effect = batches_or_error
+        # row count, then test1 non-null count and sum
+        mock_cursor.fetchone.return_value = (1, 1, 1)
+
+        with pytest.raises(Exception, match="NoSuchKey"):
+            load_data("user", "pw", "host", "3306", "db", "bucket", mode="swap")
+
+        executed = [call[0][0] for call in mock_cursor.execute.call_args_list]
+        assert not any(sql.startswith("RENAME TABLE") for sql in executed)
+        mock_engine.dispose.assert_called_once()
+        assert executed[-1].startswith("DROP TABLE IF EXISTS fact_players_staging")
+
+
+class TestLoadData:
+    @patch("airflow_home.dags.scripts.load.output_tables", return_value=TABLE_NAMES)
+    @patch("airflow_home.dags.scripts.load.iter_s3_parquet_batches")
+    @patch("airflow_home.dags.scripts.load.create_db_conn")
+    def test_loads_every_table(
+        self, mock_create_db_conn, mock_batches, mock_output_tables
+    ):
+        mock_batches.side_effect = lambda *args, **kwargs: [
+            pd.DataFrame({"test1": [1]})
+        ]
+        mock_engine = mock_create_db_conn.return_value
+        mock_cursor = mock_engine.raw_connection.return_value.cursor.return_value
+        mock_cursor.fetchone.return_value = (1, 1, 1)
+
+        load_data("user", "pw", "host", "3306", "db", "bucket", max_workers=2)
+
+        assert mock_create_db_conn.call_args.kwargs["pool_size"] == 2
+        tables = sorted(
+            call[0][0].split()[2] for call in mock_cursor.executemany.call_args_list
+        )
+        assert tables == sorted(TABLE_NAMES)
+
+    @patch(
+        "airflow_home.dags.scripts.load.output_tables", return_value=STAR_SCHEMA_TABLES
+    )
+    @patch("airflow_home.dags.scripts.load.iter_s3_parquet_batches")
+    @patch("airflow_home.dags.scripts.load.create_db_conn")
+    def test_missing_aggregate_tables_are_not_loaded(
+        self, mock_create_db_conn, mock_batches, mock_output_tables
+    ):
+        mock_batches.side_effect = lambda *args, **kwargs: [
+            pd.DataFrame({"test1": [1]})
+        ]
+        mock_engine = mock_create_db_conn.return_value
+        mock_cursor = mock_engine.raw_connection.return_value.cursor.return_value
+        mock_cursor.fetchone.return_value = (1, 1, 1)
+
+        load_data(
+            "user", "pw", "host", "3306", "db", "bucket", mode="swap", ds="2024-08-16"
+        )
+
+        read_files = sorted(call[0][1] for call in mock_batches.call_args_list)
+        assert read_files == sorted(
+            f"2024-25/2024-08-16/{table}.parquet" for table in STAR_SCHEMA_TABLES
+        )
+        executed = [call[0][0] for call in mock_cursor.execute.call_args_list]
+        renames = next(sql for sql in executed if sql.startswith("RENAME TABLE"))
+        assert "agg_" not in renames
+
+    @patch("airflow_home.dags.scripts.load.output_tables", return_value=TABLE_NAMES)
+    @patch("airflow_home.dags.scripts.load.iter_s3_parquet_batches")
+    @patch("airflow_home.dags.scripts.load.create_db_conn")
+    def test_insert_error_propagates(
+        self, mock_create_db_conn, mock_batches, mock_output_tables
+    ):
+        mock_batches.side_effect = lambda *args, **kwargs: [
+            pd.DataFrame({"test1": [1]})
+        ]
+        mock_engine = mock_create_db_conn.return_value
+        mock_cursor = mock_engine.raw_connection.return_value.cursor.return_value
+        mock_cursor.executemany.side_effect = Exception("Lost connection")
+
+        with pytest.raises(Exception, match="Lost connection"):
+            load_data("user", "pw", "host", "3306", "db", "bucket")
+
+    @patch("airflow_home.dags.scripts.load.iter_s3_parquet_batches")
+    @patch("airflow_home.dags.scripts.load.create_db_conn")
+    def test_in_memory_tables_skip_s3(self, mock_create_db_conn, mock_batches):
+        mock_engine = mock_create_db_conn.return_value
+        mock_cursor = mock_engine.raw_connection.return_value.cursor.return_value
+        mock_cursor.fetchone.return_value = (3, 3, 6)
+        tables = {table: pd.DataFrame({"test1": [1, 2, 3]}) for table in TABLE_NAMES}
+
+        load_data("user", "pw", "host", "3306", "db", None, chunk_size=2, tables=tables)
+
+        mock_batches.assert_not_called()
+        rows = [
+            row for call in mock_cursor.executemany.call_args_list for row in call[0][1]
+        ]
+        assert rows.count((1,)) == len(TABLE_NAMES)
+        assert len(rows) == 3 * len(TABLE_NAMES)
+
+
+class TestMappedLoadTasks:
+    @patch("airflow_home.dags.scripts.load.migrate")
+    @patch("airflow_home.dags.scripts.load.create_db_conn")
+    def test_prepare_db_migrates(self, mock_create_db_conn, mock_migrate):
+        mock_migrate.return_value = 4
+
+        assert prepare_db("user", "pw", "host", "3306", "db") == 4
+        mock_migrate.assert_called_once_with(mock_create_db_conn.return_value)
+        mock_create_db_conn.return_value.dispose.assert_called_once()
+
+    @patch("airflow_home.dags.scripts.load.iter_s3_parquet_batches")
+    @patch("airflow_home.dags.scripts.load.create_db_conn")
+    def test_load_single_table_loads_only_its_table(
+        self, mock_create_db_conn, mock_batches
+    ):
+        mock_batches.side_effect = lambda *args, **kwargs: [
+            pd.DataFrame({"test1": [1]})
+        ]
+        mock_engine = mock_create_db_conn.return_value
+        mock_cursor = mock_engine.raw_connection.return_value.cursor.return_value
+        mock_cursor.fetchone.return_value = (1, 1, 1)
+
+        load_single_table(
+            "user", "pw", "host", "3306", "db", "bucket", "dim_teams", ds="2024-08-16"
+        )
+
+        assert mock_batches.call_args[0][1] == "2024-25/2024-08-16/dim_teams.parquet"
+        assert mock_create_db_conn.call_args.kwargs["pool_size"] == 1
+        tables = {
+            call[0][0].split()[2] for call in mock_cursor.executemany.call_args_list
+        }
+        assert tables == {"dim_teams"}
+        mock_engine.dispose.assert_called_once()
+
+    @patch("airflow_home.dags.scripts.load.output_tables", return_value=[])
+    @patch("airflow_home.dags.scripts.load.create_db_conn")
+    def test_load_single_table_skips_missing_aggregate_table(
+        self, mock_create_db_conn, mock_output_tables
+    ):
+        assert (
+            load_single_table(
+                "user",
+                "pw",
+                "host",
+                "3306",
+                "db",
+                "bucket",
+                "agg_top_scorers",
+                ds="2024-08-16",
+            )
+            is None
+        )
+        mock_output_tables.assert_called_once_with("bucket", "2024-08-16")
+        mock_create_db_conn.assert_not_called()
+
+    @patch("airflow_home.dags.scripts.load.output_tables", return_value=TABLE_NAMES)
+    @patch("airflow_home.dags.scripts.load.create_db_conn")
+    def test_swap_tables_drops_staging_when_swap_fails(
+        self, mock_create_db_conn, mock_output_tables
+    ):
+        mock_engine = mock_create_db_conn.return_value
+        mock_cursor = mock_engine.raw_connection.return_value.cursor.return_value
+        mock_cursor.execute.side_effect = [Exception("Lock wait timeout"), None]
+
+        with pytest.raises(Exception, match="Lock wait timeout"):
+            swap_tables("user", "pw", "host", "3306", "db", "bucket")
+
+        assert mock_cursor.execute.call_args[0][0].startswith(
+            "DROP TABLE IF EXISTS fact_players_staging"
+        )
+        mock_engine.raw_connection.return_value.commit.assert_called_once()
+        mock_engine.dispose.assert_called_once()
+
+
+class TestAdaptiveBatcher:
+    def test_batches_are_sized_by_server_limits(self):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [
+            ("max_allowed_packet", "2000"),
+            ("innodb_log_file_size", "100000"),
+        ]
+
+        batcher = create_batcher(mock_cursor, "mysql")
+
+        assert batcher.max_batch_bytes == 1000
+
+    def test_values_are_split_into_byte_bounded_batches(self):
+        mock_cursor = MagicMock()
+        batcher = AdaptiveBatcher(max_batch_bytes=100, min_rows=1)
+        values_list = [(i, "x" * 10) for i in range(100, 130)]
+
+        batcher.execute(mock_cursor, "INSERT", values_list)
+
+        batches = [call[0][1] for call in mock_cursor.executemany.call_args_list]
+        assert sum(batches, []) == values_list
+        assert max(len(batch) for batch in batches) <= 5
+
+    def test_batch_size_adapts_to_latency(self):
+        batcher = AdaptiveBatcher(target_seconds=0.5)
+
+        assert batcher.next_batch_rows(1000, 2.0) == 500
+        assert batcher.next_batch_rows(1000, 0.1) == 2000
+
+    def test_commit_mode_commits_every_batch(self):
+        mock_cursor = MagicMock()
+        batcher = AdaptiveBatcher(
+            max_batch_bytes=100, transactions="commit", min_rows=1
+        )
+
+        batcher.execute(mock_cursor, "INSERT", [(i, "x" * 10) for i in range(100, 130)])
+
+        assert (
+            mock_cursor.connection.commit.call_count
+            == mock_cursor.executemany.call_count
+        )
+
+    def test_savepoint_mode_retries_failed_batch_at_half_size(self):
+        mock_cursor = MagicMock()
+        mock_cursor.executemany.side_effect = [
+            Exception("Packet too large"),
+            None,
+            None,
+        ]
+        batcher = AdaptiveBatcher(transactions="savepoint", min_rows=1)
+        values_list = [(i,) for i in range(10)]
+
+        batcher.execute(mock_cursor, "INSERT", values_list)
+
+        executed = [call[0][0] for call in mock_cursor.execute.call_args_list]
+        assert "ROLLBACK TO SAVEPOINT insert_batch" in executed
+        batches = [call[0][1] for call in mock_cursor.executemany.call_args_list]
+        assert [len(batch) for batch in batches] == [10, 5, 5]
+
+
+class TestPostgresqlTarget:
+    @patch("airflow_home.dags.scripts.load.create_engine")
+    def test_create_db_conn_uses_psycopg2(self, mock_create_engine):
+        create_db_conn("user", "pw", "host", "5432", "db", dialect="postgresql")
+
+        assert (
+            mock_create_engine.call_args[0][0]
+            == "postgresql+psycopg2://user:pw@host:5432/db"
+        )
+        assert mock_create_engine.call_args.kwargs["connect_args"] == {}
+
+    def test_copy_streams_rows_from_stdin(self):
+        df = pd.DataFrame({"test1": [1, None], "test2": [True, False]})
+        mock_cursor = MagicMock()
+
+        insert_chunk(df, mock_cursor, "test_table", "copy")
+
+        sql, copy_file = mock_cursor.copy_expert.call_args[0]
+        assert sql == "COPY test_table (test1, test2) FROM STDIN WITH (FORMAT text)"
+        assert copy_file.read() == "1\t1\n\\N\t0\n"
+        mock_cursor.executemany.assert_not_called()
+
+    @patch("psycopg2.extras.execute_values")
+    def test_upsert_uses_on_conflict(self, mock_execute_values):
+        df = pd.DataFrame({"team_id": [1], "team_name": ["Arsenal"]})
+        mock_cursor = MagicMock()
+
+        upsert_chunk(df, mock_cursor, "dim_teams", ["team_id"], "postgresql")
+
+        sql = mock_execute_values.call_args[0][1]
+        assert sql.endswith(
+            "VALUES %s ON CONFLICT (team_id) DO UPDATE SET team_name = EXCLUDED.team_name"
+        )
+
+    def test_load_data_rejects_bulk_method_of_other_dialect(self):
+        with pytest.raises(ValueError, match="not supported for mysql"):
+            load_data("user", "pw", "host", "3306", "db", "bucket", method="copy")
+
+
+class TestDfToLoadDataTsv:
+    def test_encodes_nulls_bools_dates_and_times(self):
+        df = pd.DataFrame(
+            {
+                "fixture_id": [1.0, None],
+                "fixture_date": [date(2024, 8, 16), None],
+                "fixture_time": [time(19, 0), None],
+                "match_finished": [True, False],
+            }
+        )
+
+        output = df_to_load_data_tsv(df)
+
+        assert output == "1\t2024-08-16\t19:00:00\t1\n\\N\t\\N\t\\N\t0\n"
+
+    def test_escapes_special_characters(self):
+        df = pd.DataFrame({"web_name": ["a\tb\\c\nd"]})
+
+        output = df_to_load_data_tsv(df)
+
+        assert output == "a\\tb\\\\c\\nd\n"
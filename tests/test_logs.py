@@ -0,0 +1,161 @@
+import os
+import json
+import logging
+import unittest
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import boto3
+import pytest
+from moto import mock_aws
+from airflow_home.dags.scripts.logs import (
+    setup_logging,
+    reset_logging,
+    log_context,
+    ship_logs,
+)
+
+
+@pytest.fixture
+def log_dir(tmp_path, monkeypatch):
+    """Logging set up afresh, writing to a temporary directory for one run"""
+    monkeypatch.setenv("log_dir", str(tmp_path))
+    monkeypatch.setenv("AIRFLOW_CTX_DAG_RUN_ID", "scheduled__2024-08-16")
+    monkeypatch.setenv("AIRFLOW_CTX_TASK_ID", "load_task")
+    reset_logging()
+    setup_logging()
+    yield tmp_path
+    reset_logging()
+    setup_logging()
+
+
+def read_records(log_dir):
+    reset_logging()
+    with open(log_dir / "scheduled__2024-08-16.jsonl") as log_file:
+        return [json.loads(line) for line in log_file]
+
+
+def test_records_are_json_with_run_and_context_fields(log_dir):
+    with log_context(stage="load", table="dim_teams"):
+        logging.info("dim_teams loaded")
+    logging.warning("outside any stage")
+
+    records = read_records(log_dir)
+
+    assert records[0]["message"] == "dim_teams loaded"
+    assert records[0]["run_id"] == "scheduled__2024-08-16"
+    assert records[0]["task_id"] == "load_task"
+    assert records[0]["stage"] == "load"
+    assert records[0]["table"] == "dim_teams"
+    assert records[0]["endpoint"] is None
+    assert records[1]["level"] == "WARNING"
+    assert records[1]["stage"] is None
+
+
+def test_nested_context_is_restored(log_dir):
+    with log_context(stage="extract"):
+        with log_context(endpoint="fixtures"):
+            logging.info("inner")
+        logging.info("outer")
+
+    records = read_records(log_dir)
+
+    assert (records[0]["stage"], records[0]["endpoint"]) == ("extract", "fixtures")
+    assert (records[1]["stage"], records[1]["endpoint"]) == ("extract", None)
+
+
+def test_nothing_shipped_without_log_bucket(log_dir):
+    logging.info("kept locally")
+
+    assert ship_logs() == 0
+
+
+@mock_aws
+class TestShipLogs(unittest.TestCase):
+    def setUp(self):
+        """Mocked AWS Credentials for moto, a log bucket and logging buffering for it"""
+        os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+        os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+        os.environ["AWS_SECURITY_TOKEN"] = "testing"
+        os.environ["AWS_SESSION_TOKEN"] = "testing"
+        os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+        os.environ["log_bucket"] = "log-bucket"
+        os.environ["AIRFLOW_CTX_DAG_RUN_ID"] = "scheduled__2024-08-16"
+        os.environ["AIRFLOW_CTX_TASK_ID"] = "extract_task"
+
+        self.s3 = boto3.client("s3")
+        self.s3.create_bucket(Bucket="log-bucket")
+        reset_logging()
+        setup_logging()
+
+    def tearDown(self):
+        for name in ["log_bucket", "AIRFLOW_CTX_DAG_RUN_ID", "AIRFLOW_CTX_TASK_ID"]:
+            del os.environ[name]
+        reset_logging()
+        setup_logging()
+
+    def test_ships_run_records_in_one_object_per_task(self):
+        with log_context(stage="extract", endpoint="fixtures"):
+            for i in range(3):
+                logging.info(f"record {i}")
+
+        shipped = ship_logs()
+
+        objects = self.s3.list_objects_v2(Bucket="log-bucket")["Contents"]
+        assert len(objects) == 1
+        assert objects[0]["Key"].startswith("logs/scheduled__2024-08-16/extract_task-")
+        body = self.s3.get_object(Bucket="log-bucket", Key=objects[0]["Key"])["Body"]
+        records = [json.loads(line) for line in body.read().decode().splitlines()]
+        assert [record["message"] for record in records][-3:] == [
+            "record 0",
+            "record 1",
+            "record 2",
+        ]
+        assert shipped == len(records)
+        assert all(record["endpoint"] == "fixtures" for record in records[-3:])
+        assert ship_logs() == 0
+
+    def test_concurrent_shipping_ships_every_record_once(self):
+        def log_and_ship(i):
+            shipped = 0
+            for j in range(20):
+                logging.info(f"thread {i} record {j}")
+                shipped += ship_logs()
+            return shipped
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            shipped = sum(executor.map(log_and_ship, range(5)))
+        shipped += ship_logs()
+
+        messages = [
+            json.loads(line)["message"]
+            for item in self.s3.list_objects_v2(Bucket="log-bucket")["Contents"]
+            for line in self.s3.get_object(Bucket="log-bucket", Key=item["Key"])["Body"]
+            .read()
+            .decode()
+            .splitlines()
+        ]
+        assert shipped == len(messages)
+        assert sum(message.startswith("thread ") for message in messages) == 100
+
+
+def log_in_child(message):
+    logging.info(message)
+    return os.getpid()
+
+
+def test_records_logged_in_forked_workers_are_written(log_dir):
+    context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(max_workers=2, mp_context=context) as executor:
+        pids = set(executor.map(log_in_child, [f"date {i}" for i in range(4)]))
+    logging.info("parent")
+
+    records = read_records(log_dir)
+
+    assert os.getpid() not in pids
+    assert sorted(record["message"] for record in records) == [
+        "date 0",
+        "date 1",
+        "date 2",
+        "date 3",
+        "parent",
+    ]
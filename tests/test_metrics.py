@@ -0,0 +1,94 @@
+import json
+from unittest.mock import MagicMock
+import pytest
+from airflow_home.dags.scripts import metrics
+from airflow_home.dags.scripts.metrics import span, timed, record, flush_metrics
+
+
+@pytest.fixture(autouse=True)
+def empty_buffer(monkeypatch):
+    monkeypatch.delenv("metrics_dir", raising=False)
+    monkeypatch.delenv("metrics_to_db", raising=False)
+    monkeypatch.setenv("AIRFLOW_CTX_DAG_RUN_ID", "scheduled__2024-08-16")
+    monkeypatch.setenv("AIRFLOW_CTX_TASK_ID", "load_task")
+    flush_metrics()
+    yield
+    flush_metrics()
+
+
+class TestSpan:
+    def test_nested_spans_record_parent_and_counters(self):
+        with span("load_table"):
+            with span("insert_df_into_db"):
+                record(row_count=10, byte_count=512)
+            record(retries=1)
+
+        rows = [buffered.as_dict() for buffered in metrics._buffer]
+
+        assert [row["span"] for row in rows] == ["insert_df_into_db", "load_table"]
+        assert rows[0]["parent"] == "load_table"
+        assert rows[0]["row_count"] == 10
+        assert rows[0]["byte_count"] == 512
+        assert rows[1]["parent"] is None
+        assert rows[1]["retries"] == 1
+        assert rows[1]["run_id"] == "scheduled__2024-08-16"
+        assert rows[1]["task_id"] == "load_task"
+        assert rows[1]["duration_ms"] >= 0
+
+    def test_timed_function_error_sets_status(self):
+        @timed
+        def failing_stage():
+            raise ValueError("stage failed")
+
+        with pytest.raises(ValueError):
+            failing_stage()
+
+        assert metrics._buffer[-1].name == "failing_stage"
+        assert metrics._buffer[-1].status == "error"
+
+    def test_record_outside_span_is_ignored(self):
+        record(row_count=10)
+
+        assert metrics._buffer == []
+
+
+class TestFlushMetrics:
+    def test_writes_run_artifact(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("metrics_dir", str(tmp_path))
+        with span("extract_endpoint"):
+            record(byte_count=100)
+
+        output = flush_metrics()
+
+        with open(tmp_path / "scheduled__2024-08-16.jsonl") as artifact:
+            rows = [json.loads(line) for line in artifact]
+        assert output == 1
+        assert rows[0]["span"] == "extract_endpoint"
+        assert rows[0]["byte_count"] == 100
+        assert metrics._buffer == []
+
+    def test_writes_metrics_table(self, monkeypatch):
+        monkeypatch.setenv("metrics_to_db", "true")
+        mock_engine = MagicMock()
+        monkeypatch.setattr(metrics, "_engine", mock_engine)
+        with span("merge_batches_into_db"):
+            record(row_count=3)
+
+        flush_metrics()
+
+        mock_cursor = mock_engine.raw_connection.return_value.cursor.return_value
+        sql, values = mock_cursor.executemany.call_args[0]
+        assert sql.startswith("INSERT INTO pipeline_run_metrics")
+        assert values[0][2] == "merge_batches_into_db"
+        assert values[0][7] == 3
+        mock_engine.raw_connection.return_value.commit.assert_called_once()
+
+    def test_write_failure_is_not_raised(self, monkeypatch):
+        monkeypatch.setenv("metrics_to_db", "true")
+        mock_engine = MagicMock()
+        mock_engine.raw_connection.side_effect = Exception("connection refused")
+        monkeypatch.setattr(metrics, "_engine", mock_engine)
+        with span("load_table"):
+            pass
+
+        assert flush_metrics() == 1
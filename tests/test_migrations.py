@@ -0,0 +1,99 @@
+from unittest.mock import MagicMock
+import pytest
+from airflow_home.dags.scripts.migrations import migrate, MIGRATIONS, LATEST_VERSION
+
+
+def mock_engine_with_versions(applied_versions):
+    """Mock SQLAlchemy engine whose schema_migrations table holds applied_versions"""
+    mock_engine = MagicMock()
+    mock_conn = mock_engine.connect.return_value.__enter__.return_value
+    mock_conn.execute.return_value.fetchall.return_value = [
+        (version,) for version in applied_versions
+    ]
+    return mock_engine, mock_conn
+
+
+def executed_statements(mock_conn):
+    return [call[0][0] for call in mock_conn.execute.call_args_list]
+
+
+class TestMigrate:
+    def test_versions_are_sequential(self):
+        versions = [version for version, _, _ in MIGRATIONS]
+        assert versions == list(range(1, len(MIGRATIONS) + 1))
+
+    def test_applies_all_migrations_to_empty_database(self):
+        mock_engine, mock_conn = mock_engine_with_versions([])
+
+        output = migrate(mock_engine)
+
+        assert output == LATEST_VERSION
+        recorded = [
+            call[0][1][0]
+            for call in mock_conn.execute.call_args_list
+            if call[0][0].startswith("INSERT INTO schema_migrations")
+        ]
+        assert recorded == list(range(1, LATEST_VERSION + 1))
+
+    def test_applies_only_pending_migrations(self):
+        mock_engine, mock_conn = mock_engine_with_versions(range(1, 4))
+
+        migrate(mock_engine)
+
+        statements = executed_statements(mock_conn)
+        assert not any(
+            sql.startswith("CREATE TABLE IF NOT EXISTS fact_players ")
+            for sql in statements
+        )
+        assert any("PARTITION BY RANGE (gameweek_id)" in sql for sql in statements)
+
+    def test_stops_at_target_version(self):
+        mock_engine, mock_conn = mock_engine_with_versions([])
+
+        output = migrate(mock_engine, target_version=1)
+
+        assert output == 1
+        assert not any(
+            "PRIMARY KEY (player_id" in sql for sql in executed_statements(mock_conn)
+        )
+
+    def test_failed_migration_is_not_recorded(self):
+        mock_engine, mock_conn = mock_engine_with_versions([1])
+        results = mock_conn.execute.return_value
+
+        def execute(sql, *args):
+            if sql.startswith("ALTER TABLE fact_players ADD PRIMARY KEY"):
+                raise Exception("Duplicate entry")
+            return results
+
+        mock_conn.execute.side_effect = execute
+
+        with pytest.raises(Exception, match="Duplicate entry"):
+            migrate(mock_engine)
+
+        assert not any(
+            sql.startswith("INSERT INTO schema_migrations")
+            for sql in executed_statements(mock_conn)
+        )
+
+    def test_postgresql_skips_partitioning(self):
+        mock_engine, mock_conn = mock_engine_with_versions([1, 2, 3])
+        mock_engine.dialect.name = "postgresql"
+
+        output = migrate(mock_engine)
+
+        assert output == LATEST_VERSION
+        assert not any("PARTITION" in sql for sql in executed_statements(mock_conn))
+
+    def test_postgresql_drops_primary_key_by_catalog_name(self):
+        mock_engine, mock_conn = mock_engine_with_versions([1, 2, 3, 4, 5, 6])
+        mock_engine.dialect.name = "postgresql"
+
+        migrate(mock_engine)
+
+        statements = executed_statements(mock_conn)
+        assert not any("_pkey" in sql for sql in statements)
+        drops = [sql for sql in statements if "pg_constraint" in sql]
+        assert len(drops) == 5
+        assert "conrelid = 'fact_players'::regclass" in drops[0]
+        assert "conrelid = 'fact_player_stats'::regclass" in drops[-1]
@@ -0,0 +1,132 @@
+import os
+import unittest
+from unittest.mock import patch
+import boto3
+import pytest
+from moto import mock_aws
+import pandas as pd
+from airflow_home.dags.scripts.helpers import TABLE_NAMES
+from airflow_home.dags.scripts.pipeline import run_pipeline
+
+api_payloads = {
+    "bootstrap-static": {
+        "elements": [
+            {
+                "id": 1,
+                "team": 10,
+                "first_name": "John",
+                "second_name": "Doe",
+                "web_name": "JD",
+            }
+        ],
+        "events": [{"id": 1}],
+        "teams": [
+            {"id": 10, "name": "Team A", "short_name": "TA"},
+            {"id": 20, "name": "Team B", "short_name": "TB"},
+        ],
+    },
+    "fixtures": [
+        {
+            "id": 100,
+            "event": 1,
+            "team_h": 10,
+            "team_a": 20,
+            "team_h_difficulty": 3,
+            "team_a_difficulty": 2,
+            "kickoff_time": "2025-01-14T15:00:00Z",
+            "finished": True,
+            "team_h_score": 2,
+            "team_a_score": 1,
+        }
+    ],
+}
+
+
+@mock_aws
+@patch("airflow_home.dags.scripts.pipeline.load_data")
+@patch("airflow_home.dags.scripts.pipeline.retrieve_data")
+@patch("airflow_home.dags.scripts.pipeline.generate_endpoints")
+class TestRunPipeline(unittest.TestCase):
+    def setUp(self):
+        """Mocked AWS Credentials for moto and test buckets"""
+        os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+        os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+        os.environ["AWS_SECURITY_TOKEN"] = "testing"
+        os.environ["AWS_SESSION_TOKEN"] = "testing"
+        os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+
+        s3 = boto3.client("s3")
+        s3.create_bucket(Bucket="extract-bucket")
+        s3.create_bucket(Bucket="transform-bucket")
+
+    def test_tables_are_loaded_from_memory(
+        self, mock_generate_endpoints, mock_retrieve_data, mock_load_data
+    ):
+        mock_generate_endpoints.return_value = list(api_payloads)
+        mock_retrieve_data.side_effect = lambda endpoint: api_payloads[endpoint]
+
+        result = run_pipeline("user", "pw", "host", "3306", "db", mode="merge")
+
+        tables = mock_load_data.call_args.kwargs["tables"]
+        assert sorted(tables) == sorted(TABLE_NAMES)
+        assert isinstance(tables["fact_players"], pd.DataFrame)
+        assert mock_load_data.call_args.kwargs["mode"] == "merge"
+        assert result["load"] == mock_load_data.return_value
+        assert set(result["timings"]) == {
+            "extract",
+            "transform",
+            "load",
+            "persist_wait",
+        }
+
+        s3 = boto3.client("s3")
+        for bucket in ["extract-bucket", "transform-bucket"]:
+            assert s3.list_objects_v2(Bucket=bucket)["KeyCount"] == 0
+
+    def test_tables_tagged_with_season_of_ds(
+        self, mock_generate_endpoints, mock_retrieve_data, mock_load_data
+    ):
+        mock_generate_endpoints.return_value = list(api_payloads)
+        mock_retrieve_data.side_effect = lambda endpoint: api_payloads[endpoint]
+
+        run_pipeline("user", "pw", "host", "3306", "db", ds="2022-03-01")
+
+        tables = mock_load_data.call_args.kwargs["tables"]
+        assert (tables["fact_players"]["season"] == "2021-22").all()
+        assert mock_load_data.call_args.kwargs["ds"] == "2022-03-01"
+
+    def test_persist_saves_raw_and_parquet_files(
+        self, mock_generate_endpoints, mock_retrieve_data, mock_load_data
+    ):
+        mock_generate_endpoints.return_value = list(api_payloads)
+        mock_retrieve_data.side_effect = lambda endpoint: api_payloads[endpoint]
+
+        run_pipeline(
+            "user",
+            "pw",
+            "host",
+            "3306",
+            "db",
+            extract_bucket="extract-bucket",
+            transform_bucket="transform-bucket",
+        )
+
+        s3 = boto3.client("s3")
+        assert s3.list_objects_v2(Bucket="extract-bucket")["KeyCount"] == 2
+        assert s3.list_objects_v2(Bucket="transform-bucket")["KeyCount"] == len(
+            TABLE_NAMES
+        )
+
+    def test_failed_parquet_save_is_raised(
+        self, mock_generate_endpoints, mock_retrieve_data, mock_load_data
+    ):
+        mock_generate_endpoints.return_value = list(api_payloads)
+        mock_retrieve_data.side_effect = lambda endpoint: api_payloads[endpoint]
+
+        with patch(
+            "airflow_home.dags.scripts.transform.wr.s3.to_parquet",
+            side_effect=Exception("NoSuchBucket"),
+        ), pytest.raises(Exception, match="NoSuchBucket"):
+            run_pipeline(
+                "user", "pw", "host", "3306", "db", transform_bucket="transform-bucket"
+            )
@@ -0,0 +1,106 @@
+import asyncio
+from unittest.mock import patch, AsyncMock
+from aiohttp import web
+from airflow_home.dags.scripts.readiness import check_readiness, wait_until_ready
+
+bootstrap = {
+    "events": [
+        {"id": 20, "is_previous": True, "finished": True, "data_checked": True},
+        {"id": 21, "is_current": True, "finished": False, "data_checked": False},
+    ]
+}
+
+
+class TestCheckReadiness:
+    def test_ready_when_started_fixtures_are_finished(self):
+        fixtures = [
+            {"id": 1, "started": True, "finished": True},
+            {"id": 2, "started": False, "finished": False},
+        ]
+
+        assert check_readiness(bootstrap, fixtures) == {
+            "ready": True,
+            "reason": "data final",
+            "gameweek": 21,
+        }
+
+    def test_waits_for_bonus_points_to_be_confirmed(self):
+        fixtures = [{"id": 1, "started": True, "finished_provisional": True}]
+
+        output = check_readiness(bootstrap, fixtures)
+
+        assert not output["ready"]
+        assert output["reason"] == "1 started fixtures not final"
+
+    def test_waits_for_finished_gameweek_data_check(self):
+        events = [{"id": 21, "is_current": True, "finished": True}]
+
+        output = check_readiness({"events": events}, [])
+
+        assert not output["ready"]
+        assert output["reason"] == "gameweek 21 finished, awaiting data check"
+
+
+async def serve_and_wait(responses, **kwargs):
+    """Run wait_until_ready against a local FPL API stand-in returning (status, body) responses in order"""
+    requests = []
+
+    async def handler(request):
+        endpoint = request.match_info["endpoint"]
+        requests.append(endpoint)
+        queue = responses[endpoint]
+        status, body = queue.pop(0) if len(queue) > 1 else queue[0]
+        if status != 200:
+            return web.Response(status=status, text=body)
+        return web.json_response(body)
+
+    app = web.Application()
+    app.router.add_get("/api/{endpoint}/", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        with patch(
+            "airflow_home.dags.scripts.readiness.BASE_URL",
+            f"http://127.0.0.1:{port}/api/",
+        ):
+            return await wait_until_ready(**kwargs), requests
+    finally:
+        await runner.cleanup()
+
+
+def test_polls_until_api_is_back_and_data_is_final():
+    responses = {
+        "bootstrap-static": [
+            (503, "The game is being updated."),
+            (200, bootstrap),
+        ],
+        "fixtures": [
+            (200, [{"id": 1, "started": True, "finished": False}]),
+            (200, [{"id": 1, "started": True, "finished": False}]),
+            (200, [{"id": 1, "started": True, "finished": True}]),
+        ],
+    }
+
+    output, requests = asyncio.run(
+        serve_and_wait(responses, poll_interval=0.01, timeout=5)
+    )
+
+    assert output["ready"]
+    assert not output["timed_out"]
+    assert requests.count("fixtures") == 3
+
+
+@patch(
+    "airflow_home.dags.scripts.readiness.poll_readiness",
+    new_callable=AsyncMock,
+    return_value={"ready": False, "reason": "FPL API unavailable", "gameweek": None},
+)
+def test_gives_up_after_timeout(mock_poll_readiness):
+    output = asyncio.run(wait_until_ready(poll_interval=0.01, timeout=0.05))
+
+    assert output["timed_out"]
+    assert output["reason"] == "FPL API unavailable"
+    assert mock_poll_readiness.await_count >= 2
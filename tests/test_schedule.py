@@ -0,0 +1,96 @@
+import os
+import json
+import unittest
+import boto3
+from moto import mock_aws
+from datetime import datetime, timezone
+from airflow_home.dags.scripts.schedule import (
+    match_windows,
+    build_schedule,
+    update_schedule,
+)
+
+fixtures = [
+    {"kickoff_time": "2024-08-17T11:30:00Z"},
+    {"kickoff_time": "2024-08-17T14:00:00Z"},
+    {"kickoff_time": "2024-08-17T14:00:00Z"},
+    {"kickoff_time": "2024-08-17T16:30:00Z"},
+    {"kickoff_time": "2024-08-19T19:00:00Z"},
+    {"kickoff_time": None},
+]
+events = [{"id": 1, "deadline_time": "2024-08-16T17:30:00Z"}]
+
+
+class TestMatchWindows:
+    def test_merges_overlapping_matches(self):
+        windows = match_windows(
+            [
+                {"kickoff_time": "2024-08-17T14:00:00Z"},
+                {"kickoff_time": "2024-08-17T15:00:00Z"},
+                {"kickoff_time": "2024-08-17T19:00:00Z"},
+            ]
+        )
+
+        utc = timezone.utc
+        assert windows == [
+            (
+                datetime(2024, 8, 17, 14, tzinfo=utc),
+                datetime(2024, 8, 17, 17, tzinfo=utc),
+            ),
+            (
+                datetime(2024, 8, 17, 19, tzinfo=utc),
+                datetime(2024, 8, 17, 21, tzinfo=utc),
+            ),
+        ]
+
+
+class TestBuildSchedule:
+    def test_runs_after_deadlines_and_match_windows(self):
+        run_times = build_schedule(fixtures, events)
+
+        # runs at 14:00 and 16:30 would coincide with the next kickoffs, so only the last run of the day is kept
+        assert run_times == [
+            "2024-08-16T18:00:00+00:00",
+            "2024-08-17T19:00:00+00:00",
+            "2024-08-19T21:30:00+00:00",
+        ]
+
+    def test_no_fixtures_means_no_match_runs(self):
+        assert build_schedule([], []) == []
+
+
+@mock_aws
+class TestUpdateSchedule(unittest.TestCase):
+    def setUp(self):
+        """Mocked AWS Credentials for moto, and stored raw data"""
+        os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+        os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+        os.environ["AWS_SECURITY_TOKEN"] = "testing"
+        os.environ["AWS_SESSION_TOKEN"] = "testing"
+        os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+
+        s3 = boto3.client("s3")
+        s3.create_bucket(Bucket="extract-bucket")
+        s3.put_object(
+            Bucket="extract-bucket",
+            Key="2024-25/2024-08-16/fixtures.json",
+            Body=json.dumps(fixtures),
+        )
+        s3.put_object(
+            Bucket="extract-bucket",
+            Key="2024-25/2024-08-16/bootstrap-static.json",
+            Body=json.dumps({"events": events}),
+        )
+
+    def test_writes_schedule_file(self):
+        schedule_path = "test_schedule.json"
+        try:
+            run_times = update_schedule(
+                "extract-bucket", schedule_path, "2024-08-16", delay_minutes=60
+            )
+
+            with open(schedule_path) as schedule_file:
+                assert json.load(schedule_file)["run_times"] == run_times
+            assert run_times[0] == "2024-08-16T18:30:00+00:00"
+        finally:
+            os.remove(schedule_path)
@@ -0,0 +1,108 @@
+import os
+import io
+import unittest
+from unittest.mock import patch
+import pytest
+import boto3
+import pandas as pd
+import pyarrow.parquet as pq
+from moto import mock_aws
+from airflow_home.dags.scripts.helpers import TABLE_NAMES, AGGREGATE_TABLES
+from airflow_home.dags.scripts.seasons import (
+    freeze_season,
+    has_output,
+    is_frozen,
+    season_dates,
+)
+from airflow_home.dags.scripts.backfill import backfill
+
+
+@mock_aws
+class TestFreezeSeason(unittest.TestCase):
+    def setUp(self):
+        """Mocked AWS Credentials for moto, and two complete runs of the 2023-24 season"""
+        os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+        os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+        os.environ["AWS_SECURITY_TOKEN"] = "testing"
+        os.environ["AWS_SESSION_TOKEN"] = "testing"
+        os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+
+        self.s3 = boto3.client("s3")
+        self.s3.create_bucket(Bucket="transform-bucket")
+        for ds, player_ids in [("2024-05-18", [2, 1]), ("2024-05-19", [3, 1, 2])]:
+            for table_name in TABLE_NAMES:
+                buffer = io.BytesIO()
+                pd.DataFrame(
+                    {
+                        "season": "2023-24",
+                        "player_id": player_ids,
+                        "team_id": player_ids,
+                        "gameweek_id": 38,
+                        "fixture_id": player_ids,
+                        "points_rank": player_ids,
+                    }
+                ).to_parquet(buffer, index=False)
+                self.s3.put_object(
+                    Bucket="transform-bucket",
+                    Key=f"2023-24/{ds}/{table_name}.parquet",
+                    Body=buffer.getvalue(),
+                )
+
+    def test_compacts_last_run_and_deletes_daily_files(self):
+        assert season_dates("transform-bucket", "2023-24") == [
+            "2024-05-18",
+            "2024-05-19",
+        ]
+
+        marker = freeze_season("transform-bucket", "2023-24")
+
+        assert marker["ds"] == "2024-05-19"
+        assert marker["row_counts"]["fact_players"] == 3
+        assert is_frozen("transform-bucket", "2023-24")
+        response = self.s3.get_object(
+            Bucket="transform-bucket", Key="2023-24/final/dim_players.parquet"
+        )
+        table = pq.read_table(io.BytesIO(response["Body"].read()))
+        assert table["player_id"].to_pylist() == [1, 2, 3]
+        keys = [
+            item["Key"]
+            for item in self.s3.list_objects_v2(Bucket="transform-bucket")["Contents"]
+        ]
+        assert all(
+            key.startswith("2023-24/final/") for key in keys if key.endswith(".parquet")
+        )
+        assert season_dates("transform-bucket", "2023-24") == []
+
+    def test_runs_without_aggregate_tables_are_complete(self):
+        for table_name in AGGREGATE_TABLES:
+            for ds in ["2024-05-18", "2024-05-19"]:
+                self.s3.delete_object(
+                    Bucket="transform-bucket", Key=f"2023-24/{ds}/{table_name}.parquet"
+                )
+
+        assert has_output("transform-bucket", "2024-05-19")
+        marker = freeze_season("transform-bucket", "2023-24")
+
+        assert marker["ds"] == "2024-05-19"
+        assert set(marker["row_counts"]) == set(TABLE_NAMES) - set(AGGREGATE_TABLES)
+
+    def test_freezing_twice_returns_marker(self):
+        first = freeze_season("transform-bucket", "2023-24")
+
+        assert freeze_season("transform-bucket", "2023-24") == first
+
+    @patch("airflow_home.dags.scripts.seasons.season_of", return_value="2023-24")
+    def test_refuses_current_season(self, mock_season_of):
+        with pytest.raises(ValueError):
+            freeze_season("transform-bucket", "2023-24")
+        assert not is_frozen("transform-bucket", "2023-24")
+
+    def test_backfill_skips_frozen_season(self):
+        self.s3.create_bucket(Bucket="extract-bucket")
+        freeze_season("transform-bucket", "2023-24")
+
+        results = backfill(
+            "extract-bucket", "transform-bucket", "2024-05-19", "2024-05-19", 1
+        )
+
+        assert results == {"2024-05-19": "frozen"}
@@ -0,0 +1,127 @@
+import os
+import io
+import json
+import unittest
+from unittest.mock import patch, MagicMock
+import pytest
+import boto3
+from moto import mock_aws
+from airflow_home.dags.scripts.helpers import TABLE_NAMES, TRANSFORM_GROUPS
+from airflow_home.dags.scripts.seasons import has_output
+from airflow_home.dags.scripts.serverless import (
+    run_fanout,
+    invoke_local,
+    lambda_invoker,
+    lambda_handler,
+)
+from tests.test_pipeline import api_payloads
+
+
+@mock_aws
+@patch.dict(
+    os.environ,
+    {
+        "s3_extract_bucket_name": "extract-bucket",
+        "s3_transform_bucket_name": "transform-bucket",
+        "rds_user": "user",
+        "rds_password": "password",
+        "rds_host": "host",
+        "rds_port": "3306",
+        "rds_db_name": "fpl",
+        "rds_load_mode": "merge",
+    },
+)
+@patch("airflow_home.dags.scripts.load.swap_tables")
+@patch("airflow_home.dags.scripts.load.load_single_table")
+@patch("airflow_home.dags.scripts.load.prepare_db")
+@patch(
+    "airflow_home.dags.scripts.extract.retrieve_data",
+    side_effect=lambda endpoint: api_payloads[endpoint],
+)
+@patch(
+    "airflow_home.dags.scripts.serverless.generate_endpoints",
+    return_value=list(api_payloads),
+)
+class TestRunFanout(unittest.TestCase):
+    def setUp(self):
+        """Mocked AWS Credentials for moto and test buckets"""
+        os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+        os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+        os.environ["AWS_SECURITY_TOKEN"] = "testing"
+        os.environ["AWS_SESSION_TOKEN"] = "testing"
+        os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+
+        s3 = boto3.client("s3")
+        s3.create_bucket(Bucket="extract-bucket")
+        s3.create_bucket(Bucket="transform-bucket")
+
+    def test_runs_every_stage_through_local_invoker(
+        self, mock_endpoints, mock_retrieve, mock_prepare, mock_load, mock_swap
+    ):
+        mock_prepare.return_value = 7
+        mock_load.return_value = {"inserted": 1, "updated": 0, "deleted": 0}
+        invoke = MagicMock(side_effect=invoke_local)
+
+        output = run_fanout(invoke, ds="2024-08-16", batch_size=1)
+
+        stages = [call.args[0]["stage"] for call in invoke.call_args_list]
+        assert stages.count("extract") == 2
+        assert stages.count("transform") == len(TRANSFORM_GROUPS)
+        assert stages.count("load") == len(TABLE_NAMES)
+        assert stages.index("prepare_db") > max(
+            i for i, stage in enumerate(stages) if stage == "transform"
+        )
+        assert stages[-1] == "swap"
+        assert has_output("transform-bucket", "2024-08-16")
+        assert sorted(
+            call.kwargs["table_name"] for call in mock_load.call_args_list
+        ) == sorted(TABLE_NAMES)
+        assert output["loads"]["dim_teams"] == {
+            "inserted": 1,
+            "updated": 0,
+            "deleted": 0,
+        }
+        mock_swap.assert_not_called()
+
+    def test_failed_stage_stops_later_stages(
+        self, mock_endpoints, mock_retrieve, mock_prepare, mock_load, mock_swap
+    ):
+        mock_retrieve.side_effect = Exception("API unavailable")
+
+        with pytest.raises(Exception):
+            run_fanout(invoke_local, ds="2024-08-16")
+
+        mock_prepare.assert_not_called()
+        mock_load.assert_not_called()
+
+
+def test_unknown_stage_raises():
+    with pytest.raises(ValueError):
+        lambda_handler({"stage": "deploy"}, None)
+
+
+@patch("airflow_home.dags.scripts.serverless.get_client")
+def test_lambda_invoker_returns_payload_and_raises_function_errors(mock_get_client):
+    mock_invoke = mock_get_client.return_value.invoke
+    mock_invoke.return_value = {
+        "StatusCode": 200,
+        "Payload": io.BytesIO(b'{"stage": "transform", "result": ["dim_teams"]}'),
+    }
+    invoke = lambda_invoker("fpl-etl")
+
+    assert invoke({"stage": "transform", "table_names": ["dim_teams"]}) == {
+        "stage": "transform",
+        "result": ["dim_teams"],
+    }
+    assert json.loads(mock_invoke.call_args.kwargs["Payload"]) == {
+        "stage": "transform",
+        "table_names": ["dim_teams"],
+    }
+
+    mock_invoke.return_value = {
+        "StatusCode": 200,
+        "FunctionError": "Unhandled",
+        "Payload": io.BytesIO(b'{"errorMessage": "Table dim_teams failed"}'),
+    }
+    with pytest.raises(RuntimeError, match="Table dim_teams failed"):
+        invoke({"stage": "load", "table_name": "dim_teams"})
@@ -0,0 +1,85 @@
+import sys
+import subprocess
+from unittest.mock import patch
+import pytest
+from airflow_home.dags.scripts.tasks import load_task, swap_task, extract_task
+
+
+@pytest.fixture(autouse=True)
+def pipeline_env(monkeypatch):
+    for name, value in {
+        "s3_extract_bucket_name": "extract-bucket",
+        "s3_transform_bucket_name": "transform-bucket",
+        "rds_user": "user",
+        "rds_password": "password",
+        "rds_host": "host",
+        "rds_port": "3306",
+        "rds_db_name": "fpl",
+        "rds_load_mode": "merge",
+        "rds_load_chunk_size": "1000",
+    }.items():
+        monkeypatch.setenv(name, value)
+
+
+def test_importing_tasks_skips_pipeline_dependencies():
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, airflow_home.dags.scripts.tasks; "
+            "print(sorted({'pandas', 'boto3', 'sqlalchemy', 'awswrangler'} & set(sys.modules)))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert output.stdout.strip() == "[]"
+
+
+def test_importing_tasks_leaves_logging_alone():
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import logging, threading, airflow_home.dags.scripts.tasks; "
+            "print(len(logging.getLogger().handlers), threading.active_count())",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert output.stdout.strip() == "0 1"
+
+
+@patch("airflow_home.dags.scripts.extract.extract_endpoint")
+def test_extract_task_reads_bucket_when_run(mock_extract_endpoint):
+    extract_task("fixtures", ds="2024-08-16")
+
+    mock_extract_endpoint.assert_called_once_with(
+        "fixtures", "extract-bucket", ds="2024-08-16"
+    )
+
+
+@patch("airflow_home.dags.scripts.load.load_single_table")
+def test_load_task_passes_load_settings(mock_load_single_table):
+    load_task("dim_teams", ds="2024-08-16")
+
+    kwargs = mock_load_single_table.call_args.kwargs
+    assert kwargs["table_name"] == "dim_teams"
+    assert kwargs["bucket_name"] == "transform-bucket"
+    assert kwargs["mode"] == "merge"
+    assert kwargs["chunk_size"] == 1000
+    assert kwargs["rds_port"] == "3306"
+    assert kwargs["ds"] == "2024-08-16"
+
+
+@patch("airflow_home.dags.scripts.load.swap_tables")
+def test_swap_task_only_swaps_in_swap_mode(mock_swap_tables, monkeypatch):
+    swap_task()
+    mock_swap_tables.assert_not_called()
+
+    monkeypatch.setenv("rds_load_mode", "swap")
+    swap_task()
+    mock_swap_tables.assert_called_once()
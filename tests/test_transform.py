@@ -8,14 +8,26 @@ from moto import mock_aws
 import boto3
 from botocore.exceptions import ClientError
 import pandas as pd
+from airflow_home.dags.scripts.helpers import season_of, TABLE_NAMES, AGGREGATE_TABLES
 from airflow_home.dags.scripts.transform import (
     retrieve_s3_json,
+    retrieve_payload,
     save_df_to_parquet_s3,
     transform_fact_players,
     transform_dim_players,
     transform_dim_teams,
     transform_dim_fixtures,
+    transform_agg_top_scorers,
+    transform_agg_team_of_the_week,
+    transform_agg_team_points,
+    live_stats_df,
+    TABLE_TRANSFORMS,
     transform_data,
+    transform_table,
+    transform_tables,
+    TOP_SCORERS,
+    FORMATION,
+    TEAM_OF_THE_WEEK_SIZE,
 )
 
 
@@ -28,7 +40,7 @@ class TestTransformFunction(unittest.TestCase):
         # mock aws wrangler and extracted data lists
         mock_df_to_parquet.return_value = '{"paths": ["s3://test-bucket/2025-01-02 12:52:03/test.parquet"], "partitions_values": []}'
         mock_retrieve_json.side_effect = lambda bucket, key: {
-            f"{current_date}/bootstrap-static.json": {
+            f"{season_of(current_date)}/{current_date}/bootstrap-static.json": {
                 "elements": [
                     {
                         "id": 1,
@@ -51,7 +63,7 @@ class TestTransformFunction(unittest.TestCase):
                     {"id": 20, "name": "Team B", "short_name": "TB"},
                 ],
             },
-            f"{current_date}/fixtures.json": [
+            f"{season_of(current_date)}/{current_date}/fixtures.json": [
                 {
                     "id": 100,
                     "event": 1,
@@ -71,7 +83,26 @@ class TestTransformFunction(unittest.TestCase):
         transform_data("test_bucket_1", "test_bucket_2")
 
         # check mock was called correctly
-        assert mock_df_to_parquet.call_count == 4
+        assert mock_df_to_parquet.call_count == len(TABLE_NAMES)
+
+    @patch("airflow_home.dags.scripts.transform.retrieve_s3_json")
+    @patch("airflow_home.dags.scripts.transform.wr.s3.to_parquet")
+    def test_transform_table_saves_one_table(
+        self, mock_df_to_parquet, mock_retrieve_json
+    ):
+        mock_retrieve_json.return_value = {
+            "teams": [{"id": 10, "name": "Team A", "short_name": "TA"}]
+        }
+
+        transform_table("dim_teams", "test_bucket_1", "test_bucket_2", "2024-08-16")
+
+        mock_retrieve_json.assert_called_once_with(
+            "test_bucket_1", "2024-25/2024-08-16/bootstrap-static.json"
+        )
+        assert (
+            mock_df_to_parquet.call_args[0][1]
+            == "s3://test_bucket_2/2024-25/2024-08-16/dim_teams.parquet"
+        )
 
 
 @mock_aws
@@ -114,6 +145,18 @@ class TestJSONtoList(unittest.TestCase):
             == "An error occurred (NoSuchKey) when calling the GetObject operation: The specified key does not exist."
         )
 
+    def test_payload_falls_back_to_key_without_season(self):
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.put_object(
+            Bucket="test-bucket", Key="2024-05-19/fixtures.json", Body='[{"id": 1}]'
+        )
+
+        assert retrieve_payload("test-bucket", "fixtures", ds="2024-05-19") == [
+            {"id": 1}
+        ]
+        with pytest.raises(ClientError, match="NoSuchKey"):
+            retrieve_payload("test-bucket", "fixtures", ds="2024-05-20")
+
 
 test_df = pd.DataFrame(
     [
@@ -163,7 +206,8 @@ class TestDfToParquetToS3(unittest.TestCase):
         mock_to_parquet.side_effect = Exception("NoSuchBucket")
 
         # invoke function
-        save_df_to_parquet_s3("test_table", test_df, "test_bucket")
+        with pytest.raises(Exception, match="NoSuchBucket"):
+            save_df_to_parquet_s3("test_table", test_df, "test_bucket")
 
         # assertion
         assert (
@@ -368,3 +412,185 @@ class TestTransformDimFixturesTable:
         }
         with pytest.raises(KeyError, match="Missing required columns"):
             transform_dim_fixtures("test")
+
+
+# Gameweek 1 points of each player, by FPL position (element_type)
+gameweek_points = {
+    1: {1: 10, 2: 9, 3: 8},
+    2: {4: 7, 5: 6, 6: 5, 7: 4, 8: 3, 9: 2},
+    3: {10: 12, 11: 11, 12: 3, 13: 2, 14: 1, 15: 1},
+    4: {16: 15, 17: 1, 18: 1, 19: 1},
+}
+
+
+@pytest.fixture
+def live_payloads():
+    """Extracted data of a finished gameweek 1, player 20 didn't play, gameweek 2 not started"""
+    positions = {
+        player_id: position_id
+        for position_id, points in gameweek_points.items()
+        for player_id in points
+    }
+    positions[20] = 4
+    points = {
+        player_id: player_points
+        for position_points in gameweek_points.values()
+        for player_id, player_points in position_points.items()
+    }
+    return {
+        "bootstrap-static": {
+            "elements": [
+                {"id": player_id, "team": player_id % 2 + 1, "element_type": position}
+                for player_id, position in positions.items()
+            ],
+            "events": [
+                {"id": 1, "finished": True, "is_current": True},
+                {"id": 2, "finished": False, "is_current": False},
+            ],
+        },
+        "event/1/live": {
+            "elements": [
+                {
+                    "id": player_id,
+                    "stats": {
+                        "minutes": 90 if player_id in points else 0,
+                        "goals_scored": int(player_id == 16),
+                        "assists": int(player_id == 10),
+                        "bonus": 3 if player_id == 16 else 0,
+                        "bps": 0,
+                        "total_points": points.get(player_id, 0),
+                    },
+                    "explain": [{"fixture": 1, "stats": []}],
+                }
+                for player_id in positions
+            ]
+        },
+        "fixtures": [{"id": 1, "event": 1, "team_h": 1, "team_a": 2, "stats": []}],
+    }
+
+
+class TestTransformAggTopScorersTable:
+    def test_ranks_highest_scoring_players(self, live_payloads):
+        output_df = transform_agg_top_scorers("test", live_payloads)
+
+        assert len(output_df) == TOP_SCORERS
+        assert output_df["points_rank"].tolist() == list(range(1, TOP_SCORERS + 1))
+        assert output_df["player_id"].tolist()[:5] == [16, 10, 11, 1, 2]
+        assert output_df["total_points"].is_monotonic_decreasing
+        assert (output_df["gameweek_id"] == 1).all()
+
+    def test_ties_broken_by_bps(self, live_payloads):
+        for element in live_payloads["event/1/live"]["elements"]:
+            if element["id"] == 7:
+                element["stats"].update(total_points=5, bps=30)
+
+        output_df = transform_agg_top_scorers("test", live_payloads)
+
+        # 6 and 7 both score 5, 7 has the higher bonus points system score
+        assert output_df["player_id"].tolist()[8:10] == [7, 6]
+
+    def test_no_gameweek_started_returns_empty_table(self, live_payloads):
+        for event in live_payloads["bootstrap-static"]["events"]:
+            event.update(finished=False, is_current=False)
+
+        output_df = transform_agg_top_scorers("test", live_payloads)
+
+        assert output_df.empty
+        assert "points_rank" in output_df.columns
+
+
+class TestTransformAggTeamOfTheWeekTable:
+    def test_selects_best_valid_formation(self, live_payloads):
+        output_df = transform_agg_team_of_the_week("test", live_payloads)
+
+        assert len(output_df) == TEAM_OF_THE_WEEK_SIZE
+        positions = output_df["position_id"].value_counts()
+        for position_id, (fewest, most) in FORMATION.items():
+            assert fewest <= positions.get(position_id, 0) <= most
+        # only one goalkeeper, although the second and third outscore most outfield players
+        assert sorted(output_df["player_id"]) == [1, 4, 5, 6, 7, 8, 10, 11, 12, 13, 16]
+
+    def test_player_without_minutes_excluded(self, live_payloads):
+        output_df = transform_agg_team_of_the_week("test", live_payloads)
+
+        assert 20 not in output_df["player_id"].tolist()
+
+
+class TestTransformAggTeamPointsTable:
+    def test_sums_points_per_team(self, live_payloads):
+        output_df = transform_agg_team_points("test", live_payloads)
+
+        odd_points = sum(
+            points
+            for position_points in gameweek_points.values()
+            for player_id, points in position_points.items()
+            if player_id % 2
+        )
+        team_2 = output_df[output_df["team_id"] == 2].iloc[0]
+        assert team_2["total_points"] == odd_points
+        assert team_2["player_count"] == 10
+        assert output_df["total_points"].sum() == sum(
+            sum(position_points.values())
+            for position_points in gameweek_points.values()
+        )
+        assert output_df["goals_scored"].sum() == 1
+        assert output_df["bonus"].sum() == 3
+
+    def test_transferred_player_stays_with_team_played_for(self, live_payloads):
+        # player 16 (team 1) has since moved to team 3, the fixture lists them as playing at home
+        live_payloads["bootstrap-static"]["elements"][15]["team"] = 3
+        live_payloads["fixtures"][0]["stats"] = [
+            {"identifier": "bps", "h": [{"value": 40, "element": 16}], "a": []}
+        ]
+
+        output_df = transform_agg_team_points("test", live_payloads)
+
+        assert sorted(output_df["team_id"]) == [1, 2]
+        team_1 = output_df[output_df["team_id"] == 1].iloc[0]
+        assert team_1["goals_scored"] == 1
+
+    def test_player_of_neither_side_without_stats_dropped(self, live_payloads):
+        live_payloads["bootstrap-static"]["elements"][15]["team"] = 3
+
+        output_df = transform_agg_team_points("test", live_payloads)
+
+        assert sorted(output_df["team_id"]) == [1, 2]
+        assert output_df["goals_scored"].sum() == 0
+
+
+# TABLE_TRANSFORMS of the aggregate tables only, live_payloads has no teams
+aggregate_transforms = {
+    name: transform
+    for name, transform in TABLE_TRANSFORMS.items()
+    if name in AGGREGATE_TABLES
+}
+
+
+@patch("airflow_home.dags.scripts.transform.TABLE_TRANSFORMS", aggregate_transforms)
+@patch("airflow_home.dags.scripts.transform.live_stats_df", wraps=live_stats_df)
+def test_aggregate_tables_share_one_read_of_live_data(mock_live_stats, live_payloads):
+    tables = transform_tables(payloads=live_payloads, ds="2024-08-16")
+
+    assert mock_live_stats.call_count == 1
+    assert len(tables["agg_top_scorers"]) == TOP_SCORERS
+
+
+@patch("airflow_home.dags.scripts.transform.wr.s3.to_parquet")
+@patch("airflow_home.dags.scripts.transform.retrieve_s3_json")
+def test_transform_data_reads_live_data_once(
+    mock_retrieve_json, mock_to_parquet, live_payloads
+):
+    mock_retrieve_json.side_effect = lambda bucket, key: live_payloads[
+        key.split("/", 2)[2][: -len(".json")]
+    ]
+
+    with patch(
+        "airflow_home.dags.scripts.transform.TABLE_TRANSFORMS", aggregate_transforms
+    ), patch(
+        "airflow_home.dags.scripts.transform.TRANSFORM_GROUPS", [AGGREGATE_TABLES]
+    ):
+        transform_data("test_bucket_1", "test_bucket_2", "2024-08-16")
+
+    keys = [call.args[1] for call in mock_retrieve_json.call_args_list]
+    assert keys.count("2024-25/2024-08-16/event/1/live.json") == 1
+    assert mock_to_parquet.call_count == len(AGGREGATE_TABLES)
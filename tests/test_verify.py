@@ -0,0 +1,106 @@
+import zlib
+import hashlib
+from decimal import Decimal
+from unittest.mock import MagicMock
+import pytest
+import pandas as pd
+import pyarrow as pa
+from datetime import date, time
+from airflow_home.dags.scripts.verify import TableChecksum, verify_table
+
+
+@pytest.fixture
+def fixtures_df():
+    return pd.DataFrame(
+        {
+            "fixture_id": [1, 2, 3],
+            "fixture_date": [date(1970, 1, 2), date(1970, 1, 11), None],
+            "fixture_time": [time(0, 1, 0), time(1, 0, 0), time(0, 0, 5)],
+            "match_finished": [True, False, True],
+            "team_name": ["Arsenal", None, "Spurs"],
+        }
+    )
+
+
+class TestTableChecksum:
+    def test_aggregates_each_column_kind(self, fixtures_df):
+        checksum = TableChecksum()
+        checksum.update(fixtures_df)
+
+        assert checksum.expected() == [
+            3,
+            3,
+            6,
+            2,
+            11,
+            3,
+            3665,
+            3,
+            2,
+            2,
+            zlib.crc32(b"Arsenal") + zlib.crc32(b"Spurs"),
+        ]
+        assert checksum.sql("dim_fixtures") == (
+            "SELECT COUNT(*), COUNT(fixture_id), SUM(fixture_id), "
+            "COUNT(fixture_date), SUM(DATEDIFF(fixture_date, '1970-01-01')), "
+            "COUNT(fixture_time), SUM(TIME_TO_SEC(fixture_time)), "
+            "COUNT(match_finished), SUM(match_finished), "
+            "COUNT(team_name), SUM(CRC32(team_name)) FROM dim_fixtures"
+        )
+
+    def test_is_independent_of_batching_and_format(self, fixtures_df):
+        whole = TableChecksum()
+        whole.update(fixtures_df)
+
+        batched = TableChecksum()
+        list(
+            batched.track(
+                [
+                    fixtures_df.iloc[2:],
+                    pa.RecordBatch.from_pandas(
+                        fixtures_df.iloc[:2], preserve_index=False
+                    ),
+                ]
+            )
+        )
+
+        assert batched.expected() == whole.expected()
+
+    def test_postgresql_uses_md5_string_hash(self):
+        checksum = TableChecksum("postgresql")
+        checksum.update(pd.DataFrame({"team_name": ["Arsenal"]}))
+
+        assert checksum.sums["team_name"] == int(
+            hashlib.md5(b"Arsenal").hexdigest()[:8], 16
+        )
+        assert "SUM(('x' || substr(md5(team_name), 1, 8))::bit(32)::bigint)" in (
+            checksum.sql("dim_teams")
+        )
+
+
+class TestVerifyTable:
+    def test_matching_table_passes(self, fixtures_df):
+        checksum = TableChecksum()
+        checksum.update(fixtures_df)
+        mock_engine = MagicMock()
+        mock_cursor = mock_engine.raw_connection.return_value.cursor.return_value
+        # MySQL returns SUM of integer columns as Decimal
+        mock_cursor.fetchone.return_value = tuple(
+            Decimal(value) for value in checksum.expected()
+        )
+
+        verify_table(mock_engine, "dim_fixtures", checksum)
+
+        mock_cursor.execute.assert_called_once_with(checksum.sql("dim_fixtures"))
+
+    def test_mismatch_raises(self, fixtures_df):
+        checksum = TableChecksum()
+        checksum.update(fixtures_df)
+        mock_engine = MagicMock()
+        mock_cursor = mock_engine.raw_connection.return_value.cursor.return_value
+        server = checksum.expected()
+        server[-1] += 1
+        mock_cursor.fetchone.return_value = tuple(server)
+
+        with pytest.raises(ValueError, match="team_name checksum"):
+            verify_table(mock_engine, "dim_fixtures", checksum)